@@ -1,13 +1,20 @@
 # app.py
 
+import os
+import sys
+
 import streamlit as st
-from funciones import leer_datos, limpiar_dataframes, grafico_proporcion_test_control
+
+#las funciones están en un único módulo, src/funciones.py, que compartimos con src/main_production.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from funciones import cargar_datos, grafico_proporcion_test_control
 
 def main():
     st.set_option('deprecation.showPyplotGlobalUse', False)
     #reading data
     import pandas as pd
-    from funciones import leer_datos, limpiar_dataframes, crear_dataframe_principales_clientes, crear_dataframe_promedio_tiempo_por_paso, guardar_como_csv,\
+    from funciones import cargar_datos, crear_dataframe_principales_clientes, crear_dataframe_promedio_tiempo_por_paso, guardar_como_csv,\
     grafico_edad_clientes_principales, grafico_genero_clientes_principales, grafico_fidelidad_clientes_principales, graficos_contacto_clientes_ultimos_meses,\
     grafico_num_cuentas_clientes_principales, mapa_calor_valores_numericos, grafico_dinero_y_num_cuentas, grafico_dinero_segun_edad, grafico_edad_genero_y_num_cuentas,\
     grafico_edad_genero_y_dinero, grafico_proporcion_test_control, grafico_drop_off_test_control, grafico_tiempo_promedio_entre_pasos_test_control,\
@@ -17,10 +24,8 @@ def main():
     #llamamos al archivo desde el archivo yalm e importamos los dataframes
     yalm_path = 'config.yaml'
     
-    df_final_demo, df_final_web_data, df_exp = leer_datos(yalm_path) 
-
-    #llamamos a la función limpiar_dataframes
-    df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(df_final_demo, df_final_web_data, df_exp)
+    #leemos y limpiamos los datos; si config.yaml define memoria_compartida, todas las sesiones comparten una copia
+    df_final_demo, df_final_web_data, df_exp = cargar_datos(yalm_path)
 
     #filtramos el dataframe df_final_demo para obtener a los 50 clientes con más dinero en la cuenta
     df_clientes_principales = crear_dataframe_principales_clientes(df_final_demo)
@@ -31,9 +36,6 @@ def main():
     """---------------------------------------------------------------------------------------------------"""
     st.title('Vanguard Dashboard')
 
-    # Cargar la data
-    data = leer_datos(yalm_path)
-    
     # Interactive widgets
     st.sidebar.header('Controls')
     #Multiselect box for selecting variation to include in the analysis
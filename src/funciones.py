@@ -1,548 +1,4365 @@
-def leer_datos(yalm_path):
+#esquemas de tipos con los que se leen las tablas de origen
+#las listas indican columnas categóricas y sus categorías; 'string' son textos guardados con pyarrow si está instalado
+ESQUEMA_DEMO = {'client_id': 'int32', 'clnt_tenure_yr': 'float32', 'clnt_tenure_mnth': 'float32', 'clnt_age': 'float32',
+                'gendr': ['U', 'M', 'F', 'X'], 'num_accts': 'float32', 'bal': 'float64', 'calls_6_mnth': 'float32', 'logons_6_mnth': 'float32'}
+ESQUEMA_WEB = {'client_id': 'int32', 'visitor_id': 'string', 'visit_id': 'string',
+               'process_step': ['start', 'step_1', 'step_2', 'step_3', 'confirm'], 'date_time': 'string'}
+ESQUEMA_EXP = {'client_id': 'int32', 'Variation': ['Control', 'Test']}
+
+#origen de los tiempos compactos: las fechas se guardan como segundos enteros (int32) desde el inicio del experimento
+INICIO_EXPERIMENTO = '2017-03-15 00:00:00'
+
+#fin del experimento (excluido): los eventos web fuera de [INICIO_EXPERIMENTO, FIN_EXPERIMENTO) no son válidos
+FIN_EXPERIMENTO = '2017-06-21 00:00:00'
+
+#pasos del proceso en su orden natural; las transiciones entre pasos se codifican como paso_anterior * 5 + paso
+PASOS_PROCESO = ESQUEMA_WEB['process_step']
+
+#bandas demográficas del cubo de segmentos (ver construir_cubo_segmentos): límites y nombres, como en pd.cut
+BANDAS_DEMO = {'age': ([0, 36, 54, float('inf')], ['jóvenes', 'adultos jóvenes', 'adultos mayores']),
+               'permanence_year': ([0, 5, 15, float('inf')], ['Clientes nuevos', 'Clientes consolidados', 'Clientes antiguos']),
+               'total_balance': ([0, 50_000, 100_000, 250_000, float('inf')], ['hasta 50.000', '50.000-100.000', '100.000-250.000', 'más de 250.000'])}
+
+#días de la semana en el orden de los histogramas de tráfico (ver calcular_histogramas_tiempo)
+DIAS_SEMANA = ['lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo']
+
+#versión del formato de las tablas en memoria compartida (ver cargar_datos): subirla al cambiar la limpieza o cómo se guardan
+VERSION_DATOS_COMPARTIDOS = 2
+
+#transacciones enriquecidas ya calculadas, por huella de los datos de entrada (ver obtener_transacciones)
+_CACHE_TRANSACCIONES = {}
+
+#resumen por visita de esas transacciones, con las mismas claves (ver obtener_visitas)
+_CACHE_VISITAS = {}
+
+#métricas del embudo de esas transacciones, con las mismas claves (ver calcular_embudo)
+_CACHE_EMBUDO = {}
+
+def _tipos_esquema(esquema):
 
     """
-    Lee los datos de archivos CSV especificados en el archivo YAML.
+    Traduce un esquema de tipos (ESQUEMA_DEMO, ESQUEMA_WEB, ESQUEMA_EXP) a tipos de pandas.
 
     Argumentos:
-    - yalm_path (str): Ruta del archivo YAML que contiene la información de los archivos CSV.
+    - esquema (dict): Diccionario columna -> tipo. Las listas son categorías y 'string' es texto.
 
     Devuelve:
-    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
-    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
-    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
-
-    Si hay algún error durante la lectura o importación de los datos, la función imprime un mensaje de error y retorna None.
+    - tipos (dict): Diccionario columna -> tipo de pandas, listo para usar en read_csv o astype.
     """
 
     import pandas as pd
-    import yaml
 
-    #leemos el archivo Yaml en Python
+    #los textos se guardan en un único buffer de pyarrow en lugar de un objeto de Python por fila
     try:
-        with open(yalm_path, 'r') as file:
-            config = yaml.safe_load(file)
-    except Exception as e:
-        print('Error leyendo el archivo .yaml:', e)
-        return None
+        import pyarrow
+        tipo_texto = 'string[pyarrow]'
+    except ImportError:
+        tipo_texto = 'object'
 
-    #importamos los dataframes
-    try:
-        df_final_demo = pd.read_csv(config['data']['demo_final'], sep=",", header=0, low_memory=False)
-        pt_1 = pd.read_csv(config['data']['pt_1'], sep=",", header=0, low_memory=False)
-        pt_2 = pd.read_csv(config['data']['pt_2'], sep=",", header=0, low_memory=False)
-        #concatenamos los dataframes pt_1 y pt_2
-        df_final_web_data = pd.concat([pt_1, pt_2], axis=0).reset_index(drop=True)
-        df_exp = pd.read_csv(config['data']['exp_client'], sep=",", header=0, low_memory=False)
-        return df_final_demo, df_final_web_data, df_exp
-    except Exception as e:
-        print('Error importando la data', e)
-        return None
+    return {columna: pd.CategoricalDtype(tipo) if isinstance(tipo, list) else tipo_texto if tipo == 'string' else tipo for columna, tipo in esquema.items()}
 
-def limpiar_dataframes(df_final_demo, df_final_web_data, df_exp):
+def _categorias_esquema(df, esquema, desconocidos=True, solo_categoricas=False):
 
     """
-    Realiza operaciones de limpieza en DataFrames específicos.
+    Aplica a las columnas categóricas de un DataFrame las categorías de su esquema.
 
     Argumentos:
-    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
-    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
-    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df (DataFrame de Pandas): DataFrame que se modifica en su sitio.
+    - esquema (dict): Esquema de tipos (ESQUEMA_WEB, ESQUEMA_EXP...); solo se usan sus columnas con lista de categorías.
+    - desconocidos (bool): Si es True, los valores que no están en el esquema se conservan como categorías añadidas
+      después de las del esquema (ordenadas), para que validar_dataframes los cuente. Si es False, pasan a ser nulos.
+    - solo_categoricas (bool): Si es True, no se tocan las columnas que aún no son categóricas (datos leídos sin esquema).
 
     Devuelve:
-    - df_final_demo (DataFrame de Pandas): DataFrame modificado de los datos finales de demostración.
-    - df_final_web_data (DataFrame de Pandas): DataFrame modificado de los datos web finales.
-    - df_exp (DataFrame de Pandas): DataFrame modificado de los datos de experimentos de clientes.
-
-    Realiza varias operaciones de limpieza en los DataFrames proporcionados:
+    - df (DataFrame de Pandas): El mismo DataFrame. Sin valores desconocidos, las columnas tienen exactamente el tipo del
+      esquema y los códigos de sus categorías no cambian.
     """
 
     import pandas as pd
 
-    #eliminamos la columna clnt_tenure_mnth
-    df_final_demo.drop("clnt_tenure_mnth", axis = 1, inplace = True)
+    for columna, categorias in esquema.items():
+        if not isinstance(categorias, list) or columna not in df.columns:
+            continue
+        serie = df[columna]
+        if solo_categoricas and not isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        extra = sorted(set(serie.dropna().unique()) - set(categorias)) if desconocidos else []
+        tipo = pd.CategoricalDtype(list(categorias) + extra)
+        if serie.dtype != tipo:
+            df[columna] = serie.astype(tipo)
 
-    #Cambiamos el nombre de las columnas para que sean más descriptivos
-    df_final_demo.columns = ["client_id","permanence_year","age","gender","num_accounts","total_balance","calls_months","login_month"]
+    return df
 
-    #eliminamos los valores duplicados de df_final_web_data
-    df_final_web_data.drop_duplicates(keep='first', inplace=True)
+def _compresion(ruta):
 
-    #cambiamos el formato de la columna 'date_time' a datetime.
-    df_final_web_data["date_time"] = pd.to_datetime(df_final_web_data["date_time"], format='%Y-%m-%d %H:%M:%S')
+    """
+    Detecta si un archivo está comprimido mirando sus primeros bytes.
 
-    #cambiamos el nombre de la columna Variation a variation
-    df_exp = df_exp.rename(columns={'Variation': 'variation'})
+    Argumentos:
+    - ruta (str): Ruta del archivo.
+
+    Devuelve:
+    - compresion (str o None): 'gzip', 'zstd', 'bz2', 'xz' o None si el archivo es texto sin comprimir.
+    """
 
-    #eliminamos datos nulos
-    df_exp = df_exp.dropna()
+    #firmas de los formatos de compresión que pandas sabe descomprimir mientras lee
+    firmas = {b'\x1f\x8b': 'gzip', b'\x28\xb5\x2f\xfd': 'zstd', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'xz'}
 
-    return df_final_demo, df_final_web_data, df_exp
+    with open(ruta, 'rb') as file:
+        cabecera = file.read(6)
 
-def crear_dataframe_principales_clientes(df_final_demo):
+    for firma, compresion in firmas.items():
+        if cabecera.startswith(firma):
+            return compresion
+    return None
+
+def _filtros_lectura(desde=None, hasta=None, pasos=None, clientes=None):
 
     """
-    Crea un nuevo DataFrame con los principales clientes basados en el dinero total de sus cuentas.
+    Traduce los filtros de leer_datos a condiciones (columna, operador, valor) que entienden pyarrow y pandas.
 
     Argumentos:
-    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
+    - desde (str o Timestamp): Fecha y hora mínima (incluida) de date_time.
+    - hasta (str o Timestamp): Fecha y hora máxima (excluida) de date_time.
+    - pasos (list): Valores de process_step que se conservan.
+    - clientes (iterable): client_id que se conservan.
 
     Devuelve:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene únicamente los datos de los principales clientes.
-
-    Esta función calcula los principales clientes basados en el dinero total de sus cuentas en el DataFrame proporcionado.
-    Luego, filtra el DataFrame original solo para incluir los datos de los clientes principales y retorna este nuevo DataFrame.
+    - filtros (list): Lista de condiciones que se cumplen todas a la vez. Vacía si no hay filtros.
     """
 
     import pandas as pd
 
-    #calcular los principales clientes basados en el dinero total de sus cuentas
-    clientes_principales = df_final_demo.groupby('client_id')['total_balance'].sum().nlargest(50)
-
-    #filtramos el dataframe original solo para los clientes principales
-    df_clientes_principales = df_final_demo[df_final_demo['client_id'].isin(clientes_principales.index)]
+    #date_time se guarda como texto 'AAAA-MM-DD HH:MM:SS', así que el orden del texto es el orden cronológico
+    filtros = []
+    if desde is not None:
+        filtros.append(('date_time', '>=', pd.Timestamp(desde).strftime('%Y-%m-%d %H:%M:%S')))
+    if hasta is not None:
+        filtros.append(('date_time', '<', pd.Timestamp(hasta).strftime('%Y-%m-%d %H:%M:%S')))
+    if pasos is not None:
+        filtros.append(('process_step', 'in', [pasos] if isinstance(pasos, str) else list(pasos)))
+    if clientes is not None:
+        filtros.append(('client_id', 'in', sorted(int(cliente) for cliente in set(clientes))))
 
-    return df_clientes_principales
+    return filtros
 
-def crear_dataframe_promedio_tiempo_por_paso(df_exp, df_final_web_data):
+def _columnas_lectura(columnas, filtros):
 
     """
-    Crea un nuevo DataFrame para analizar el tiempo promedio por paso en el proceso de transacción.
+    Calcula las columnas que hay que leer: las pedidas más las que necesitan los filtros.
 
     Argumentos:
-    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
-    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - columnas (list): Columnas pedidas. Si es None, se leen todas.
+    - filtros (list): Condiciones (columna, operador, valor).
 
     Devuelve:
-    - df_transacciones_para_grafico (DataFrame de Pandas): DataFrame que contiene los datos procesados para analizar el tiempo promedio por paso. 
-
-    Esta función realiza las siguientes operaciones para crear el DataFrame de salida.
-    Retorna el DataFrame procesado para su posterior análisis del tiempo promedio por paso en el proceso de transacción.
+    - leidas (list o None): Columnas que hay que leer, sin repetidos, o None si se leen todas.
     """
 
-    #eliminamos los datos nulos y con ellos se eliminan 20109 filas
-    df_exp = df_exp.dropna(subset =["variation"])
+    if columnas is None:
+        return None
 
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
+    return list(dict.fromkeys(list(columnas) + [columna for columna, _, _ in filtros or []]))
 
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
+def _filtrar(df, columnas=None, filtros=None):
 
-    #ordenamos los valores del df por cliente id, visita id y
-    df_transacciones = df_transacciones.sort_values(by=['client_id', 'visit_id', 'date_time'])
+    """
+    Aplica en memoria los filtros y la selección de columnas a un DataFrame ya leído.
 
-    #creamos una nueva columna en la que añadimos la fecha en la que el usuario realizó el paso anterior
-    df_transacciones['time_last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['date_time'].shift(1)
+    Argumentos:
+    - df (DataFrame de Pandas): DataFrame leído.
+    - columnas (list): Columnas que se conservan, en ese orden. Si es None, se conservan todas.
+    - filtros (list): Condiciones (columna, operador, valor) que deben cumplir las filas.
 
-    #creamos una nueva columna para añadir el paso anterior al actual
-    df_transacciones['last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['process_step'].shift(1)
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame filtrado, con el índice reiniciado si se han quitado filas.
+    """
 
-    #restamos la fecha del paso anterior a la del actual para ver cuánto ha tardado en pasar de un paso a otro
-    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
+    import operator
+    import numpy as np
 
-    #agregamos una nueva columna en la que incluimos el nombre del paso anterior y el paso actual
-    df_transacciones['steps'] = df_transacciones['process_step'].astype(str) + '_' + df_transacciones['last_step'].astype(str)
+    #combinamos todas las condiciones en una sola máscara; los nulos no cumplen ninguna
+    if filtros:
+        operadores = {'>=': operator.ge, '<': operator.lt, '==': operator.eq, 'in': lambda serie, valor: serie.isin(valor)}
+        mascara = np.ones(len(df), dtype=bool)
+        for columna, operador, valor in filtros:
+            mascara &= operadores[operador](df[columna], valor).to_numpy(dtype=bool, na_value=False)
+        if not mascara.all():
+            df = df[mascara].reset_index(drop=True)
 
-    #transformamos el tiempo a segundos
-    df_transacciones['difference_time_in_seconds'] = df_transacciones['time_difference'].dt.total_seconds()
+    if columnas is not None and list(df.columns) != list(columnas):
+        df = df[list(columnas)]
 
-    #eliminamos las filas que tienen valores nulos en time_difference, ya que son el primer paso realizado por el usuario en cada visita
-    df_transacciones_para_grafico = df_transacciones.dropna(subset='difference_time_in_seconds')
-   
-    return df_transacciones_para_grafico
+    return df
 
-def guardar_como_csv(df, nombre_archivo):
+def _leer_csv_tipado(ruta, esquema=None, columnas=None, filtros=None):
 
     """
-    Guarda un DataFrame como archivo CSV en una ubicación específica.
+    Lee un archivo CSV aplicando un esquema de tipos durante la lectura.
 
     Argumentos:
-    - df (DataFrame de Pandas): DataFrame que se desea guardar como archivo CSV.
-    - nombre_archivo (str): Nombre del archivo CSV.
+    - ruta (str): Ruta del archivo CSV.
+    - esquema (dict): Diccionario columna -> tipo. Las listas se leen como categorías y 'string' como texto de pyarrow. Si es None, pandas infiere los tipos.
+    - columnas (list): Columnas que se leen. Si es None, se leen todas.
+    - filtros (list): Condiciones (columna, operador, valor) que deben cumplir las filas (ver _filtros_lectura).
 
-    Esta función guarda el DataFrame proporcionado como un archivo CSV en una ubicación específica.
-    La ruta de la carpeta donde se guarda el archivo CSV está predefinida en la variable 'ruta'.
-    Utiliza os.path.join() para unir la ruta de la carpeta con el nombre del archivo proporcionado,
-    generando así la ruta completa donde se guardará el archivo CSV.
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame con los tipos del esquema.
+
+    Si una columna entera tiene valores nulos, se lee como entero con nulos ('Int32') en lugar de fallar y se avisa con
+    warnings.warn; cualquier otro error de conversión (por ejemplo, texto en una columna entera) se propaga.
+    Las columnas categóricas conservan los valores que no están en el esquema como categorías añadidas (ver
+    _categorias_esquema): no se convierten en nulos al leer, para que la validación los pueda contar.
+    Los archivos comprimidos (gzip, zstd, bz2, xz) se descomprimen por bloques mientras se leen, sin pasar por disco.
+    Las columnas que no se piden no se llegan a convertir y, con filtros, el archivo se lee por trozos que se filtran
+    al vuelo, de modo que nunca se tiene en memoria el archivo completo.
+    """
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente guarda el archivo CSV en la ubicación especificada.
+    import warnings
+    import pandas as pd
 
-    Ejemplo de uso:
-    guardar_como_csv(df, "datos_guardados.csv")
-    """
+    #detectamos la compresión por el contenido, así funciona aunque la extensión no la indique
+    opciones = {'sep': ",", 'header': 0, 'low_memory': False, 'compression': _compresion(ruta)}
+    leidas = _columnas_lectura(columnas, filtros)
+    if leidas is not None:
+        opciones['usecols'] = leidas
 
-    import os
+    def leer(tipos=None):
+        if not filtros:
+            return pd.read_csv(ruta, dtype=tipos, **opciones)
+        #leemos por trozos y nos quedamos solo con las filas que cumplen los filtros
+        trozos = [_filtrar(trozo, filtros=filtros) for trozo in pd.read_csv(ruta, dtype=tipos, chunksize=500_000, **opciones)]
+        return pd.concat(trozos, ignore_index=True)
 
-    #creamos una cadena que representa la ruta de la carpeta donde queremos guardar el archivo CSV.
-    ruta = r'..\data\output'
+    if esquema is None:
+        return _filtrar(leer(), columnas)
 
-    #utilizamos os.path.join() para unir esta ruta con el nombre del archivo proporcionado
-    #generando así la ruta completa donde guardaremos el archivo csv.
-    ruta_completa = os.path.join(ruta, nombre_archivo)
-    df.to_csv(ruta_completa, sep=',', encoding='utf-8', index=False)
+    #traducimos el esquema a tipos de pandas; las categóricas se leen con las categorías que aparezcan y se alinean después
+    tipos = _tipos_esquema(esquema)
+    tipos = {columna: 'category' if isinstance(tipo, pd.CategoricalDtype) else tipo for columna, tipo in tipos.items()}
+    if leidas is not None:
+        tipos = {columna: tipo for columna, tipo in tipos.items() if columna in leidas}
 
-def grafico_edad_clientes_principales(df_clientes_principales):
+    try:
+        return _categorias_esquema(_filtrar(leer(tipos), columnas), esquema)
+    except ValueError as e:
+        #solo recuperamos el caso de una columna entera con nulos: la leemos como decimal y la pasamos a entero con nulos
+        if 'Integer column has NA values' not in str(e):
+            raise
+        enteras = [columna for columna, tipo in tipos.items() if isinstance(tipo, str) and tipo.startswith('int')]
+        df = leer({c: t for c, t in tipos.items() if c not in enteras})
+        for columna in enteras:
+            df[columna] = df[columna].astype(tipos[columna].capitalize())
+        warnings.warn(f'{ruta} tiene nulos en columnas enteras, se leen como enteros con nulos')
+        return _categorias_esquema(_filtrar(df, columnas), esquema)
+
+def informe_memoria_esquema(yalm_path):
 
     """
-    Genera un gráfico de distribución de edades de los principales clientes.
+    Compara la memoria que ocupa cada tabla leída sin esquema y con el esquema de tipos.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - yalm_path (str): Ruta del archivo YAML que contiene la información de los archivos CSV.
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico de distribución de edades de los principales clientes.
-    """   
+    Devuelve:
+    - df_informe (DataFrame de Pandas): DataFrame con los bytes de cada tabla antes y después de aplicar el esquema.
+    """
 
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    
-    #agrupamos las edades por grupos de edad: jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54.
-    bins = [18, 36, 54, df_clientes_principales['age'].max()]
-    labels = ['jóvenes', 'adultos jóvenes', 'adultos mayores']
+    import yaml
 
-    #añadimos la columna 'age_grouped' con las edades agrupadas al dataframe de clientes principales
-    df_clientes_principales['age_grouped'] = pd.cut(df_clientes_principales['age'], bins=bins, labels=labels, include_lowest=True)
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
 
-    #Histograma de edades de los principales clientes
-    plt.figure(figsize=(10, 6))
-    sns.histplot(df_clientes_principales['age_grouped'], bins=20, kde=True, color='skyblue')
-    plt.title('Distribución de Edades de los Principales Clientes')
-    plt.xlabel('Grupo de edad')
-    plt.ylabel('Número de clientes')
-    plt.show()
+    #indicamos los archivos y el esquema de cada tabla
+    tablas = {'df_final_demo': ([config['data']['demo_final']], ESQUEMA_DEMO),
+              'df_final_web_data': (_partes_web(config), ESQUEMA_WEB),
+              'df_exp': ([config['data']['exp_client']], ESQUEMA_EXP)}
 
-    print('jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54')
+    #medimos los bytes de cada tabla leída de las dos formas
+    filas = []
+    for nombre, (rutas, esquema) in tablas.items():
+        antes = sum(_leer_csv_tipado(ruta).memory_usage(deep=True).sum() for ruta in rutas)
+        despues = sum(_leer_csv_tipado(ruta, esquema).memory_usage(deep=True).sum() for ruta in rutas)
+        filas.append({'tabla': nombre, 'bytes_sin_esquema': antes, 'bytes_con_esquema': despues, 'reduccion': antes / despues})
 
-def grafico_genero_clientes_principales(df_clientes_principales):
+    df_informe = pd.DataFrame(filas)
+    print(df_informe.to_string(index=False))
+
+    return df_informe
+
+def _huella_archivo(ruta, con_hash=True):
 
     """
-    Genera un gráfico de distribución de géneros de los clientes principales.
+    Calcula la huella de un archivo de origen para validar la caché.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - ruta (str): Ruta del archivo.
+    - con_hash (bool): Si es True, calcula también el hash del contenido (lee el archivo completo).
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """       
-    
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
+    Devuelve:
+    - huella (dict): Diccionario con el tamaño, la fecha de modificación y, opcionalmente, el hash del contenido.
+    """
 
-    #calculamos la frecuencia de género entre los clientes principales
-    frecuencia_genero = df_clientes_principales['gender'].value_counts()
+    import os
+    import hashlib
 
-    #creamos gráfico circular para mostrar la proporción de géneros entre los principales clientes
-    plt.figure(figsize=(10, 6))
-    plt.subplot(1, 2, 1)  # 1 fila, 2 columnas, primer subgráfico
-    plt.pie(frecuencia_genero, labels=frecuencia_genero.index, autopct='%1.1f%%', colors=sns.color_palette('Set3'))
-    plt.title('Distribución de Género entre los Principales Clientes')
-    plt.show()
+    #obtenemos el tamaño y la fecha de modificación del archivo
+    info = os.stat(ruta)
+    huella = {'size': info.st_size, 'mtime_ns': info.st_mtime_ns}
 
-    print('M = Masculino, F = Femenino, U = NS/NC')
+    #calculamos el hash del contenido leyendo el archivo por bloques para no cargarlo entero en memoria
+    if con_hash:
+        h = hashlib.blake2b(digest_size=16)
+        with open(ruta, 'rb') as file:
+            for bloque in iter(lambda: file.read(1 << 20), b''):
+                h.update(bloque)
+        huella['hash'] = h.hexdigest()
 
-    
-def grafico_fidelidad_clientes_principales(df_clientes_principales):
+    return huella
+
+def _leer_parquet(ruta, esquema=None, columnas=None, filtros=None):
 
     """
-    Genera un gráfico de distribución de los años que llevan los clientes principales siéndolo.
+    Lee un archivo Parquet de la caché respetando el esquema de tipos.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - ruta (str): Ruta del archivo Parquet.
+    - esquema (dict): Esquema de tipos de la tabla. Si es None, se usan los tipos guardados en el archivo.
+    - columnas (list): Columnas que se leen. Si es None, se leen todas.
+    - filtros (list): Condiciones (columna, operador, valor) que deben cumplir las filas (ver _filtros_lectura).
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """    
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame con los datos del archivo.
 
-    import pandas as pd
-    import seaborn as sns
-    import matplotlib.pyplot as plt
+    Los textos se cargan como texto de pyarrow (sin copiarlos a objetos de Python) y las categorías se alinean con el esquema
+    para que los trozos de distintos archivos se puedan concatenar sin perder el tipo categórico.
+    Las columnas y los filtros se aplican en la lectura: solo se descomprimen las columnas pedidas y se saltan los grupos
+    de filas cuyas estadísticas (mínimo y máximo) no pueden cumplir los filtros.
+    """
 
-    #agrupamos los años que llevan los clientes siéndolo hasta 5 clientes nuevos, hasta 15 clientes consolidados y a partir de ahí clientes antiguos
-    bins = [0, 5, 15, df_clientes_principales['age'].max()]
-    labels = ['Clientes nuevos', 'Clientes consolidados', 'Clientes antiguos']
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 
-    #añadimos una columna al dataframe df_clientes_principales llamada permanence_year_grouped para guardar esta nueva agrupación
-    df_clientes_principales['permanence_year_grouped'] = pd.cut(df_clientes_principales['permanence_year'], bins=bins, labels=labels, include_lowest=True)
+    #mapeamos los textos de Arrow a texto de pandas respaldado por pyarrow
+    textos = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+    tabla = pq.read_table(ruta, columns=_columnas_lectura(columnas, filtros), filters=filtros or None)
+    df = _filtrar(tabla.to_pandas(types_mapper=textos.get), columnas)
 
-    #creamos un gráfico de barras para visualizar la distribución
-    plt.figure(figsize=(10, 6))
-    sns.countplot(x='permanence_year_grouped', data=df_clientes_principales, palette='pastel')
-    plt.title('Distribución de la fidelidad de los clientes principales')
-    plt.xlabel('Tiempo de permanencia')
-    plt.ylabel('Número de años')
-    plt.show()
+    #alineamos las categorías con las del esquema, conservando los valores desconocidos
+    if esquema is not None:
+        df = _categorias_esquema(df, esquema)
 
-    print('0-5 = clientes nuevos, 5-15 = clientes consolidados, >15 = clientes antiguos')
+    return df
 
-def graficos_contacto_clientes_ultimos_meses(df_clientes_principales):
+def _leer_csv_con_cache(ruta, dir_cache, esquema=None, columnas=None, filtros=None):
 
     """
-    Genera un gráfico de distribución del contacto con la empresa de los clientes principales en los últimos 6 meses.
+    Lee un archivo CSV usando una caché Parquet tipada que se reconstruye cuando cambia el archivo de origen.
+
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - ruta (str): Ruta del archivo CSV de origen.
+    - dir_cache (str): Carpeta donde se guardan los archivos Parquet y sus manifiestos.
+    - esquema (dict): Esquema de tipos con el que se lee el CSV. Un cambio de esquema también invalida la caché.
+    - columnas (list): Columnas que se devuelven. Si es None, se devuelven todas.
+    - filtros (list): Condiciones (columna, operador, valor) que deben cumplir las filas (ver _filtros_lectura).
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """  
-    
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame con los datos del archivo.
+
+    La caché es válida si el tamaño y la fecha de modificación del origen coinciden con el manifiesto.
+    Si solo cambia la fecha de modificación, se compara el hash del contenido antes de invalidarla.
+    Si pyarrow no está instalado, se lee directamente el CSV.
+    Con la caché válida, las columnas y los filtros se aplican al leer el Parquet; al reconstruirla se lee el CSV completo.
+    Las tablas con cliente, visita y fecha en el esquema (los datos web) se guardan ordenadas por esas columnas: con una
+    sola parte, la limpieza ya no tiene que ordenarlas, y las estadísticas de cada grupo de filas por cliente son estrechas,
+    así que los filtros por cliente se saltan casi todo el archivo.
+    """
+
+    import os
+    import json
+    import hashlib
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
 
-    #crear una figura con dos subplots
-    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(16, 5))
+    #nombramos los archivos de la caché con el nombre del origen y un hash de su ruta absoluta para evitar colisiones
+    clave = hashlib.blake2b(os.path.abspath(ruta).encode('utf-8'), digest_size=8).hexdigest()
+    nombre = os.path.basename(ruta)
+    ruta_parquet = os.path.join(dir_cache, f'{nombre}.{clave}.parquet')
+    ruta_manifiesto = os.path.join(dir_cache, f'{nombre}.{clave}.json')
+
+    #orden en que se guarda la tabla (None si el esquema no tiene las columnas de las sesiones)
+    claves = ['client_id', 'visit_id', 'date_time']
+    orden = claves if esquema is not None and all(clave in esquema for clave in claves) else None
+
+    #comprobamos si la caché existe y sigue siendo válida
+    huella = _huella_archivo(ruta, con_hash=False)
+    manifiesto = None
+    if os.path.exists(ruta_parquet) and os.path.exists(ruta_manifiesto):
+        with open(ruta_manifiesto, 'r') as file:
+            manifiesto = json.load(file)
+
+    #las cachés de antes de conservar los valores desconocidos de las categóricas se reconstruyen
+    if (manifiesto is not None and manifiesto.get('esquema') == esquema and manifiesto.get('orden') == orden
+            and manifiesto.get('desconocidos') is True and manifiesto['size'] == huella['size']):
+        #si la fecha de modificación coincide, usamos la caché directamente
+        if manifiesto['mtime_ns'] == huella['mtime_ns']:
+            return _leer_parquet(ruta_parquet, esquema, columnas, filtros)
+
+        #si solo ha cambiado la fecha de modificación, comparamos el contenido
+        huella = _huella_archivo(ruta)
+        if manifiesto['hash'] == huella['hash']:
+            huella['esquema'] = esquema
+            huella['orden'] = orden
+            huella['desconocidos'] = True
+            with open(ruta_manifiesto, 'w') as file:
+                json.dump(huella, file)
+            return _leer_parquet(ruta_parquet, esquema, columnas, filtros)
+
+    #leemos el CSV de origen con su esquema de tipos
+    df = _leer_csv_tipado(ruta, esquema)
+    if orden is not None and not esta_ordenado(df, orden):
+        df = df.take(_orden_sesiones(df, orden)).reset_index(drop=True)
+
+    #reconstruimos la caché escribiendo primero en un archivo temporal para no dejarla a medias
+    #los grupos de filas pequeños permiten saltarse partes del archivo al filtrar
+    try:
+        os.makedirs(dir_cache, exist_ok=True)
+        df.to_parquet(ruta_parquet + '.tmp', index=False, row_group_size=100_000)
+        os.replace(ruta_parquet + '.tmp', ruta_parquet)
+        if 'hash' not in huella:
+            huella = _huella_archivo(ruta)
+        huella['esquema'] = esquema
+        huella['orden'] = orden
+        huella['desconocidos'] = True
+        with open(ruta_manifiesto, 'w') as file:
+            json.dump(huella, file)
+    except ImportError as e:
+        print('No se ha podido crear la caché Parquet (falta pyarrow):', e)
+
+    return _filtrar(df, columnas, filtros)
+
+def _partes_web(config):
 
-    #gráfico de barras de interacciones en la web en los últimos 6 meses de los principales clientes
-    sns.countplot(x='login_month', data=df_clientes_principales, palette='coolwarm', ax=axes[0])
-    axes[0].set_title('Interacciones en la plataforma de los clientes principales en los últimos 6 meses')
-    axes[0].set_xlabel('Num de accesos a la plataforma')
-    axes[0].set_ylabel('Num de usuarios')
+    """
+    Obtiene la lista de archivos con los datos web indicados en el archivo YAML.
 
-    #gráfico de barras de clientes que hablaron en los últimos 6 meses de los principales clientes
-    sns.countplot(x='calls_months', data=df_clientes_principales, palette='pastel', ax=axes[1])
-    axes[1].set_title('Llamadas de los Principales Clientes en los últimos 6 meses')
-    axes[1].set_xlabel('Num de llamadas')
-    axes[1].set_ylabel('Num de usuarios')
+    Argumentos:
+    - config (dict): Configuración leída del archivo YAML.
 
-    #ajustamos el espaciado entre los subplots
-    plt.tight_layout()
+    Devuelve:
+    - partes (list): Rutas de los archivos de datos web, ordenadas por nombre.
 
-    #mostramos el gráfico combinado
-    plt.show()
+    Si el YAML define 'data: web_data', puede ser una carpeta (se leen todos sus archivos .txt y .csv, también comprimidos
+    con .gz, .zst, .bz2 o .xz) o un patrón glob.
+    Si no, se usan las dos partes 'pt_1' y 'pt_2'.
+    """
 
-def grafico_num_cuentas_clientes_principales(df_clientes_principales):
+    import os
+    import glob
+
+    patron = config['data'].get('web_data')
+    if patron is None:
+        return [config['data']['pt_1'], config['data']['pt_2']]
+
+    #si es una carpeta, buscamos todos los archivos de texto que contiene
+    if os.path.isdir(patron):
+        extensiones = tuple(texto + compresion for texto in ('.txt', '.csv') for compresion in ('', '.gz', '.zst', '.bz2', '.xz'))
+        partes = [ruta for ruta in glob.glob(os.path.join(patron, '*')) if ruta.endswith(extensiones)]
+    else:
+        partes = glob.glob(patron)
+
+    if not partes:
+        raise FileNotFoundError(f'No hay archivos de datos web en {patron}')
+
+    return sorted(partes)
+
+def _leer_parte(ruta, esquema=None, dir_cache=None, columnas=None, filtros=None):
 
     """
-    Genera un gráfico de distribución con el número de cuentas que tienen los clientes principales.
+    Lee un archivo de datos, desde la caché Parquet si se indica su carpeta, y mide cuánto tarda.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - ruta (str): Ruta del archivo.
+    - esquema (dict): Esquema de tipos de la tabla.
+    - dir_cache (str): Carpeta de la caché. Si es None, se lee directamente el archivo.
+    - columnas (list): Columnas que se leen. Si es None, se leen todas.
+    - filtros (list): Condiciones (columna, operador, valor) que deben cumplir las filas.
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """  
-    
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame con los datos del archivo.
+    - segundos (float): Tiempo de lectura.
+    """
 
-    #ajustamos el tamaño
-    plt.figure(figsize=(10, 8))
+    import time
 
-    #creamos el gráfico de violín
-    sns.violinplot(x=df_clientes_principales['num_accounts'], inner='quartile', palette='pastel')
-    
-    #definimos título y etiquetas
-    plt.title('Distribución del Número de Cuentas de los Principales Clientes')
-    plt.xlabel('Número de Cuentas')
-    plt.ylabel('Densidad')
+    inicio = time.perf_counter()
+    if dir_cache:
+        df = _leer_csv_con_cache(ruta, dir_cache, esquema, columnas, filtros)
+    else:
+        df = _leer_csv_tipado(ruta, esquema, columnas, filtros)
 
-    #mostramos el gráfico
-    plt.show()
+    return df, time.perf_counter() - inicio
 
-def mapa_calor_valores_numericos(df_clientes_principales):
+def _leer_partes(partes, esquema=None, dir_cache=None, n_hilos=None, procesos=False, columnas=None, filtros=None, informe=None):
 
     """
-    Genera un mapa de calor entre todos los valores numéricos.
+    Lee varios archivos de datos web en paralelo y los concatena una sola vez.
+
+    Argumentos:
+    - partes (list): Rutas de los archivos.
+    - esquema (dict): Esquema de tipos de la tabla.
+    - dir_cache (str): Carpeta de la caché Parquet. Si es None, se leen directamente los archivos.
+    - n_hilos (int): Número de lectores en paralelo. Por defecto, uno por archivo hasta un máximo de 8.
+    - procesos (bool): Si es True, lee con procesos en lugar de hilos. Conviene con archivos comprimidos, porque
+      descomprimir y analizar el texto ocupa la CPU y los hilos se turnan con el GIL.
+    - columnas (list): Columnas que se leen. Si es None, se leen todas.
+    - filtros (list): Condiciones (columna, operador, valor) que deben cumplir las filas.
+    - informe (list): Si se indica, se añade la memoria y el tiempo de la lectura y de la concatenación.
+
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame con todas las partes en el orden de la lista.
+
+    Imprime el tiempo de lectura de cada parte para detectar archivos lentos.
+    """
+
+    import os
+    import time
+    import itertools
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    #leemos las partes en paralelo; map mantiene el orden para que los duplicados se resuelvan igual que en serie
+    etapa = _inicio_etapa(informe)
+    inicio = time.perf_counter()
+    ejecutor = ProcessPoolExecutor if procesos else ThreadPoolExecutor
+    with ejecutor(max_workers=n_hilos or min(8, len(partes))) as pool:
+        resultados = list(pool.map(_leer_parte, partes, itertools.repeat(esquema), itertools.repeat(dir_cache),
+                                   itertools.repeat(columnas), itertools.repeat(filtros)))
+
+    for ruta, (df, segundos) in zip(partes, resultados):
+        print(f'{os.path.basename(ruta)}: {len(df)} filas en {segundos:.2f} s')
+    print(f'{len(partes)} partes leídas en {time.perf_counter() - inicio:.2f} s')
+    _fin_etapa(informe, 'lectura web', etapa)
+
+    #concatenamos todas las partes de una vez; los textos de pyarrow se encadenan sin copiarse
+    etapa = _inicio_etapa(informe)
+    partes_df = [df for df, _ in resultados]
+    del resultados
+    df = pd.concat(partes_df, axis=0, ignore_index=True)
+    del partes_df
+    #si las partes tienen valores desconocidos distintos, concat deja las categóricas como texto: las volvemos a alinear
+    if esquema is not None:
+        df = _categorias_esquema(df, esquema)
+    _fin_etapa(informe, 'concatenación', etapa)
+
+    return df
+
+def medir_throughput_lectura(yalm_path, n_hilos=None, procesos=False):
+
+    """
+    Mide la velocidad de lectura de cada parte de los datos web, sin caché, para comparar archivos comprimidos y sin comprimir.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML con las partes de los datos web.
+    - n_hilos (int): Número de lectores en paralelo.
+    - procesos (bool): Si es True, lee con procesos en lugar de hilos.
+
+    Devuelve:
+    - df_throughput (DataFrame de Pandas): DataFrame con la compresión, los MB en disco, las filas, los segundos,
+      los MB/s en disco y las filas por segundo de cada parte, y una fila 'total' con la lectura en paralelo completa.
+    """
+
+    import os
+    import time
+    import itertools
+    import pandas as pd
+    import yaml
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
+    partes = _partes_web(config)
+
+    #leemos todas las partes en paralelo midiendo cada una
+    inicio = time.perf_counter()
+    ejecutor = ProcessPoolExecutor if procesos else ThreadPoolExecutor
+    with ejecutor(max_workers=n_hilos or min(8, len(partes))) as pool:
+        resultados = list(pool.map(_leer_parte, partes, itertools.repeat(ESQUEMA_WEB)))
+    total = time.perf_counter() - inicio
+
+    filas = []
+    for ruta, (df, segundos) in zip(partes, resultados):
+        mb = os.path.getsize(ruta) / 2**20
+        filas.append({'archivo': os.path.basename(ruta), 'compresion': _compresion(ruta) or '-', 'mb_disco': mb, 'filas': len(df),
+                      'segundos': segundos, 'mb_s_disco': mb / segundos, 'filas_s': len(df) / segundos})
+    mb_total = sum(fila['mb_disco'] for fila in filas)
+    filas_total = sum(fila['filas'] for fila in filas)
+    filas.append({'archivo': 'total', 'compresion': '', 'mb_disco': mb_total, 'filas': filas_total,
+                  'segundos': total, 'mb_s_disco': mb_total / total, 'filas_s': filas_total / total})
+
+    df_throughput = pd.DataFrame(filas)
+    print(df_throughput.to_string(index=False))
+
+    return df_throughput
+
+def leer_datos(yalm_path, usar_cache=True, tipar=True, incluir_web=True, n_hilos=None, procesos=None,
+               columnas=None, desde=None, hasta=None, pasos=None, clientes=None, variacion=None, informe=None):
+
+    """
+    Lee los datos de archivos CSV especificados en el archivo YAML.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML que contiene la información de los archivos CSV.
+    - usar_cache (bool): Si es True y el YAML define 'cache: dir', lee los datos desde una caché Parquet que se crea en la primera lectura.
+    - tipar (bool): Si es True, lee cada tabla con su esquema de tipos (ESQUEMA_DEMO, ESQUEMA_WEB, ESQUEMA_EXP).
+    - incluir_web (bool): Si es False, no lee los datos web y devuelve None en su lugar (para usar con leer_datos_stream).
+    - n_hilos (int): Número de hilos con los que se leen las partes de los datos web.
+    - procesos (bool): Si es True, lee las partes con procesos en lugar de hilos. Por defecto se usan procesos solo si hay
+      varias partes comprimidas, para descomprimirlas en paralelo.
+    - columnas (list): Columnas de los datos web que se leen (por ejemplo, sin visitor_id). Si es None, se leen todas.
+    - desde (str o Timestamp): Fecha y hora mínima (incluida) de los datos web.
+    - hasta (str o Timestamp): Fecha y hora máxima (excluida) de los datos web.
+    - pasos (list): Pasos del proceso (process_step) de los datos web que se conservan.
+    - clientes (iterable): client_id que se conservan en las tres tablas.
+    - variacion (str o list): Variaciones ('Control', 'Test') que se conservan. Filtra df_exp y, a través de sus
+      clientes, los datos web y demográficos.
+    - informe (list): Si se indica, se añade la memoria y el tiempo de la lectura y la concatenación de los datos web.
+
+    Devuelve:
+    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+
+    Si hay algún error durante la lectura o importación de los datos, la función imprime un mensaje de error y retorna None.
+    La caché se invalida cuando cambia el tamaño, la fecha de modificación o el contenido de un archivo de origen.
+    Los datos web pueden estar repartidos en cualquier número de archivos ('data: web_data' admite una carpeta o un patrón glob).
+    Los archivos pueden estar comprimidos con gzip, zstd (requiere el paquete zstandard), bz2 o xz; se descomprimen mientras se leen.
+    Con el esquema, client_id es entero, process_step, variation y gender son categóricas y las columnas numéricas de demo se reducen a float32.
+    Las columnas y los filtros se aplican durante la lectura: con la caché se leen solo las columnas pedidas y los grupos de
+    filas que pueden cumplir los filtros; sin ella, los CSV se leen por trozos que se filtran al vuelo.
+    """
+
+    import pandas as pd
+    import yaml
+
+    #leemos el archivo Yaml en Python
+    try:
+        with open(yalm_path, 'r') as file:
+            config = yaml.safe_load(file)
+    except Exception as e:
+        print('Error leyendo el archivo .yaml:', e)
+        return None
+
+    #elegimos si leemos desde la caché o directamente desde los CSV
+    dir_cache = (config.get('cache') or {}).get('dir') if usar_cache else None
+
+    #importamos los dataframes
+    try:
+        #leemos primero los experimentos: la variación se traduce en un filtro de clientes para las otras tablas
+        filtros_exp = _filtros_lectura(clientes=clientes)
+        if variacion is not None:
+            filtros_exp.append(('Variation', 'in', [variacion] if isinstance(variacion, str) else list(variacion)))
+        df_exp, _ = _leer_parte(config['data']['exp_client'], ESQUEMA_EXP if tipar else None, dir_cache, filtros=filtros_exp)
+        if variacion is not None:
+            clientes = df_exp['client_id'].dropna().unique()
+
+        df_final_demo, _ = _leer_parte(config['data']['demo_final'], ESQUEMA_DEMO if tipar else None, dir_cache,
+                                       filtros=_filtros_lectura(clientes=clientes))
+        df_final_web_data = None
+        if incluir_web:
+            partes = _partes_web(config)
+            if procesos is None:
+                procesos = sum(_compresion(ruta) is not None for ruta in partes) > 1
+            #leemos todas las partes de los datos web en paralelo y las concatenamos
+            filtros_web = _filtros_lectura(desde, hasta, pasos, clientes)
+            df_final_web_data = _leer_partes(partes, ESQUEMA_WEB if tipar else None, dir_cache, n_hilos, procesos, columnas, filtros_web, informe)
+        return df_final_demo, df_final_web_data, df_exp
+    except Exception as e:
+        print('Error importando la data', e)
+        return None
+
+def _rss_sin_proc():
+
+    """
+    Aproxima la memoria residente del proceso en MB cuando no hay /proc (fuera de Linux).
+
+    Devuelve:
+    - rss (float): Máximo de RSS del proceso con el módulo resource (Unix), RSS actual con psutil si está instalado
+      (Windows), o NaN si no hay forma de medirla.
+    """
+
+    import sys
+
+    try:
+        import resource
+        #ru_maxrss está en KB en Linux y en bytes en macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        #sin resource ni psutil la memoria se muestra como NaN (n/a) en los informes
+        return float('nan')
+
+def _estado_memoria():
+
+    """
+    Lee la memoria residente actual (VmRSS) y su máximo (VmHWM) del proceso en MB.
+
+    Devuelve:
+    - rss, pico (float): Memoria residente actual y máxima desde el último reinicio del máximo.
+
+    Fuera de Linux, sin /proc/self/status, las dos se aproximan con _rss_sin_proc (NaN si no se puede medir).
+    """
+
+    try:
+        memoria = {}
+        with open('/proc/self/status', 'r') as file:
+            for linea in file:
+                partes = linea.split()
+                if partes and partes[0] in ('VmRSS:', 'VmHWM:'):
+                    memoria[partes[0]] = int(partes[1]) / 1024
+        return memoria['VmRSS:'], memoria['VmHWM:']
+    except (OSError, KeyError):
+        rss = _rss_sin_proc()
+        return rss, rss
+
+def _inicio_etapa(informe):
+
+    """
+    Empieza a medir una etapa de la carga: reinicia el máximo de memoria del proceso y guarda la memoria y la hora de inicio.
+
+    Argumentos:
+    - informe (list): Lista donde se registran las etapas. Si es None, no se mide nada.
+
+    Devuelve:
+    - inicio (tuple o None): Hora y memoria residente de inicio, para pasar a _fin_etapa.
+
+    El máximo (VmHWM) se reinicia escribiendo '5' en /proc/self/clear_refs, así el pico de cada etapa es solo suyo.
+    """
+
+    import time
+
+    if informe is None:
+        return None
+
+    try:
+        with open('/proc/self/clear_refs', 'w') as file:
+            file.write('5')
+    except OSError:
+        pass
+
+    return time.perf_counter(), _estado_memoria()[0]
+
+def _fin_etapa(informe, etapa, inicio):
+
+    """
+    Termina de medir una etapa de la carga y la añade al informe.
+
+    Argumentos:
+    - informe (list): Lista donde se registran las etapas. Si es None, no se hace nada.
+    - etapa (str): Nombre de la etapa.
+    - inicio (tuple): Valor devuelto por _inicio_etapa.
+    """
+
+    import time
+
+    if informe is None:
+        return
+
+    segundos = time.perf_counter() - inicio[0]
+    rss, pico = _estado_memoria()
+    informe.append({'etapa': etapa, 'segundos': segundos, 'rss_inicio_mb': inicio[1], 'pico_mb': pico,
+                    'rss_fin_mb': rss, 'pico_sobre_inicio_mb': pico - inicio[1]})
+
+def limpiar_demo(df_final_demo):
+
+    """
+    Limpia el DataFrame de datos demográficos.
+
+    Argumentos:
+    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
+
+    Devuelve:
+    - df_final_demo (DataFrame de Pandas): DataFrame modificado de los datos finales de demostración.
+    """
+
+    #eliminamos la columna clnt_tenure_mnth (del no copia el resto de columnas, drop sí)
+    del df_final_demo["clnt_tenure_mnth"]
+
+    #Cambiamos el nombre de las columnas para que sean más descriptivos
+    df_final_demo.columns = ["client_id","permanence_year","age","gender","num_accounts","total_balance","calls_months","login_month"]
+
+    return df_final_demo
+
+def _bytes_fecha_hora(fechas):
+
+    """
+    Obtiene los caracteres de una columna de fechas 'YYYY-MM-DD HH:MM:SS' como una matriz de bytes (n, 19).
+
+    Argumentos:
+    - fechas (Series de Pandas): Textos de las fechas, como texto de pyarrow u objetos de Python.
+
+    Devuelve:
+    - bytes_fechas (ndarray): Matriz uint8 de forma (n, 19).
+
+    Si la columna es texto de pyarrow con todas las fechas de 19 caracteres, la matriz es una vista del buffer de Arrow, sin copias.
+    Lanza ValueError si hay nulos o fechas de otra longitud.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if fechas.isna().any():
+        raise ValueError('Hay fechas nulas')
+
+    #con texto de pyarrow, los caracteres ya están contiguos en un único buffer
+    if isinstance(fechas.dtype, pd.StringDtype) and fechas.dtype.storage == 'pyarrow':
+        import pyarrow as pa
+        arr = pa.array(fechas.array)
+        if isinstance(arr, pa.ChunkedArray):
+            arr = arr.combine_chunks()
+        tipo_offset = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+        offsets = np.frombuffer(arr.buffers()[1], dtype=tipo_offset)[arr.offset:arr.offset + len(arr) + 1]
+        if len(arr) and not (np.diff(offsets) == 19).all():
+            raise ValueError('Hay fechas con un formato distinto de YYYY-MM-DD HH:MM:SS')
+        datos = np.frombuffer(arr.buffers()[2], dtype=np.uint8) if len(arr) else np.empty(0, dtype=np.uint8)
+        return datos[offsets[0]:offsets[0] + 19 * len(arr)].reshape(len(arr), 19)
+
+    #con objetos de Python, copiamos a un array de ancho fijo con un byte de más para detectar fechas demasiado largas
+    #(las cortas se rellenan con ceros, que no pasan la comprobación de dígitos y separadores)
+    caracteres = np.asarray(fechas, dtype='S20').view(np.uint8).reshape(len(fechas), 20)
+    if (caracteres[:, 19] != 0).any():
+        raise ValueError('Hay fechas con un formato distinto de YYYY-MM-DD HH:MM:SS')
+    return caracteres[:, :19]
+
+def decodificar_fecha_hora(fechas, origen=INICIO_EXPERIMENTO):
+
+    """
+    Convierte fechas con el formato fijo 'YYYY-MM-DD HH:MM:SS' en segundos enteros desde un origen.
+
+    Argumentos:
+    - fechas (Series de Pandas): Textos de las fechas.
+    - origen (str): Fecha de referencia. Por defecto, el inicio del experimento.
+
+    Devuelve:
+    - segundos (ndarray): Array int32 con los segundos transcurridos desde el origen (4 bytes por evento en lugar de 8).
+
+    Lee los dígitos por su posición sobre la matriz de bytes y calcula los días con la fórmula del calendario civil,
+    sin interpretar el formato fila a fila. Lanza ValueError si alguna fecha no tiene el formato esperado.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    caracteres = _bytes_fecha_hora(fechas)
+    origen = pd.Timestamp(origen).value // 10**9
+    segundos = np.empty(len(caracteres), dtype=np.int32)
+
+    #decodificamos por bloques para que los arrays intermedios (unos 100 bytes por fecha) no crezcan con la tabla
+    for inicio in range(0, len(caracteres), 1 << 18):
+        bloque = caracteres[inicio:inicio + (1 << 18)]
+
+        #comprobamos los separadores y que el resto de posiciones sean dígitos
+        posiciones_digitos = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+        digitos = bloque[:, posiciones_digitos].astype(np.int32) - ord('0')
+        separadores_ok = ((bloque[:, [4, 7]] == ord('-')).all() and (bloque[:, 10] == ord(' ')).all()
+                          and (bloque[:, [13, 16]] == ord(':')).all())
+        if not separadores_ok or not ((digitos >= 0) & (digitos <= 9)).all():
+            raise ValueError('Hay fechas con un formato distinto de YYYY-MM-DD HH:MM:SS')
+
+        año = digitos[:, 0] * 1000 + digitos[:, 1] * 100 + digitos[:, 2] * 10 + digitos[:, 3]
+        mes = digitos[:, 4] * 10 + digitos[:, 5]
+        dia = digitos[:, 6] * 10 + digitos[:, 7]
+        hora = digitos[:, 8] * 10 + digitos[:, 9]
+        minuto = digitos[:, 10] * 10 + digitos[:, 11]
+        segundo = digitos[:, 12] * 10 + digitos[:, 13]
+
+        #días desde 1970-01-01 con el algoritmo de calendario civil (los años empiezan en marzo para situar el 29 de febrero al final)
+        año = año - (mes <= 2)
+        era = año // 400
+        año_de_era = año - era * 400
+        dia_del_año = (153 * ((mes + 9) % 12) + 2) // 5 + dia - 1
+        dia_de_era = año_de_era * 365 + año_de_era // 4 - año_de_era // 100 + dia_del_año
+        dias = era.astype(np.int64) * 146097 + dia_de_era - 719468
+
+        #pasamos a segundos desde el origen
+        valores = dias * 86400 + hora * 3600 + minuto * 60 + segundo - origen
+        if valores.min() < np.iinfo(np.int32).min or valores.max() > np.iinfo(np.int32).max:
+            raise ValueError('Hay fechas demasiado lejos del origen para guardarlas en int32')
+        segundos[inicio:inicio + len(bloque)] = valores
+
+    return segundos
+
+def segundos_a_fecha_hora(segundos, origen=INICIO_EXPERIMENTO):
+
+    """
+    Convierte segundos desde un origen (decodificar_fecha_hora) de nuevo en fechas.
+
+    Argumentos:
+    - segundos (ndarray o Series de Pandas): Segundos enteros desde el origen.
+    - origen (str): Fecha de referencia usada al decodificar.
+
+    Devuelve:
+    - fechas (ndarray): Array datetime64[ns] con las fechas.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    #una sola copia a int64; el resto de operaciones se hacen sobre ella
+    nanosegundos = np.array(segundos, dtype=np.int64)
+    nanosegundos += pd.Timestamp(origen).value // 10**9
+    nanosegundos *= 10**9
+
+    return nanosegundos.view('datetime64[ns]')
+
+def _mezclar_hash(h):
+
+    """
+    Mezcla los bits de un array de hashes de 64 bits (finalizador de splitmix64).
+
+    Argumentos:
+    - h (ndarray): Array uint64.
+
+    Devuelve:
+    - h (ndarray): Array uint64 en el que cada bit de entrada afecta a todos los bits de salida.
+    """
+
+    import numpy as np
+
+    #la primera operación crea un array nuevo; el resto se hacen sobre él sin más copias
+    h = h ^ (h >> np.uint64(30))
+    h *= np.uint64(0xbf58476d1ce4e5b9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94d049bb133111eb)
+    h ^= h >> np.uint64(31)
+    return h
+
+def _hash_textos(textos):
+
+    """
+    Calcula un hash de 64 bits de cada texto leyendo directamente el buffer de Arrow.
+
+    Argumentos:
+    - textos (array o Series de Pandas): Textos, como texto de pyarrow u objetos de Python.
+
+    Devuelve:
+    - hashes (ndarray): Array uint64 con el hash de cada texto. Los nulos tienen todos el mismo hash.
+
+    Los bytes de cada texto se leen de 8 en 8 como enteros sobre una vista deslizante del buffer, así que el coste es
+    proporcional a la longitud de los textos y no se crea ningún objeto de Python por fila. El hash solo depende del
+    contenido del texto, de modo que es el mismo en cualquier trozo o archivo.
+    """
+
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    #con objetos de Python los pasamos a Arrow una vez; con texto de pyarrow usamos sus buffers sin copiarlos
+    if isinstance(textos, pd.Series):
+        textos = textos.array
+    if isinstance(getattr(textos, 'dtype', None), pd.StringDtype) and textos.dtype.storage == 'pyarrow':
+        arr = pa.array(textos)
+    else:
+        arr = pa.array(np.asarray(textos, dtype=object), type=pa.string(), from_pandas=True)
+
+    #procesamos cada trozo de Arrow por separado para no tener que unirlos antes
+    trozos = arr.chunks if isinstance(arr, pa.ChunkedArray) else [arr]
+    trozos = [trozo for trozo in trozos if len(trozo)]
+    if not trozos:
+        return np.empty(0, dtype=np.uint64)
+
+    hashes = []
+    for trozo in trozos:
+        tipo_offset = np.int64 if pa.types.is_large_string(trozo.type) else np.int32
+        offsets = np.frombuffer(trozo.buffers()[1], dtype=tipo_offset)[trozo.offset:trozo.offset + len(trozo) + 1].astype(np.int64)
+        inicios, largos = offsets[:-1] - offsets[0], np.diff(offsets)
+
+        #copiamos los bytes con 8 ceros al final para que la última palabra de 8 bytes no se salga del buffer
+        datos = np.zeros(offsets[-1] - offsets[0] + 8, dtype=np.uint8)
+        if trozo.buffers()[2] is not None:
+            datos[:-8] = np.frombuffer(trozo.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+        palabras = np.ndarray(shape=(len(datos) - 7,), dtype='<u8', buffer=datos, strides=(1,))
+
+        #empezamos por la longitud y combinamos cada palabra con una multiplicación (biyectiva, así que dos textos que
+        #difieren en una sola palabra nunca coinciden); los bytes tras el final del texto se ponen a cero
+        h = largos.astype(np.uint64) + np.uint64(0x9e3779b97f4a7c15)
+        minimo = int(largos.min())
+        for posicion in range(0, int(largos.max()), 8):
+            #los textos que ya han terminado leerían más allá del relleno: los llevamos a la última palabra del buffer
+            #(su valor no se usa, la palabra de esos textos se descarta más abajo)
+            indice = inicios + posicion
+            if posicion >= minimo:
+                indice = np.minimum(indice, len(palabras) - 1)
+            palabra = palabras[indice]
+            palabra ^= h
+            palabra *= np.uint64(0x100000001b3)
+            palabra ^= palabra >> np.uint64(29)
+            #solo hace falta recortar la palabra cuando algún texto termina dentro de ella
+            if posicion + 8 > minimo:
+                restantes = largos - posicion
+                recorte = np.where(restantes >= 8, np.uint64(0xffffffffffffffff),
+                                   (np.uint64(1) << (8 * np.clip(restantes, 0, 7)).astype(np.uint64)) - np.uint64(1))
+                palabra = ((palabras[indice] & recorte) ^ h) * np.uint64(0x100000001b3)
+                palabra ^= palabra >> np.uint64(29)
+                palabra = np.where(restantes > 0, palabra, h)
+            h = palabra
+
+        #los nulos tienen un hash fijo distinto del texto vacío
+        h = _mezclar_hash(h)
+        if trozo.null_count:
+            h[trozo.is_null().to_numpy(zero_copy_only=False)] = np.uint64(0x5bd1e9955bd1e995)
+        hashes.append(h)
+
+    return hashes[0] if len(hashes) == 1 else np.concatenate(hashes)
+
+def _hash_columna(serie):
+
+    """
+    Calcula un hash de 64 bits de cada valor de una columna.
+
+    Argumentos:
+    - serie (Series de Pandas): Columna de enteros, decimales, fechas, textos o categorías.
+
+    Devuelve:
+    - hashes (ndarray): Array uint64 con el hash de cada valor.
+
+    El hash depende del valor y no de su representación: una categoría tiene el mismo hash que su texto y un entero
+    el mismo con cualquier ancho (int32, int64, Int32). Los nulos tienen todos el mismo hash.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    nulo = np.uint64(0x5bd1e9955bd1e995)
+
+    #las categorías se resuelven hasheando solo su lista de valores y tomando el hash de cada código
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = _hash_columna(pd.Series(serie.cat.categories))
+        codigos = serie.cat.codes.to_numpy()
+        return np.where(codigos >= 0, categorias[np.maximum(codigos, 0)], nulo)
+
+    if pd.api.types.is_string_dtype(serie.dtype) or serie.dtype == object:
+        return _hash_textos(serie)
+
+    #números y fechas: hasheamos los 64 bits del valor; los enteros se pasan a int64 y los decimales a float64
+    nulos = serie.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        valores = serie.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    elif pd.api.types.is_integer_dtype(serie.dtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        valores = serie.to_numpy(dtype=np.int64, na_value=0)
+    else:
+        valores = serie.to_numpy(dtype=np.float64, na_value=0.0) + 0.0
+    h = _mezclar_hash(valores.view(np.uint64))
+
+    return np.where(nulos, nulo, h)
+
+def _hash_filas(df):
+
+    """
+    Calcula un hash de 64 bits de cada fila de un DataFrame combinando los hashes de sus columnas.
+
+    Argumentos:
+    - df (DataFrame de Pandas): DataFrame.
+
+    Devuelve:
+    - hashes (ndarray): Array uint64 con el hash de cada fila.
+    """
+
+    import numpy as np
+
+    h = np.full(len(df), 0x243f6a8885a308d3, dtype=np.uint64)
+    for columna in df.columns:
+        h = _mezclar_hash(h * np.uint64(0x100000001b3) + _hash_columna(df[columna]))
+
+    return h
+
+def _dias_eventos(df):
+
+    """
+    Calcula el día de cada evento, que es la clave de los conjuntos de hashes por día de _filas_nuevas.
+
+    Argumentos:
+    - df (DataFrame de Pandas): Eventos limpios, con 'date_time' (datetime) o 'segundos' (tiempo compacto).
+
+    Devuelve:
+    - dias (ndarray): Array int64 con los días desde 1970-01-01; las fechas nulas tienen el valor mínimo de int64.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if 'segundos' in df.columns:
+        return (df['segundos'].to_numpy().astype(np.int64) + pd.Timestamp(INICIO_EXPERIMENTO).value // 10**9) // 86400
+
+    fechas = df['date_time'].to_numpy(dtype='datetime64[ns]')
+    dias = fechas.view(np.int64) // (86400 * 10**9)
+    dias[np.isnat(fechas)] = np.iinfo(np.int64).min
+    return dias
+
+def _filas_nuevas(df, vistos=None):
+
+    """
+    Marca las filas de una partición que no están repetidas dentro de ella ni en un conjunto de hashes.
+
+    Argumentos:
+    - df (DataFrame de Pandas): Partición de eventos.
+    - vistos (dict): Día (ver _dias_eventos) -> hashes ordenados (uint64) de las filas de ese día ya conservadas en
+      particiones anteriores. Si es None, solo se buscan duplicados dentro de la partición y 'df' puede tener las fechas
+      sin convertir; si no, 'df' debe estar limpio.
+
+    Devuelve:
+    - nuevas (ndarray): Máscara booleana con la primera aparición de cada fila que no estaba en el conjunto.
+    - vistos (dict): El mismo conjunto, actualizado con las filas nuevas (o None).
+
+    Un duplicado tiene la misma fecha que la fila original, así que cada fila solo se compara con los hashes de su día y
+    solo se actualizan los días que aparecen en la partición: con los eventos en orden de fecha, cada partición toca
+    unos pocos días aunque el conjunto crezca. Los hashes nuevos se insertan en su posición (np.insert sobre
+    np.searchsorted) en lugar de volver a ordenar el día completo.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    hashes = _hash_filas(df)
+
+    #primera aparición de cada hash dentro de la partición
+    nuevas = ~pd.Series(hashes).duplicated(keep='first').to_numpy()
+    if vistos is None:
+        return nuevas, None
+
+    #agrupamos las filas candidatas por día
+    candidatas = np.flatnonzero(nuevas)
+    dias = _dias_eventos(df)[candidatas]
+    orden = np.argsort(dias, kind='stable')
+    candidatas, dias = candidatas[orden], dias[orden]
+    limites = np.flatnonzero(np.diff(dias)) + 1
+
+    for filas, dia in zip(np.split(candidatas, limites), dias[np.r_[0, limites]] if len(dias) else []):
+        dia = int(dia)
+        h = hashes[filas]
+        conjunto = vistos.get(dia)
+
+        #descartamos las que ya están en el conjunto de su día
+        if conjunto is not None and len(conjunto):
+            posiciones = np.minimum(np.searchsorted(conjunto, h), len(conjunto) - 1)
+            repetidas = conjunto[posiciones] == h
+            nuevas[filas[repetidas]] = False
+            h = h[~repetidas]
+
+        #insertamos los hashes nuevos en el conjunto ordenado del día
+        h = np.sort(h)
+        vistos[dia] = h if conjunto is None else np.insert(conjunto, np.searchsorted(conjunto, h), h)
+
+    return nuevas, vistos
+
+def _deduplicar(df, vistos=None):
+
+    """
+    Elimina las filas repetidas de una partición (un archivo o un trozo) y las que ya están en un conjunto de hashes.
+
+    Argumentos:
+    - df (DataFrame de Pandas): Partición de eventos.
+    - vistos (dict): Conjunto de hashes por día de las filas ya conservadas en particiones anteriores (ver _filas_nuevas).
+      Si es None, solo se eliminan los duplicados dentro de la partición.
+
+    Devuelve:
+    - df (DataFrame de Pandas): Partición sin duplicados, conservando la primera aparición y su índice. Si no hay
+      duplicados es el mismo DataFrame, sin copiarlo.
+    - vistos (dict): Conjunto de hashes actualizado con las filas nuevas.
+    - duplicados (int): Número de filas eliminadas.
+
+    Cada fila se reduce a un hash de 64 bits, así que el conjunto ocupa 8 bytes por evento único de los días que se
+    guardan. Dos filas distintas solo se confundirían si sus hashes coinciden, algo improbable (del orden de n² / 2^65
+    para n filas).
+    """
+
+    import numpy as np
+
+    nuevas, vistos = _filas_nuevas(df, vistos)
+
+    duplicados = int(len(df) - nuevas.sum())
+    if duplicados:
+        df = df.take(np.flatnonzero(nuevas))
+
+    return df, vistos, duplicados
+
+def limpiar_web(df_final_web_data, tiempo_compacto=False, deduplicar=True, informe=None, errores_fecha='raise', ordenar=False,
+                conservar_desconocidos=False):
+
+    """
+    Limpia el DataFrame de eventos web: elimina duplicados y convierte la columna 'date_time' a datetime.
+
+    Argumentos:
+    - df_final_web_data (DataFrame de Pandas): DataFrame (o trozo) que contiene los datos web finales.
+    - tiempo_compacto (bool): Si es True, sustituye 'date_time' por la columna 'segundos' (int32, segundos desde INICIO_EXPERIMENTO).
+      Para recuperar las fechas se usa segundos_a_fecha_hora.
+    - deduplicar (bool): Si es False, no elimina duplicados (cuando ya lo ha hecho quien llama, por ejemplo por particiones).
+    - informe (list): Si se indica, se añade la memoria y el tiempo de cada etapa (duplicados, fechas, filtrado).
+    - errores_fecha (str): 'raise' para fallar si alguna fecha no tiene el formato esperado, o 'coerce' para dejarla como NaT
+      (la validación de limpiar_dataframes la manda después a cuarentena).
+    - ordenar (bool): Si es True, deja los eventos ordenados por cliente, visita y fecha (ver ordenar_web).
+    - conservar_desconocidos (bool): Si es False, los pasos que no están en PASOS_PROCESO pasan a ser nulos. Si es True,
+      se conservan para que validar_dataframes los cuente y los mande a cuarentena.
+
+    Devuelve:
+    - df_final_web_data (DataFrame de Pandas): DataFrame modificado de los datos web finales.
+
+    Los duplicados se detectan con un hash de 64 bits por fila (_filas_nuevas) en lugar de comparar todas las columnas.
+    Las fechas se convierten antes de quitar los duplicados, de modo que la única copia de la tabla (al quedarse con las
+    filas únicas) ya no incluye los textos de las fechas. Si se ordena, el orden se aplica en esa misma copia.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    #dejamos process_step con las categorías del esquema (sin copiar nada si no hay pasos desconocidos)
+    _categorias_esquema(df_final_web_data, {'process_step': ESQUEMA_WEB['process_step']}, desconocidos=conservar_desconocidos, solo_categoricas=True)
+
+    #marcamos los valores duplicados de df_final_web_data
+    nuevas = None
+    if deduplicar:
+        inicio = _inicio_etapa(informe)
+        nuevas, _ = _filas_nuevas(df_final_web_data)
+        duplicados = int(len(nuevas) - nuevas.sum())
+        print(f'{duplicados} eventos duplicados eliminados')
+        _fin_etapa(informe, 'duplicados', inicio)
+
+    inicio = _inicio_etapa(informe)
+    if tiempo_compacto:
+        #guardamos las fechas como segundos enteros desde el inicio del experimento
+        df_final_web_data['segundos'] = decodificar_fecha_hora(df_final_web_data['date_time'])
+        del df_final_web_data['date_time']
+    else:
+        #cambiamos el formato de la columna 'date_time' a datetime.
+        #con texto de pyarrow el decodificador de formato fijo es más rápido; si alguna fecha no encaja (nulos, otro formato) usamos pandas
+        fechas = df_final_web_data["date_time"]
+        convertidas = None
+        if isinstance(fechas.dtype, pd.StringDtype) and fechas.dtype.storage == 'pyarrow':
+            try:
+                convertidas = segundos_a_fecha_hora(decodificar_fecha_hora(fechas))
+            except ValueError:
+                pass
+        if convertidas is None:
+            convertidas = pd.to_datetime(fechas, format='%Y-%m-%d %H:%M:%S', errors=errores_fecha)
+        del fechas
+        df_final_web_data["date_time"] = convertidas
+    _fin_etapa(informe, 'fechas', inicio)
+
+    #calculamos el orden por cliente, visita y fecha (si la tabla no lo está ya)
+    orden = None
+    if ordenar:
+        inicio = _inicio_etapa(informe)
+        claves = ('client_id', 'visit_id', 'segundos' if tiempo_compacto else 'date_time')
+        if not esta_ordenado(df_final_web_data, claves):
+            orden = _orden_sesiones(df_final_web_data, claves)
+        _fin_etapa(informe, 'orden', inicio)
+
+    #nos quedamos con las filas únicas en su orden; es la única copia de la tabla y solo se hace si hay duplicados o desorden
+    if orden is not None or (nuevas is not None and not nuevas.all()):
+        inicio = _inicio_etapa(informe)
+        filas = np.flatnonzero(nuevas) if orden is None else orden
+        if orden is not None and nuevas is not None:
+            filas = filas[nuevas[filas]]
+        df_final_web_data = df_final_web_data.take(filas)
+        _fin_etapa(informe, 'filtrado', inicio)
+
+    return df_final_web_data
+
+def limpiar_exp(df_exp, conservar_desconocidos=False):
+
+    """
+    Limpia el DataFrame de experimentos de clientes.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - conservar_desconocidos (bool): Si es False, las variaciones desconocidas pasan a ser nulas y se eliminan con el resto
+      de nulos. Si es True, se conservan para que validar_dataframes las cuente y las mande a cuarentena.
+
+    Devuelve:
+    - df_exp (DataFrame de Pandas): DataFrame modificado de los datos de experimentos de clientes.
+
+    Como limpiar_demo y limpiar_web, modifica el DataFrame recibido en lugar de crear copias.
+    """
+
+    #cambiamos el nombre de la columna Variation a variation
+    df_exp.rename(columns={'Variation': 'variation'}, inplace=True)
+    _categorias_esquema(df_exp, {'variation': ESQUEMA_EXP['Variation']}, desconocidos=conservar_desconocidos, solo_categoricas=True)
+
+    #eliminamos datos nulos (dropna copia la tabla aunque no haya nulos, así que solo lo llamamos si los hay)
+    if df_exp.isna().to_numpy().any():
+        df_exp.dropna(inplace=True)
+
+    return df_exp
+
+def validar_dataframes(df_final_demo, df_final_web_data, df_exp, cuarentena=None):
+
+    """
+    Comprueba las tablas ya limpias y aparta las filas que no cumplen las reglas, sin detener el proceso.
+
+    Argumentos:
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de datos demográficos.
+    - df_final_web_data (DataFrame de Pandas): DataFrame limpio de datos web.
+    - df_exp (DataFrame de Pandas): DataFrame limpio de experimentos de clientes.
+    - cuarentena (dict): Si se indica, se guardan en él las filas apartadas de cada tabla ('demo', 'web', 'exp'), con una
+      columna 'motivo' que enumera las reglas que incumplen.
+
+    Devuelve:
+    - df_final_demo, df_final_web_data, df_exp (DataFrames de Pandas): Tablas sin las filas que incumplen alguna regla.
+    - df_informe (DataFrame de Pandas): Número de filas que incumplen cada regla, por tabla.
+
+    Reglas:
+    - demo: client_id nulo o repetido.
+    - web: client_id nulo, visit_id nulo, process_step nulo, process_step desconocido, date_time nula o fuera del
+      experimento [INICIO_EXPERIMENTO, FIN_EXPERIMENTO).
+    - exp: client_id nulo o repetido, variación desconocida, cliente que no está en demo.
+
+    Cada tabla se recorre una sola vez: todas las reglas se evalúan como máscaras vectorizadas y las filas válidas se
+    seleccionan de una vez (sin copiar la tabla si todas son válidas). Los pasos y variaciones desconocidos solo llegan
+    aquí si las tablas se han limpiado con conservar_desconocidos=True; las tablas devueltas vuelven a tener las
+    categorías del esquema.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    web = df_final_web_data
+    pasos = ESQUEMA_WEB['process_step']
+    variaciones = ESQUEMA_EXP['Variation']
+    reglas = {
+        'demo': {'client_id nulo': df_final_demo['client_id'].isna(),
+                 'client_id repetido': df_final_demo['client_id'].duplicated(keep='first')},
+        'web': {'client_id nulo': web['client_id'].isna(),
+                'visit_id nulo': web['visit_id'].isna(),
+                'process_step nulo': web['process_step'].isna(),
+                'process_step desconocido': web['process_step'].notna() & ~web['process_step'].isin(pasos),
+                'date_time nula': web['date_time'].isna(),
+                'date_time fuera del experimento': (web['date_time'] < pd.Timestamp(INICIO_EXPERIMENTO))
+                                                   | (web['date_time'] >= pd.Timestamp(FIN_EXPERIMENTO))},
+        'exp': {'client_id nulo': df_exp['client_id'].isna(),
+                'client_id repetido': df_exp['client_id'].duplicated(keep='first'),
+                'variación desconocida': df_exp['variation'].notna() & ~df_exp['variation'].isin(variaciones),
+                'cliente sin datos demográficos': ~df_exp['client_id'].isin(df_final_demo['client_id'])}}
+    tablas = {'demo': df_final_demo, 'web': df_final_web_data, 'exp': df_exp}
+
+    filas = []
+    for nombre, mascaras in reglas.items():
+        df = tablas[nombre]
+        #una matriz filas x reglas con todas las comprobaciones de la tabla
+        matriz = np.column_stack([np.asarray(mascara, dtype=bool) for mascara in mascaras.values()]) if len(df) else np.zeros((0, len(mascaras)), dtype=bool)
+        for regla, n in zip(mascaras, matriz.sum(axis=0)):
+            filas.append({'tabla': nombre, 'regla': regla, 'filas': int(n)})
+
+        malas = matriz.any(axis=1)
+        if not malas.any():
+            continue
+
+        #apartamos las filas que incumplen alguna regla indicando cuáles
+        if cuarentena is not None:
+            nombres_reglas = np.array(list(mascaras), dtype=object)
+            df_malas = df.take(np.flatnonzero(malas))
+            df_malas['motivo'] = [', '.join(nombres_reglas[fila]) for fila in matriz[malas]]
+            cuarentena[nombre] = df_malas
+        tablas[nombre] = df.take(np.flatnonzero(~malas))
+
+    df_informe = pd.DataFrame(filas)
+
+    #sin las filas apartadas, las categóricas vuelven a tener solo las categorías del esquema
+    _categorias_esquema(tablas['web'], {'process_step': pasos}, desconocidos=False, solo_categoricas=True)
+    _categorias_esquema(tablas['exp'], {'variation': variaciones}, desconocidos=False, solo_categoricas=True)
+
+    return tablas['demo'], tablas['web'], tablas['exp'], df_informe
+
+def limpiar_dataframes(df_final_demo, df_final_web_data, df_exp, informe=None, validar=False, cuarentena=None):
+
+    """
+    Realiza operaciones de limpieza en DataFrames específicos.
+
+    Argumentos:
+    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - informe (list): Si se indica, se añade la memoria y el tiempo de cada etapa de la limpieza (ver informe_memoria_limpieza).
+    - validar (bool): Si es True, después de limpiar comprueba las tablas con validar_dataframes, imprime cuántas filas
+      incumplen cada regla y las quita de las tablas. Las fechas con formato inválido se convierten en NaT en lugar de fallar
+      y los pasos y variaciones desconocidos se conservan hasta la validación.
+    - cuarentena (dict): Con validar=True, diccionario donde se guardan las filas apartadas de cada tabla.
+
+    Devuelve:
+    - df_final_demo (DataFrame de Pandas): DataFrame modificado de los datos finales de demostración.
+    - df_final_web_data (DataFrame de Pandas): DataFrame modificado de los datos web finales.
+    - df_exp (DataFrame de Pandas): DataFrame modificado de los datos de experimentos de clientes.
+
+    Realiza varias operaciones de limpieza en los DataFrames proporcionados con limpiar_demo, limpiar_web y limpiar_exp.
+    Los DataFrames recibidos se modifican en su sitio; solo se copian los datos web si hay duplicados que quitar o hay
+    que ordenarlos. Los datos web quedan ordenados por cliente, visita y fecha, de modo que la sesionización no los reordena.
+    """
+
+    inicio = _inicio_etapa(informe)
+    df_final_demo = limpiar_demo(df_final_demo)
+    _fin_etapa(informe, 'demo', inicio)
+
+    df_final_web_data = limpiar_web(df_final_web_data, informe=informe, errores_fecha='coerce' if validar else 'raise', ordenar=True,
+                                    conservar_desconocidos=validar)
+
+    inicio = _inicio_etapa(informe)
+    df_exp = limpiar_exp(df_exp, conservar_desconocidos=validar)
+    _fin_etapa(informe, 'exp', inicio)
+
+    #apartamos las filas que no cumplen las reglas de validación
+    if validar:
+        inicio = _inicio_etapa(informe)
+        df_final_demo, df_final_web_data, df_exp, df_validacion = validar_dataframes(df_final_demo, df_final_web_data, df_exp, cuarentena)
+        _fin_etapa(informe, 'validación', inicio)
+        incumplidas = df_validacion[df_validacion['filas'] > 0]
+        if len(incumplidas):
+            print('Filas apartadas en la validación:')
+            print(incumplidas.to_string(index=False))
+        else:
+            print('Validación correcta: todas las filas cumplen las reglas')
+
+    return df_final_demo, df_final_web_data, df_exp
+
+def informe_memoria_limpieza(yalm_path, usar_cache=True):
+
+    """
+    Mide el pico de memoria residente (RSS) y el tiempo de cada etapa de la carga y limpieza de los datos.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML que contiene la información de los archivos CSV.
+    - usar_cache (bool): Si es True, lee los datos desde la caché Parquet.
+
+    Devuelve:
+    - df_informe (DataFrame de Pandas): DataFrame con una fila por etapa (lectura web, concatenación, demo, duplicados,
+      fechas, filtrado, exp): segundos, RSS al inicio, pico, RSS al final y pico por encima del inicio, en MB.
+
+    El pico de cada etapa se mide reiniciando VmHWM con /proc/self/clear_refs, así que solo es exacto en Linux.
+    Se imprime también el tamaño final de los datos limpios para compararlo con los picos.
+    """
+
+    import pandas as pd
+
+    informe = []
+    df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(*leer_datos(yalm_path, usar_cache=usar_cache, informe=informe),
+                                                                  informe=informe)
+
+    df_informe = pd.DataFrame(informe)
+    print(df_informe.to_string(index=False, float_format='{:.2f}'.format))
+    tamaño = sum(df.memory_usage(deep=True).sum() for df in (df_final_demo, df_final_web_data, df_exp)) / 2**20
+    print(f'Tamaño final de los datos limpios: {tamaño:.1f} MB')
+
+    return df_informe
+
+def leer_datos_stream(yalm_path, chunksize=500_000, ventana_dias=None):
+
+    """
+    Lee los datos web por trozos de tamaño fijo, ya tipados y limpios, sin cargar el conjunto completo en memoria.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML que contiene la información de los archivos CSV.
+    - chunksize (int): Número de filas que se leen en cada trozo.
+    - ventana_dias (int): Si se indica, solo se guardan los hashes de los días que están a menos de 'ventana_dias' días del
+      evento más reciente leído, así que la memoria queda acotada por la ventana y no por el total de eventos.
+
+    Devuelve:
+    - Generador de DataFrames de Pandas con los eventos web de cada trozo, limpios con limpiar_web.
+
+    Los duplicados se eliminan también entre trozos: se guarda un hash de 64 bits de cada fila ya emitida, agrupados por
+    día (_deduplicar), de modo que la memoria crece 8 bytes por evento único en lugar del tamaño de la fila completa.
+    Con 'ventana_dias' los días que salen de la ventana se olvidan: con las exportaciones en orden de fecha el resultado
+    es el mismo, y si llegan eventos de un día ya olvidado solo se comparan con los de su trozo y se avisa de cuántos son.
+    Al terminar se imprime el total de duplicados eliminados, igual que con la lectura completa.
+
+    Ejemplo de uso:
+    df_final_demo, _, df_exp = leer_datos(yalm_path, incluir_web=False)
+    tasa = calcular_tasa_conversion(limpiar_exp(df_exp), leer_datos_stream(yalm_path))
+    """
+
+    import pandas as pd
+    import yaml
+
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
+
+    #traducimos el esquema igual que en la lectura completa
+    tipos = _tipos_esquema(ESQUEMA_WEB)
+
+    #hashes ordenados de las filas ya emitidas, por día
+    vistos = {}
+    duplicados = 0
+    ultimo_dia, tardios = None, 0
+
+    for ruta in _partes_web(config):
+        for chunk in pd.read_csv(ruta, sep=",", header=0, dtype=tipos, chunksize=chunksize, compression=_compresion(ruta)):
+
+            #limpiamos el trozo y descartamos las filas repetidas dentro de él y las que ya aparecieron en trozos anteriores
+            chunk = limpiar_web(chunk, deduplicar=False)
+            if ventana_dias is not None and len(chunk):
+                dias = _dias_eventos(chunk)
+                if ultimo_dia is not None:
+                    tardios += int((dias <= ultimo_dia - ventana_dias).sum())
+                ultimo_dia = int(dias.max()) if ultimo_dia is None else max(ultimo_dia, int(dias.max()))
+            chunk, vistos, n = _deduplicar(chunk, vistos)
+            duplicados += n
+
+            #olvidamos los días que han salido de la ventana
+            if ventana_dias is not None and ultimo_dia is not None:
+                for dia in [dia for dia in vistos if dia <= ultimo_dia - ventana_dias]:
+                    del vistos[dia]
+
+            yield chunk
+
+    print(f'{duplicados} eventos duplicados eliminados')
+    if tardios:
+        print(f'Aviso: {tardios} eventos llegaron después de que su día saliera de la ventana de {ventana_dias} días')
+
+def actualizar_incremental(yalm_path, reconstruir=False):
+
+    """
+    Añade al histórico limpio de datos web solo las partes nuevas, sin volver a leer ni limpiar el histórico completo.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML. Debe definir 'incremental: dir' con la carpeta del histórico.
+    - reconstruir (bool): Si es True, borra el histórico y el estado y vuelve a procesar todas las partes.
+
+    Devuelve:
+    - df_nuevos (DataFrame de Pandas): DataFrame con los eventos añadidos en esta actualización, ya limpios.
+
+    En la carpeta se guarda un estado (estado.json) con la marca de agua (la fecha del evento más reciente), las partes ya
+    procesadas y los archivos de hashes, un archivo Parquet limpio por parte en 'historico/' y, en 'hashes/', un archivo
+    por día con los hashes de 64 bits de los eventos de ese día del histórico. Cada parte nueva se limpia con limpiar_web y
+    sus filas se comparan solo con los hashes de sus días (_deduplicar): un duplicado tiene la misma fecha, así que no
+    puede estar en otro día. Si la parte empieza después de la marca de agua no se carga ningún hash, así que el coste
+    depende de la parte nueva y no del histórico.
+    Los hashes de los días que cambian se escriben con un nombre nuevo antes de apuntarlos en el estado, así que el estado
+    y los hashes siempre corresponden a las mismas partes aunque el proceso se interrumpa.
+    """
+
+    import os
+    import json
+    import shutil
+    import numpy as np
+    import pandas as pd
+    import yaml
+
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
+
+    carpeta = config['incremental']['dir']
+    carpeta_historico = os.path.join(carpeta, 'historico')
+    carpeta_hashes = os.path.join(carpeta, 'hashes')
+    ruta_estado = os.path.join(carpeta, 'estado.json')
+
+    if reconstruir and os.path.exists(carpeta):
+        shutil.rmtree(carpeta)
+    os.makedirs(carpeta_historico, exist_ok=True)
+    os.makedirs(carpeta_hashes, exist_ok=True)
+
+    #leemos el estado de la última actualización
+    estado = {'watermark': None, 'partes': {}, 'hashes': {}}
+    if os.path.exists(ruta_estado):
+        with open(ruta_estado, 'r') as file:
+            estado = json.load(file)
+
+    def guardar_estado(vistos, generacion):
+        #escribimos los hashes de los días que han cambiado con un nombre nuevo, después el estado y al final borramos los anteriores
+        anteriores = []
+        for dia, conjunto in vistos.items():
+            nombre = f'{dia}_{generacion:06d}.npy'
+            np.save(os.path.join(carpeta_hashes, nombre), conjunto)
+            if estado['hashes'].get(str(dia)) not in (None, nombre):
+                anteriores.append(estado['hashes'][str(dia)])
+            estado['hashes'][str(dia)] = nombre
+        with open(ruta_estado + '.tmp', 'w') as file:
+            json.dump(estado, file)
+        os.replace(ruta_estado + '.tmp', ruta_estado)
+        for nombre in anteriores:
+            os.remove(os.path.join(carpeta_hashes, nombre))
+
+    #buscamos las partes que aún no se han procesado
+    nuevas = []
+    for ruta in _partes_web(config):
+        huella = _huella_archivo(ruta, con_hash=False)
+        if ruta not in estado['partes']:
+            nuevas.append((ruta, huella))
+        elif estado['partes'][ruta] != huella:
+            print(f'Aviso: {ruta} ha cambiado desde que se procesó; usa reconstruir=True para volver a incorporarla')
+
+    añadidos = []
+    for ruta, huella in nuevas:
+        #leemos y limpiamos solo la parte nueva
+        df_parte = limpiar_web(_leer_csv_tipado(ruta, ESQUEMA_WEB), deduplicar=False)
+
+        #cargamos los hashes del histórico solo para los días de la parte, y solo si se solapa con el histórico
+        watermark = pd.Timestamp(estado['watermark']) if estado['watermark'] else None
+        vistos = {}
+        if len(df_parte) and watermark is not None and df_parte['date_time'].min() <= watermark:
+            for dia in np.unique(_dias_eventos(df_parte)).tolist():
+                if str(dia) in estado['hashes']:
+                    vistos[dia] = np.load(os.path.join(carpeta_hashes, estado['hashes'][str(dia)]))
+        cargados = {dia: len(conjunto) for dia, conjunto in vistos.items()}
+
+        #quitamos los duplicados internos de la parte y los que ya están en el histórico
+        df_parte, vistos, duplicados = _deduplicar(df_parte, vistos)
+        df_parte = df_parte.reset_index(drop=True)
+
+        #guardamos la parte limpia en el histórico
+        if len(df_parte):
+            nombre = f'parte_{len(estado["partes"]):06d}.parquet'
+            df_parte.to_parquet(os.path.join(carpeta_historico, nombre), index=False, row_group_size=100_000)
+            maximo = df_parte['date_time'].max()
+            estado['watermark'] = str(maximo if watermark is None else max(watermark, maximo))
+
+        #actualizamos los hashes de los días con eventos nuevos y el estado después de cada parte para poder retomar si el proceso se interrumpe
+        estado['partes'][ruta] = huella
+        guardar_estado({dia: conjunto for dia, conjunto in vistos.items() if len(conjunto) != cargados.get(dia)}, len(estado['partes']))
+
+        print(f'{os.path.basename(ruta)}: {len(df_parte)} eventos nuevos, {duplicados} duplicados')
+        añadidos.append(df_parte)
+
+    if not añadidos:
+        return pd.DataFrame(columns=list(ESQUEMA_WEB))
+
+    return pd.concat(añadidos, ignore_index=True)
+
+def _leer_historico(carpeta_historico, desde=None):
+
+    """
+    Lee los eventos del histórico incremental, opcionalmente solo desde una fecha.
+
+    Argumentos:
+    - carpeta_historico (str): Carpeta con los archivos Parquet del histórico.
+    - desde (Timestamp): Si se indica, solo se leen los eventos con fecha mayor o igual. Los archivos y grupos de filas
+      cuyas estadísticas quedan fuera de la ventana no se leen.
+
+    Devuelve:
+    - df (DataFrame de Pandas): DataFrame con los eventos limpios del histórico.
+    """
+
+    import os
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    archivos = sorted(os.path.join(carpeta_historico, nombre) for nombre in os.listdir(carpeta_historico) if nombre.endswith('.parquet'))
+    if not archivos:
+        return pd.DataFrame(columns=list(ESQUEMA_WEB))
+
+    dataset = ds.dataset(archivos, format='parquet')
+    filtro = ds.field('date_time') >= pa.scalar(pd.Timestamp(desde), type=pa.timestamp('ns')) if desde is not None else None
+    textos = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+    df = dataset.to_table(filter=filtro).to_pandas(types_mapper=textos.get)
+
+    #alineamos las categorías con el esquema
+    return df.astype({'process_step': _tipos_esquema(ESQUEMA_WEB)['process_step']})
+
+def leer_historico(yalm_path):
+
+    """
+    Lee el histórico limpio de datos web que mantiene actualizar_incremental.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML. Debe definir 'incremental: dir'.
+
+    Devuelve:
+    - df_final_web_data (DataFrame de Pandas): DataFrame limpio con todos los eventos web incorporados hasta ahora.
+    """
+
+    import os
+    import yaml
+
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
+
+    return _leer_historico(os.path.join(config['incremental']['dir'], 'historico'))
+
+def guardar_datos_compartidos(df_final_demo, df_final_web_data, df_exp, carpeta):
+
+    """
+    Guarda las tablas limpias como archivos Arrow IPC (Feather) sin comprimir para abrirlas con memoria mapeada.
+
+    Argumentos:
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de los datos finales de demostración.
+    - df_final_web_data (DataFrame de Pandas): DataFrame limpio de los datos web finales.
+    - df_exp (DataFrame de Pandas): DataFrame limpio de los datos de experimentos de clientes.
+    - carpeta (str): Carpeta donde se guardan los archivos .arrow.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente guarda los archivos.
+
+    Cada archivo se escribe primero con un nombre temporal y después se reemplaza, de modo que los procesos
+    que ya lo tienen abierto siguen leyendo la versión anterior sin errores.
+    """
+
+    import os
+    import pyarrow.feather as feather
+
+    os.makedirs(carpeta, exist_ok=True)
+
+    for nombre, df in [('df_final_demo', df_final_demo), ('df_final_web_data', df_final_web_data), ('df_exp', df_exp)]:
+        ruta = os.path.join(carpeta, f'{nombre}.arrow')
+        #sin compresión para que los buffers del archivo se puedan usar directamente desde la memoria mapeada
+        feather.write_feather(df.reset_index(drop=True), f'{ruta}.{os.getpid()}.tmp', compression='uncompressed')
+        os.replace(f'{ruta}.{os.getpid()}.tmp', ruta)
+
+def abrir_datos_compartidos(carpeta):
+
+    """
+    Abre las tablas guardadas con guardar_datos_compartidos usando memoria mapeada.
+
+    Argumentos:
+    - carpeta (str): Carpeta donde están los archivos .arrow, o carpeta de cargar_datos con 'manifiesto.json', en cuyo
+      caso se abre la generación que indica el manifiesto.
+
+    Devuelve:
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de los datos finales de demostración.
+    - df_final_web_data (DataFrame de Pandas): DataFrame limpio de los datos web finales.
+    - df_exp (DataFrame de Pandas): DataFrame limpio de los datos de experimentos de clientes.
+
+    Las columnas apuntan a las páginas del archivo, que el sistema operativo comparte entre todos los procesos que lo abren.
+    Los DataFrames son de solo lectura en la práctica: modificar una columna en el sitio crea una copia privada de esa columna.
+    Las tres tablas se abren siempre de la misma generación. Si otro proceso la borra mientras se abre (porque ha
+    regenerado los datos), se vuelve a leer el manifiesto y se abre la nueva.
+    """
+
+    import os
+    import json
+    import pandas as pd
+    import pyarrow as pa
+
+    #mapeamos los textos de Arrow a texto de pandas respaldado por pyarrow, que no copia los datos
+    textos = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+
+    ruta_manifiesto = os.path.join(carpeta, 'manifiesto.json')
+    for intento in range(3):
+        directorio = carpeta
+        if os.path.exists(ruta_manifiesto):
+            with open(ruta_manifiesto, 'r') as file:
+                directorio = os.path.join(carpeta, json.load(file)['generacion'])
+        try:
+            tablas = []
+            for nombre in ['df_final_demo', 'df_final_web_data', 'df_exp']:
+                fuente = pa.memory_map(os.path.join(directorio, f'{nombre}.arrow'), 'r')
+                tabla = pa.ipc.open_file(fuente).read_all()
+                #split_blocks evita que pandas consolide las columnas en bloques nuevos (lo que obligaría a copiarlas)
+                tablas.append(tabla.to_pandas(types_mapper=textos.get, split_blocks=True))
+            return tuple(tablas)
+        except FileNotFoundError:
+            #la generación se ha borrado mientras la abríamos; el manifiesto ya apunta a otra
+            if intento == 2 or directorio == carpeta:
+                raise
+
+def cargar_datos(yalm_path):
+
+    """
+    Lee y limpia los datos, usando tablas en memoria compartida si el YAML define 'memoria_compartida: dir'.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML que contiene la información de los archivos CSV.
+
+    Devuelve:
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de los datos finales de demostración.
+    - df_final_web_data (DataFrame de Pandas): DataFrame limpio de los datos web finales.
+    - df_exp (DataFrame de Pandas): DataFrame limpio de los datos de experimentos de clientes.
+
+    Con la opción activada, el primer proceso guarda las tablas limpias como archivos Arrow y todos los procesos (sesiones de
+    Streamlit, pipeline por lotes) las abren mapeadas, compartiendo una única copia en memoria. Las tablas se regeneran cuando
+    cambia el tamaño o la fecha de modificación de algún archivo de origen, los esquemas o VERSION_DATOS_COMPARTIDOS.
+
+    Cada regeneración escribe las tablas en una carpeta nueva ('generacion_...') y después reemplaza de una vez el
+    manifiesto, que indica qué generación está vigente. Así un proceso que lee mientras otro regenera nunca mezcla tablas
+    de generaciones distintas. La generación anterior se borra después; quien ya la tenía mapeada la sigue leyendo.
+    """
+
+    import os
+    import json
+    import shutil
+    import tempfile
+    import yaml
+
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
+
+    #sin la opción, leemos y limpiamos en memoria privada como hasta ahora
+    carpeta = (config.get('memoria_compartida') or {}).get('dir')
+    if not carpeta:
+        return limpiar_dataframes(*leer_datos(yalm_path))
+
+    #comprobamos si las tablas guardadas corresponden a los archivos de origen actuales
+    fuentes = [config['data']['demo_final'], config['data']['exp_client']] + _partes_web(config)
+    #la versión y los esquemas invalidan las tablas guardadas por una versión anterior del código
+    manifiesto = {'version': VERSION_DATOS_COMPARTIDOS,
+                  'esquemas': {'demo': ESQUEMA_DEMO, 'web': ESQUEMA_WEB, 'exp': ESQUEMA_EXP},
+                  'fuentes': {ruta: _huella_archivo(ruta, con_hash=False) for ruta in fuentes}}
+    ruta_manifiesto = os.path.join(carpeta, 'manifiesto.json')
+    anterior = None
+    if os.path.exists(ruta_manifiesto):
+        with open(ruta_manifiesto, 'r') as file:
+            anterior = json.load(file)
+        if {clave: valor for clave, valor in anterior.items() if clave != 'generacion'} == manifiesto:
+            return abrir_datos_compartidos(carpeta)
+
+    #regeneramos las tablas compartidas en una generación nueva, que nadie lee hasta que el manifiesto apunte a ella
+    df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(*leer_datos(yalm_path))
+    os.makedirs(carpeta, exist_ok=True)
+    generacion = tempfile.mkdtemp(prefix='generacion_', dir=carpeta)
+    guardar_datos_compartidos(df_final_demo, df_final_web_data, df_exp, generacion)
+    manifiesto['generacion'] = os.path.basename(generacion)
+
+    #el manifiesto se escribe con un nombre temporal y se reemplaza, para que otro proceso nunca lea uno a medias
+    temporal = f'{ruta_manifiesto}.{os.getpid()}.tmp'
+    with open(temporal, 'w') as file:
+        json.dump(manifiesto, file)
+    os.replace(temporal, ruta_manifiesto)
+
+    #borramos la generación que estaba vigente (o las tablas sueltas de las versiones sin generaciones)
+    if anterior is not None and anterior.get('generacion'):
+        shutil.rmtree(os.path.join(carpeta, anterior['generacion']), ignore_errors=True)
+    elif anterior is not None:
+        for nombre in ['df_final_demo', 'df_final_web_data', 'df_exp']:
+            if os.path.exists(os.path.join(carpeta, f'{nombre}.arrow')):
+                os.remove(os.path.join(carpeta, f'{nombre}.arrow'))
+
+    return abrir_datos_compartidos(carpeta)
+
+def _memoria_proceso():
+
+    """
+    Devuelve la memoria residente (RSS) y proporcional (PSS) del proceso actual en MB.
+
+    Devuelve:
+    - rss, pss (float): RSS cuenta completas las páginas compartidas; PSS las reparte entre los procesos que las comparten.
+
+    En sistemas sin /proc/self/smaps_rollup (fuera de Linux), las dos se aproximan con _rss_sin_proc (NaN si no se puede medir).
+    """
+
+    try:
+        memoria = {}
+        with open('/proc/self/smaps_rollup', 'r') as file:
+            for linea in file:
+                partes = linea.split()
+                if partes[0] in ('Rss:', 'Pss:'):
+                    memoria[partes[0]] = int(partes[1]) / 1024
+        return memoria['Rss:'], memoria['Pss:']
+    except OSError:
+        rss = _rss_sin_proc()
+        return rss, rss
+
+def _sesion_de_prueba(yalm_path, compartida, barrera, resultados):
+
+    """
+    Simula una sesión que carga los datos y los recorre, y anota su memoria mientras el resto de sesiones siguen vivas.
+    """
+
+    import yaml
+
+    if compartida:
+        with open(yalm_path, 'r') as file:
+            config = yaml.safe_load(file)
+        df_final_demo, df_final_web_data, df_exp = abrir_datos_compartidos(config['memoria_compartida']['dir'])
+    else:
+        df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(*leer_datos(yalm_path))
+
+    #recorremos los datos como haría un gráfico para que todas las páginas estén cargadas
+    calcular_tiempo_permanencia(df_exp, df_final_web_data)
+
+    #esperamos a que todas las sesiones hayan cargado los datos antes de medir
+    barrera.wait()
+    resultados.put(_memoria_proceso())
+    barrera.wait()
+
+def comparar_memoria_sesiones(yalm_path, n_sesiones=4):
+
+    """
+    Compara la memoria total de N sesiones concurrentes con copias privadas de los datos y con tablas en memoria compartida.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML. Debe definir 'memoria_compartida: dir'.
+    - n_sesiones (int): Número de procesos que cargan los datos a la vez, como N sesiones de app.py.
+
+    Devuelve:
+    - df_memoria (DataFrame de Pandas): DataFrame con la suma de RSS y de PSS (MB) de las sesiones en cada modo.
+
+    La suma de PSS es la memoria física real que ocupan las sesiones; la suma de RSS cuenta varias veces las páginas compartidas.
+    """
+
+    import multiprocessing
+    import pandas as pd
+
+    #preparamos las tablas compartidas antes de lanzar las sesiones
+    cargar_datos(yalm_path)
+
+    contexto = multiprocessing.get_context('spawn')
+    filas = []
+    for compartida in [False, True]:
+        barrera = contexto.Barrier(n_sesiones)
+        resultados = contexto.Queue()
+        procesos = [contexto.Process(target=_sesion_de_prueba, args=(yalm_path, compartida, barrera, resultados)) for _ in range(n_sesiones)]
+        for proceso in procesos:
+            proceso.start()
+        memoria = [resultados.get() for _ in procesos]
+        for proceso in procesos:
+            proceso.join()
+        filas.append({'modo': 'compartida' if compartida else 'privada', 'sesiones': n_sesiones,
+                      'rss_total_mb': sum(rss for rss, _ in memoria), 'pss_total_mb': sum(pss for _, pss in memoria)})
+
+    df_memoria = pd.DataFrame(filas)
+    print(df_memoria.to_string(index=False))
+
+    return df_memoria
+
+def crear_dataframe_principales_clientes(df_final_demo):
+
+    """
+    Crea un nuevo DataFrame con los principales clientes basados en el dinero total de sus cuentas.
+
+    Argumentos:
+    - df_final_demo (DataFrame de Pandas): DataFrame que contiene los datos finales de demostración.
+
+    Devuelve:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene únicamente los datos de los principales clientes.
+
+    Esta función calcula los principales clientes basados en el dinero total de sus cuentas en el DataFrame proporcionado.
+    Luego, filtra el DataFrame original solo para incluir los datos de los clientes principales y retorna este nuevo DataFrame.
+    """
+
+    import pandas as pd
+
+    #calcular los principales clientes basados en el dinero total de sus cuentas
+    clientes_principales = df_final_demo.groupby('client_id')['total_balance'].sum().nlargest(50)
+
+    #filtramos el dataframe original solo para los clientes principales
+    df_clientes_principales = df_final_demo[df_final_demo['client_id'].isin(clientes_principales.index)]
+
+    return df_clientes_principales
+
+def _huella_dataframes(*dfs):
+
+    """
+    Calcula una huella del contenido de uno o varios DataFrames para usarla como clave de caché.
+
+    Argumentos:
+    - dfs (DataFrames de Pandas): DataFrames de los que se calcula la huella.
+
+    Devuelve:
+    - huella (str): Hash hexadecimal que cambia si cambian las columnas, los tipos o cualquier valor.
+
+    Se hashean directamente los buffers de cada columna (los arrays de NumPy, los buffers de Arrow de los textos y los
+    códigos de las categorías) sin convertir ningún valor, así que es mucho más rápido que recalcular lo que se cachea.
+    """
+
+    import hashlib
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+
+    h = hashlib.blake2b(digest_size=16)
+    for df in dfs:
+        h.update(repr((list(df.columns), [str(tipo) for tipo in df.dtypes], len(df))).encode('utf-8'))
+        for columna in df.columns:
+            serie = df[columna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                h.update(repr(list(serie.cat.categories)).encode('utf-8'))
+                h.update(np.ascontiguousarray(serie.cat.codes.to_numpy()))
+            elif isinstance(serie.dtype, pd.StringDtype) and serie.dtype.storage == 'pyarrow':
+                arr = pa.array(serie.array)
+                for trozo in (arr.chunks if isinstance(arr, pa.ChunkedArray) else [arr]):
+                    #la posición y la longitud distinguen dos trozos distintos de los mismos buffers
+                    h.update(repr((trozo.offset, len(trozo))).encode('utf-8'))
+                    for buffer in trozo.buffers():
+                        if buffer is not None:
+                            h.update(buffer)
+            elif isinstance(serie.dtype, np.dtype) and serie.dtype != object:
+                h.update(np.ascontiguousarray(serie.to_numpy()))
+            else:
+                h.update(_hash_columna(serie))
+
+    return h.hexdigest()
+
+def _orden_sesiones(df_transacciones, claves=('client_id', 'visit_id', 'date_time')):
+
+    """
+    Calcula el orden estable de los eventos por cliente, visita y fecha (el mismo que sort_values con esas columnas).
+
+    Argumentos:
+    - df_transacciones (DataFrame de Pandas): Eventos web con las columnas de 'claves'.
+    - claves (tuple): Columnas por las que se ordena, de la más a la menos importante.
+
+    Devuelve:
+    - orden (array de NumPy): Posiciones de las filas en el orden final.
+
+    Con pyarrow se usa su ordenación estable por varias claves, que compara los textos sin convertirlos; sin pyarrow se
+    ordenan con np.lexsort los códigos de cada clave (numerados en orden). En ambos casos los nulos van al final.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    claves = list(claves)
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        pa = None
+
+    if pa is not None:
+        tabla = pa.table({clave: pa.array(df_transacciones[clave].array, from_pandas=True) for clave in claves})
+        return pc.sort_indices(tabla, sort_keys=[(clave, 'ascending') for clave in claves]).to_numpy()
+
+    #np.lexsort ordena primero por la última clave; los códigos -1 (nulos) se mandan al final
+    codigos = []
+    for clave in claves:
+        codigo, unicos = pd.factorize(df_transacciones[clave], sort=True)
+        codigos.append(np.where(codigo < 0, len(unicos), codigo))
+    return np.lexsort(codigos[::-1])
+
+def _comparar_vecinos(serie):
+
+    """
+    Compara cada valor de una columna con el siguiente.
+
+    Argumentos:
+    - serie (Series de Pandas): Columna sin nulos.
+
+    Devuelve:
+    - menor, igual (arrays de NumPy de bool): Para cada par de filas consecutivas, si la primera es menor o igual que la segunda.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    n = len(serie)
+    if isinstance(serie.dtype, pd.StringDtype) and serie.dtype.storage == 'pyarrow':
+        #los textos de Arrow se comparan sin convertirlos a objetos de Python
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        arr = pa.array(serie.array)
+        anterior, siguiente = arr.slice(0, n - 1), arr.slice(1)
+        return np.asarray(pc.less(anterior, siguiente)), np.asarray(pc.equal(anterior, siguiente))
+
+    valores = serie.to_numpy()
+    return valores[:-1] < valores[1:], valores[:-1] == valores[1:]
+
+def esta_ordenado(df, claves=('client_id', 'visit_id', 'date_time')):
+
+    """
+    Comprueba en tiempo lineal si un DataFrame está ordenado por varias columnas.
+
+    Argumentos:
+    - df (DataFrame de Pandas): DataFrame a comprobar.
+    - claves (tuple): Columnas del orden, de la más a la menos importante.
+
+    Devuelve:
+    - bool: True si cada fila es menor o igual que la siguiente según las claves. Con nulos en alguna clave devuelve
+      False (el orden de los nulos no se comprueba y quien llama vuelve a ordenar).
+
+    Se comparan solo filas consecutivas, columna a columna, y se para en cuanto aparece un par desordenado.
+    """
+
+    import numpy as np
+
+    n = len(df)
+    if n < 2:
+        return True
+
+    menor = np.zeros(n - 1, dtype=bool)
+    igual = np.ones(n - 1, dtype=bool)
+    for clave in claves:
+        serie = df[clave]
+        if serie.isna().any():
+            return False
+        menor_clave, igual_clave = _comparar_vecinos(serie)
+        #un par queda decidido en la primera clave en la que sus valores son distintos
+        menor |= igual & menor_clave
+        igual &= igual_clave
+        if not (menor | igual).all():
+            return False
+
+    return True
+
+def ordenar_web(df_final_web_data, claves=('client_id', 'visit_id', 'date_time')):
+
+    """
+    Ordena los eventos web por cliente, visita y fecha, si no lo están ya.
+
+    Argumentos:
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web.
+    - claves (tuple): Columnas del orden.
+
+    Devuelve:
+    - df_final_web_data (DataFrame de Pandas): Los mismos eventos ordenados (el mismo DataFrame si ya lo estaban).
+
+    El orden es estable y el mismo que sort_values(by=claves). Una tabla ordenada ahorra la ordenación en la
+    sesionización (_sesionizar comprueba el orden con esta_ordenado antes de ordenar).
+    El orden no se guarda como marca en df.attrs: pandas copia attrs en take, sample o sort_values, así que la marca
+    seguiría ahí después de desordenar la tabla. La comprobación con esta_ordenado es lineal y siempre es cierta.
+    """
+
+    if not esta_ordenado(df_final_web_data, claves):
+        df_final_web_data = df_final_web_data.take(_orden_sesiones(df_final_web_data, claves))
+
+    return df_final_web_data
+
+def _inicios_visita(df_transacciones, claves=('client_id', 'visit_id')):
+
+    """
+    Marca las filas en las que empieza una visita en unos eventos ya ordenados por cliente y visita.
+
+    Argumentos:
+    - df_transacciones (DataFrame de Pandas): Eventos web ordenados por las columnas de 'claves'.
+    - claves (tuple): Columnas que identifican la visita; empieza una nueva cuando cambia alguna.
+
+    Devuelve:
+    - inicio (array de NumPy de bool): True en la primera fila de cada visita y en las filas sin cliente o sin visita,
+      que groupby deja fuera de cualquier grupo.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    n = len(df_transacciones)
+    inicio = np.ones(n, dtype=bool)
+    if n < 2:
+        return inicio
+
+    cambio = np.zeros(n - 1, dtype=bool)
+    nulos = np.zeros(n, dtype=bool)
+    for clave in claves:
+        serie = df_transacciones[clave]
+        nulos |= serie.isna().to_numpy()
+        if isinstance(serie.dtype, pd.StringDtype) and serie.dtype.storage == 'pyarrow':
+            #los textos de Arrow se comparan con su vecino sin convertirlos a objetos de Python
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            arr = pa.array(serie.array)
+            cambio |= np.asarray(pc.fill_null(pc.not_equal(arr.slice(1), arr.slice(0, n - 1)), True))
+        else:
+            valores = serie.to_numpy()
+            cambio |= valores[1:] != valores[:-1]
+
+    #una fila empieza visita si cambia alguna de las claves respecto a la anterior
+    inicio[1:] = cambio
+    inicio |= nulos
+
+    return inicio
+
+def _sesionizar(df_transacciones, inactividad=None):
+
+    """
+    Ordena los eventos por cliente, visita y fecha y añade el paso anterior de cada visita, en tiempo lineal con NumPy.
+
+    Argumentos:
+    - df_transacciones (DataFrame de Pandas): Eventos web con la variación de cada cliente (sin ordenar).
+    - inactividad (float): Si se indica, las sesiones no son las visitas de 'visit_id' sino los eventos seguidos de cada
+      cliente sin una pausa de más de 'inactividad' segundos; los eventos se ordenan por cliente y fecha.
+
+    Devuelve:
+    - df_transacciones (DataFrame de Pandas): Los eventos ordenados con las columnas 'time_last_step', 'last_step',
+      'time_difference', 'steps' y 'difference_time_in_seconds' (con los mismos valores que _sesionizar_pandas) y
+      'transition', el código de la transición entre pasos (ver PASOS_PROCESO). Con 'inactividad' se añade además
+      'session_id', el número de sesión (0, 1, 2...), y el paso anterior se busca dentro de cada sesión.
+      'steps' como categoría y 'transition' son la representación interna de las transacciones compartidas; las funciones
+      públicas devuelven las columnas de _sesionizar_pandas con _transacciones_publicas.
+
+    En lugar de groupby().shift() se marca dónde empieza cada visita (_inicios_visita) y se desplazan los arrays una
+    posición, dejando vacío el valor anterior en esas filas. 'steps' es una categoría construida a partir de los códigos
+    de los pasos con una tabla de todas las combinaciones, sin crear un texto por fila.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if inactividad is None:
+        #los datos web limpios ya vienen ordenados (ordenar_web) y entonces no hace falta volver a ordenar
+        if not esta_ordenado(df_transacciones):
+            df_transacciones = df_transacciones.take(_orden_sesiones(df_transacciones))
+        else:
+            df_transacciones = df_transacciones.copy(deep=False)
+        inicio = _inicios_visita(df_transacciones)
+    else:
+        if not esta_ordenado(df_transacciones, ('client_id', 'date_time')):
+            df_transacciones = df_transacciones.take(_orden_sesiones(df_transacciones, ('client_id', 'date_time')))
+        else:
+            df_transacciones = df_transacciones.copy(deep=False)
+        inicio = _inicios_visita(df_transacciones, ('client_id',))
+
+        #empieza sesión si la pausa con el evento anterior supera el límite; las fechas nulas forman su propia sesión
+        ns = df_transacciones['date_time'].to_numpy().view(np.int64)
+        nula = np.isnat(df_transacciones['date_time'].to_numpy())
+        if len(ns) > 1:
+            inicio[1:] |= (np.diff(ns) > int(round(inactividad * 1e9))) | nula[1:] | nula[:-1]
+        inicio |= nula
+        df_transacciones['session_id'] = np.cumsum(inicio) - 1
+
+    #fecha del paso anterior: el array desplazado una posición, vacío al empezar cada visita
+    fechas = df_transacciones['date_time'].to_numpy()
+    anterior = np.empty_like(fechas)
+    anterior[1:] = fechas[:-1]
+    anterior[inicio] = np.datetime64('NaT')
+    df_transacciones['time_last_step'] = anterior
+
+    #paso anterior: se desplazan los códigos del paso (-1 es vacío)
+    pasos = df_transacciones['process_step']
+    if isinstance(pasos.dtype, pd.CategoricalDtype):
+        codigos, nombres = pasos.cat.codes.to_numpy(), list(pasos.cat.categories)
+    else:
+        codigos, nombres = pd.factorize(pasos)
+        nombres = list(nombres)
+    codigos_anterior = np.empty_like(codigos)
+    codigos_anterior[1:] = codigos[:-1]
+    codigos_anterior[inicio] = -1
+    if isinstance(pasos.dtype, pd.CategoricalDtype):
+        df_transacciones['last_step'] = pd.Categorical.from_codes(codigos_anterior, dtype=pasos.dtype)
+    else:
+        valores = np.array(nombres + [np.nan], dtype=object)
+        df_transacciones['last_step'] = valores[codigos_anterior]
+
+    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
+
+    #texto de cada combinación (paso actual, paso anterior); la posición 0 de cada eje es el vacío
+    textos = ['nan'] + [str(nombre) for nombre in nombres]
+    combinacion = (codigos.astype(np.int64) + 1) * len(textos) + codigos_anterior + 1
+    tabla = np.array([actual + '_' + previo for actual in textos for previo in textos], dtype=object)
+
+    #'steps' es una categoría con solo las combinaciones presentes, ordenadas alfabéticamente como los textos que sustituye
+    presentes = np.flatnonzero(np.bincount(combinacion, minlength=len(tabla)))
+    categorias = sorted(set(tabla[presentes]))
+    codigo_categoria = np.full(len(tabla), -1, dtype=np.int16)
+    codigo_categoria[presentes] = [categorias.index(texto) for texto in tabla[presentes]]
+    df_transacciones['steps'] = pd.Categorical.from_codes(codigo_categoria[combinacion], categories=categorias)
+
+    #código entero de la transición entre los pasos conocidos (-1 si no hay paso anterior o algún paso es desconocido)
+    posicion = np.array([PASOS_PROCESO.index(nombre) if nombre in PASOS_PROCESO else -1 for nombre in nombres] + [-1], dtype=np.int8)
+    paso, paso_anterior = posicion[codigos], posicion[codigos_anterior]
+    transicion = np.where((paso >= 0) & (paso_anterior >= 0), paso_anterior * len(PASOS_PROCESO) + paso, -1).astype(np.int8)
+
+    df_transacciones['difference_time_in_seconds'] = df_transacciones['time_difference'].dt.total_seconds()
+    df_transacciones['transition'] = transicion
+
+    return df_transacciones
+
+def _transacciones_publicas(df_transacciones):
+
+    """
+    Quita de unas transacciones de _sesionizar las columnas internas, para devolverlas o exportarlas.
+
+    Argumentos:
+    - df_transacciones (DataFrame de Pandas): Transacciones de _sesionizar (u obtener_transacciones).
+
+    Devuelve:
+    - df_transacciones (DataFrame de Pandas): Las mismas filas sin la columna 'transition' y con 'steps' como texto, es decir,
+      exactamente las columnas y tipos de _sesionizar_pandas (más 'session_id' si las sesiones son por inactividad).
+    """
+
+    df_transacciones = df_transacciones.drop(columns='transition')
+    #los textos de las categorías se reutilizan: cada fila apunta a uno de los pocos textos de 'steps', sin crear uno nuevo
+    df_transacciones['steps'] = df_transacciones['steps'].astype(object)
+
+    return df_transacciones
+
+def _sesionizar_pandas(df_transacciones):
+
+    """
+    Versión de referencia de _sesionizar con sort_values y groupby().shift(), para comparar resultados y tiempos.
+
+    Argumentos:
+    - df_transacciones (DataFrame de Pandas): Eventos web con la variación de cada cliente (sin ordenar).
+
+    Devuelve:
+    - df_transacciones (DataFrame de Pandas): Los eventos ordenados con el paso anterior de cada visita.
+    """
+
+    #ordenamos los valores del df por cliente id, visita id y fecha
+    df_transacciones = df_transacciones.sort_values(by=['client_id', 'visit_id', 'date_time'])
+
+    #agrupamos una sola vez por cliente y visita para calcular los dos desplazamientos
+    grupos = df_transacciones.groupby(by=['client_id', 'visit_id'])
+
+    #creamos una nueva columna en la que añadimos la fecha en la que el usuario realizó el paso anterior
+    df_transacciones['time_last_step'] = grupos['date_time'].shift(1)
+
+    #creamos una nueva columna para añadir el paso anterior al actual
+    df_transacciones['last_step'] = grupos['process_step'].shift(1)
+
+    #restamos la fecha del paso anterior a la del actual para ver cuánto ha tardado en pasar de un paso a otro
+    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
+
+    #agregamos una nueva columna en la que incluimos el nombre del paso anterior y el paso actual
+    df_transacciones['steps'] = df_transacciones['process_step'].astype(str) + '_' + df_transacciones['last_step'].astype(str)
+
+    #transformamos el tiempo a segundos
+    df_transacciones['difference_time_in_seconds'] = df_transacciones['time_difference'].dt.total_seconds()
+
+    return df_transacciones
+
+def indice_variacion(df_exp):
+
+    """
+    Crea un índice de búsqueda de la variación de cada cliente, para no tener que unir los eventos web con df_exp.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+
+    Devuelve:
+    - indice (dict): Índice con las claves:
+      - 'variaciones' (Index de Pandas): Nombres de las variaciones; el código de cada una es su posición.
+      - 'tipo': Tipo de la columna 'variation' de df_exp (para reconstruirla a partir de los códigos).
+      - 'clientes' y 'codigos' (arrays de NumPy): Clientes ordenados y el código de variación de cada uno.
+      - 'denso' (array de NumPy o None): Código de variación por client_id - 'minimo', si los ids son enteros y su rango
+        es pequeño; se consulta por posición en lugar de con una búsqueda binaria.
+      - 'minimo' (int): Menor client_id del índice.
+
+    Se ignoran los clientes sin variación. Si un cliente aparece varias veces se usa su primera variación.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    df_exp = df_exp.dropna(subset=['client_id', 'variation'])
+
+    #código de variación de cada fila
+    if isinstance(df_exp['variation'].dtype, pd.CategoricalDtype):
+        codigos, variaciones = df_exp['variation'].cat.codes.to_numpy(), df_exp['variation'].cat.categories
+    else:
+        codigos, variaciones = pd.factorize(df_exp['variation'], sort=True)
+
+    indice = _indice_clientes(df_exp['client_id'].to_numpy(), codigos.astype(np.int8))
+    indice.update({'variaciones': variaciones, 'tipo': df_exp['variation'].dtype})
+
+    return indice
+
+def _indice_clientes(clientes, codigos):
+
+    """
+    Crea un índice de búsqueda de un código por cliente (ver indice_variacion).
+
+    Argumentos:
+    - clientes (array de NumPy): Id de cliente de cada fila.
+    - codigos (array de NumPy de enteros): Código de cada fila; el tipo del array es el de los códigos devueltos.
+
+    Devuelve:
+    - indice (dict): Índice con las claves 'clientes', 'codigos', 'denso' y 'minimo' que usa _buscar_codigos.
+    """
+
+    import numpy as np
+
+    #ordenamos los clientes (estable, así la primera aparición de cada uno queda delante) y quitamos los repetidos
+    orden = np.argsort(clientes, kind='stable')
+    clientes, codigos = clientes[orden], codigos[orden]
+    unicos = np.ones(len(clientes), dtype=bool)
+    unicos[1:] = clientes[1:] != clientes[:-1]
+    clientes, codigos = clientes[unicos], codigos[unicos]
+
+    #con ids enteros de rango acotado guardamos además un array denso (un código por id posible)
+    denso, minimo = None, 0
+    if len(clientes) and clientes.dtype.kind in 'iu':
+        minimo = int(clientes[0])
+        rango = int(clientes[-1]) - minimo + 1
+        if rango <= max(1 << 24, 64 * len(clientes)):
+            denso = np.full(rango, -1, dtype=codigos.dtype)
+            denso[clientes - minimo] = codigos
+
+    return {'clientes': clientes, 'codigos': codigos, 'denso': denso, 'minimo': minimo}
+
+def codigos_variacion(indice, client_ids):
+
+    """
+    Busca el código de variación de cada evento a partir de su cliente.
+
+    Argumentos:
+    - indice (dict): Índice creado con indice_variacion.
+    - client_ids (Series de Pandas o array de NumPy): Cliente de cada evento.
+
+    Devuelve:
+    - codigos (array de NumPy de int8): Posición de la variación en indice['variaciones'], o -1 si el cliente no tiene.
+    """
+
+    return _buscar_codigos(indice, client_ids)
+
+def _buscar_codigos(indice, client_ids):
+
+    """
+    Busca el código de cada cliente en un índice de _indice_clientes.
+
+    Argumentos:
+    - indice (dict): Índice creado con _indice_clientes (o indice_variacion).
+    - client_ids (Series de Pandas o array de NumPy): Cliente de cada fila.
+
+    Devuelve:
+    - codigos (array de NumPy): Código de cada cliente, o -1 si no está en el índice.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    client_ids = client_ids.to_numpy() if isinstance(client_ids, (pd.Series, pd.Index)) else np.asarray(client_ids)
+
+    if indice['denso'] is not None and client_ids.dtype.kind in 'iu':
+        #consulta por posición; los ids fuera del rango del índice no tienen código
+        posicion = client_ids.astype(np.int64) - indice['minimo']
+        dentro = (posicion >= 0) & (posicion < len(indice['denso']))
+        if dentro.all():
+            return indice['denso'][posicion]
+        codigos = np.full(len(client_ids), -1, dtype=indice['codigos'].dtype)
+        codigos[dentro] = indice['denso'][posicion[dentro]]
+        return codigos
+
+    #búsqueda binaria sobre los clientes ordenados
+    clientes = indice['clientes']
+    codigos = np.full(len(client_ids), -1, dtype=indice['codigos'].dtype)
+    if len(clientes) == 0:
+        return codigos
+    posicion = np.minimum(np.searchsorted(clientes, client_ids), len(clientes) - 1)
+    encontrado = clientes[posicion] == client_ids
+    codigos[encontrado] = indice['codigos'][posicion[encontrado]]
+    return codigos
+
+def mascara_variacion(indice, client_ids, variacion):
+
+    """
+    Marca los eventos de los clientes de una variación.
+
+    Argumentos:
+    - indice (dict): Índice creado con indice_variacion.
+    - client_ids (Series de Pandas o array de NumPy): Cliente de cada evento.
+    - variacion (str): Nombre de la variación, por ejemplo 'Test' o 'Control'.
+
+    Devuelve:
+    - mascara (array de NumPy de bool): True en los eventos de clientes de esa variación.
+    """
+
+    import numpy as np
+
+    if variacion not in indice['variaciones']:
+        return np.zeros(len(client_ids), dtype=bool)
+    return codigos_variacion(indice, client_ids) == indice['variaciones'].get_loc(variacion)
+
+def _unir_variacion(df_exp, df_final_web_data, indice=None):
+
+    """
+    Añade a los eventos web la variación de su cliente y descarta los de clientes sin variación, como
+    df_final_web_data.merge(df_exp, how='left', on='client_id').dropna(subset='variation') pero sin la unión.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame con los eventos web (o un trozo de ellos).
+    - indice (dict): Índice de indice_variacion; si no se indica se crea a partir de df_exp.
+
+    Devuelve:
+    - df_transacciones (DataFrame de Pandas): Eventos con variación, en su orden original, con la columna 'variation'
+      y numerados por su posición en df_final_web_data (como el índice que deja merge).
+
+    Si df_exp tiene clientes repetidos con variación se hace la unión, que repite sus eventos como hasta ahora.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    df_exp = df_exp.dropna(subset=['variation'])
+    if not df_exp['client_id'].is_unique or set(df_exp.columns) != {'client_id', 'variation'}:
+        return df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
+
+    if indice is None:
+        indice = indice_variacion(df_exp)
+
+    codigos = codigos_variacion(indice, df_final_web_data['client_id'])
+    filas = np.flatnonzero(codigos >= 0)
+    df_transacciones = df_final_web_data.take(filas)
+    df_transacciones.index = pd.Index(filas, dtype='int64')
+
+    #reconstruimos la columna de variación a partir de los códigos, con el mismo tipo que en df_exp
+    if isinstance(indice['tipo'], pd.CategoricalDtype):
+        df_transacciones['variation'] = pd.Categorical.from_codes(codigos[filas], dtype=indice['tipo'])
+    else:
+        df_transacciones['variation'] = np.asarray(indice['variaciones'], dtype=object)[codigos[filas]]
+
+    return df_transacciones
+
+def obtener_transacciones(df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Devuelve los eventos web enriquecidos que comparten todos los gráficos y tests del análisis A/B, calculándolos solo una vez.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por 'visit_id': una sesión
+      termina cuando el cliente pasa más de 'inactividad' segundos sin eventos (ver _sesionizar).
+
+    Devuelve:
+    - df_transacciones (DataFrame de Pandas): Eventos de los clientes con variación, ordenados por cliente, visita y fecha,
+      con las columnas 'variation', 'time_last_step', 'last_step', 'time_difference', 'steps' (paso actual y anterior,
+      como categoría), 'difference_time_in_seconds' y 'transition' (paso_anterior * 5 + paso, -1 al empezar la visita).
+      Con 'inactividad' se ordenan por cliente y fecha y tienen además la columna 'session_id'. Las dos columnas internas
+      ('steps' como categoría y 'transition') se quitan con _transacciones_publicas antes de devolver o exportar los datos.
+
+    El resultado se guarda en memoria con la huella de las dos tablas de entrada (_huella_dataframes) y la definición de
+    sesión: si se vuelve a pedir con los mismos datos se devuelve el mismo DataFrame sin recalcularlo, y si los datos cambian se calcula de nuevo.
+    El DataFrame devuelto es compartido, así que no se debe modificar; para añadirle columnas hay que copiarlo antes.
+    """
+
+    return _transacciones_en_cache((_huella_dataframes(df_exp, df_final_web_data), inactividad), df_exp, df_final_web_data, inactividad)
+
+def _transacciones_en_cache(clave, df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Devuelve las transacciones de obtener_transacciones guardadas con 'clave', calculándolas si no están.
+
+    Argumentos:
+    - clave (tuple): Huella de los datos de entrada y límite de inactividad.
+    - df_exp, df_final_web_data, inactividad: Los mismos que en obtener_transacciones.
+
+    Devuelve:
+    - df_transacciones (DataFrame de Pandas): Transacciones enriquecidas compartidas.
+    """
+
+    #buscamos las transacciones ya calculadas para estos datos
+    if clave in _CACHE_TRANSACCIONES:
+        return _CACHE_TRANSACCIONES[clave]
+
+    #añadimos si el cliente ha visto la plataforma original o el test, quedándonos solo con los clientes con variación
+    df_transacciones = _unir_variacion(df_exp, df_final_web_data)
+
+    #ordenamos por cliente, visita y fecha (o por cliente y fecha si las sesiones son por inactividad) y añadimos el paso anterior de cada sesión
+    df_transacciones = _sesionizar(df_transacciones, inactividad)
+
+    #guardamos el resultado; solo conservamos los datos más recientes para no acumular memoria
+    if len(_CACHE_TRANSACCIONES) >= 2:
+        del _CACHE_TRANSACCIONES[next(iter(_CACHE_TRANSACCIONES))]
+    _CACHE_TRANSACCIONES[clave] = df_transacciones
+
+    return df_transacciones
+
+def _columna_sesion(inactividad=None):
+
+    """
+    Devuelve la columna que identifica cada sesión en las transacciones de obtener_transacciones.
+
+    Argumentos:
+    - inactividad (float): Límite de inactividad en segundos, o None si las sesiones son las visitas.
+
+    Devuelve:
+    - str: 'visit_id' o 'session_id'.
+    """
+
+    return 'visit_id' if inactividad is None else 'session_id'
+
+def _posiciones_paso(pasos):
+
+    """
+    Convierte los pasos de cada evento en su posición en PASOS_PROCESO.
+
+    Argumentos:
+    - pasos (Series de Pandas): Columna 'process_step', categórica o de textos.
+
+    Devuelve:
+    - posicion (array de NumPy de int8): Posición de cada paso (0 'start' ... 4 'confirm'), o -1 si es nulo o desconocido.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(pasos.dtype, pd.CategoricalDtype):
+        codigos, nombres = pasos.cat.codes.to_numpy(), list(pasos.cat.categories)
+    else:
+        codigos, nombres = pd.factorize(pasos)
+        nombres = list(nombres)
+
+    #el código -1 (nulo) toma el último valor de la tabla
+    posicion = np.array([PASOS_PROCESO.index(nombre) if nombre in PASOS_PROCESO else -1 for nombre in nombres] + [-1], dtype=np.int8)
+    return posicion[codigos]
+
+def obtener_visitas(df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Devuelve un resumen con una fila por visita (o sesión) de las transacciones de obtener_transacciones.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - inactividad (float): Si se indica, las filas son sesiones por inactividad en lugar de visitas (ver obtener_transacciones).
+
+    Devuelve:
+    - df_visitas (DataFrame de Pandas): Una fila por visita, en el orden de las transacciones, con las columnas:
+      - 'client_id', 'visit_id' (o 'session_id') y 'variation'.
+      - 'start_offset' y 'end_offset': Posiciones de su primer evento y siguiente al último en las transacciones, de modo
+        que sus eventos son df_transacciones.iloc[start_offset:end_offset].
+      - 'first_time' y 'last_time': Fechas del primer y del último evento.
+      - 'difference_time_in_seconds': Tiempo de permanencia (last_time - first_time) en segundos.
+      - 'n_steps': Número de eventos.
+      - 'n_starts': Número de eventos 'start'.
+      - 'max_step': Paso más avanzado al que llega, según PASOS_PROCESO.
+      - 'reached_confirm': Si llega a 'confirm'.
+      - 'n_backtracks': Número de veces que vuelve a un paso anterior.
+      - 'n_repeats': Número de veces que repite el paso en el que está.
+
+    Se calcula una sola vez con np.*.reduceat sobre los eventos ya ordenados y se guarda junto a las transacciones,
+    así que las métricas por visita (permanencia, conversión) se obtienen en tiempo proporcional al número de visitas.
+    Una visita es un par (client_id, visit_id); los eventos sin cliente o sin visita no forman parte de ninguna.
+    """
+
+    return _visitas_en_cache((_huella_dataframes(df_exp, df_final_web_data), inactividad), df_exp, df_final_web_data, inactividad)
+
+def _visitas_en_cache(clave, df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Devuelve el resumen por visita de obtener_visitas guardado con 'clave', calculándolo si no está.
+
+    Argumentos:
+    - clave (tuple): Huella de los datos de entrada y límite de inactividad.
+    - df_exp, df_final_web_data, inactividad: Los mismos que en obtener_visitas.
+
+    Devuelve:
+    - df_visitas (DataFrame de Pandas): Resumen por visita compartido.
+    """
+
+    if clave in _CACHE_VISITAS:
+        return _CACHE_VISITAS[clave]
+
+    df_transacciones = _transacciones_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    df_visitas = _resumir_visitas(df_transacciones, inactividad)
+
+    #guardamos el resumen con la misma política que las transacciones
+    if len(_CACHE_VISITAS) >= 2:
+        del _CACHE_VISITAS[next(iter(_CACHE_VISITAS))]
+    _CACHE_VISITAS[clave] = df_visitas
+
+    return df_visitas
+
+def _resumir_visitas(df_transacciones, inactividad=None):
+
+    """
+    Calcula el resumen por visita de obtener_visitas a partir de unas transacciones ya sesionizadas.
+
+    Argumentos:
+    - df_transacciones (DataFrame de Pandas): Transacciones ordenadas de _sesionizar.
+    - inactividad (float): Límite de inactividad con el que se sesionizaron, o None si las sesiones son las visitas.
+
+    Devuelve:
+    - df_visitas (DataFrame de Pandas): Una fila por visita (ver obtener_visitas).
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    sesion = _columna_sesion(inactividad)
+    n = len(df_transacciones)
+
+    #posición del primer evento de cada visita en las transacciones ordenadas
+    if inactividad is None:
+        inicio = _inicios_visita(df_transacciones)
+    else:
+        inicio = np.ones(n, dtype=bool)
+        inicio[1:] = np.diff(df_transacciones['session_id'].to_numpy()) != 0
+    desde = np.flatnonzero(inicio)
+    hasta = np.append(desde[1:], n).astype(np.int64)
+
+    #fechas del primer y del último evento sin contar las fechas nulas (NaT es el menor int64)
+    ns = df_transacciones['date_time'].to_numpy().view(np.int64)
+    nula = np.isnat(df_transacciones['date_time'].to_numpy())
+    ultima = np.maximum.reduceat(ns, desde)
+    primera = np.minimum.reduceat(np.where(nula, np.iinfo(np.int64).max, ns), desde)
+    primera[ultima == np.iinfo(np.int64).min] = np.iinfo(np.int64).min
+
+    #posición de cada paso en PASOS_PROCESO (-1 si es nulo o desconocido) y transiciones hacia atrás
+    paso = _posiciones_paso(df_transacciones['process_step'])
+    transicion = df_transacciones['transition'].to_numpy()
+    retroceso = (transicion >= 0) & (transicion % len(PASOS_PROCESO) < transicion // len(PASOS_PROCESO))
+    repeticion = (transicion >= 0) & (transicion % len(PASOS_PROCESO) == transicion // len(PASOS_PROCESO))
+
+    #las columnas de la visita se toman de su primer evento
+    df_visitas = df_transacciones[['client_id', sesion, 'variation']].take(desde).reset_index(drop=True)
+    df_visitas['start_offset'] = desde.astype(np.int64)
+    df_visitas['end_offset'] = hasta
+    df_visitas['first_time'] = primera.view('datetime64[ns]')
+    df_visitas['last_time'] = ultima.view('datetime64[ns]')
+    df_visitas['difference_time_in_seconds'] = (df_visitas['last_time'] - df_visitas['first_time']).dt.total_seconds()
+    df_visitas['n_steps'] = hasta - desde
+    df_visitas['n_starts'] = np.add.reduceat((paso == 0).astype(np.int64), desde)
+    df_visitas['max_step'] = pd.Categorical.from_codes(np.maximum.reduceat(paso, desde), categories=PASOS_PROCESO, ordered=True)
+    df_visitas['reached_confirm'] = (df_visitas['max_step'] == PASOS_PROCESO[-1]).to_numpy()
+    df_visitas['n_backtracks'] = np.add.reduceat(retroceso.astype(np.int64), desde)
+    df_visitas['n_repeats'] = np.add.reduceat(repeticion.astype(np.int64), desde)
+
+    #los eventos sin cliente o sin visita no forman una visita (como en groupby)
+    validas = df_visitas['client_id'].notna() & df_visitas[sesion].notna()
+    if not validas.all():
+        df_visitas = df_visitas[validas].reset_index(drop=True)
+
+    return df_visitas
+
+def comparar_sesionizacion(yalm_path, repeticiones=3):
+
+    """
+    Compara el tiempo de la sesionización con NumPy (_sesionizar) y con groupby().shift() de pandas, y comprueba que
+    las dos dan el mismo resultado.
+
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML.
+    - repeticiones (int): Veces que se ejecuta cada versión; se toma el mejor tiempo.
+
+    Devuelve:
+    - df_tiempos (DataFrame de Pandas): DataFrame con el mejor tiempo (s) y las filas por segundo de cada versión.
+    """
+
+    import time
+    import pandas as pd
+
+    df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(*leer_datos(yalm_path))
+    df_unido = _unir_variacion(df_exp, df_final_web_data)
+
+    filas = []
+    resultados = {}
+    #la versión con NumPy se mide hasta tener las mismas columnas públicas que la de pandas
+    versiones = [('pandas', _sesionizar_pandas), ('numpy', lambda df: _transacciones_publicas(_sesionizar(df)))]
+    for nombre, funcion in versiones:
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultados[nombre] = funcion(df_unido)
+            tiempos.append(time.perf_counter() - inicio)
+        filas.append({'version': nombre, 'filas': len(df_unido), 'segundos': round(min(tiempos), 3),
+                      'filas_por_segundo': round(len(df_unido) / min(tiempos))})
+
+    df_tiempos = pd.DataFrame(filas)
+    print(df_tiempos.to_string(index=False))
+    print('Resultados iguales:', resultados['numpy'].equals(resultados['pandas']))
+
+    return df_tiempos
+
+def _transacciones_por_trozos(df_exp, df_final_web_data, columnas, inactividad=None):
+
+    """
+    Une los eventos web con la variación de cada cliente, para un DataFrame completo o por trozos.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas o iterable de DataFrames): Datos web completos o por trozos (leer_datos_stream).
+    - columnas (list): Columnas de los datos web que necesita quien llama (los trozos solo se unen con esas columnas).
+    - inactividad (float): Límite de inactividad en segundos de las sesiones (ver obtener_transacciones).
+
+    Devuelve:
+    - Iterable de DataFrames de Pandas con la columna 'variation'. Con un DataFrame completo es un único elemento:
+      las transacciones compartidas de obtener_transacciones.
+
+    Las sesiones por inactividad cruzan los trozos, así que por trozos solo se aceptan sin 'inactividad': quien las
+    necesite debe juntarlas entre trozos (como calcular_tiempo_permanencia con _unir_tramos) o usar un DataFrame completo.
+    """
+
+    import pandas as pd
+
+    if inactividad is not None and not isinstance(df_final_web_data, pd.DataFrame):
+        raise ValueError("Las sesiones por 'inactividad' no se pueden calcular trozo a trozo: usa un DataFrame completo "
+                         "o junta las sesiones entre trozos (ver _unir_tramos)")
+    if isinstance(df_final_web_data, pd.DataFrame):
+        return [obtener_transacciones(df_exp, df_final_web_data, inactividad)]
+    #el índice de variaciones se crea una vez y se consulta en cada trozo
+    indice = indice_variacion(df_exp)
+    return (_unir_variacion(df_exp, chunk[columnas], indice) for chunk in df_final_web_data)
+
+def crear_dataframe_promedio_tiempo_por_paso(df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Crea un nuevo DataFrame para analizar el tiempo promedio por paso en el proceso de transacción.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
+
+    Devuelve:
+    - df_transacciones_para_grafico (DataFrame de Pandas): DataFrame que contiene los datos procesados para analizar el tiempo promedio por paso. 
+      Tiene las columnas de los datos web y 'variation', 'time_last_step', 'last_step', 'time_difference', 'steps' (texto)
+      y 'difference_time_in_seconds', además de 'session_id' si se indica 'inactividad'.
+
+    Esta función realiza las siguientes operaciones para crear el DataFrame de salida.
+    Retorna el DataFrame procesado para su posterior análisis del tiempo promedio por paso en el proceso de transacción.
+    """
+
+    #obtenemos los eventos con su variación, paso anterior y tiempo desde el paso anterior (calculados una sola vez)
+    df_transacciones = obtener_transacciones(df_exp, df_final_web_data, inactividad)
+
+    #eliminamos las filas que tienen valores nulos en time_difference, ya que son el primer paso realizado por el usuario en cada visita
+    df_transacciones_para_grafico = df_transacciones.dropna(subset='difference_time_in_seconds')
+
+    #quitamos las columnas internas de las transacciones compartidas ('transition' y 'steps' como categoría)
+    df_transacciones_para_grafico = _transacciones_publicas(df_transacciones_para_grafico)
+   
+    return df_transacciones_para_grafico
+
+def guardar_como_csv(df, nombre_archivo):
+
+    """
+    Guarda un DataFrame como archivo CSV en una ubicación específica.
+
+    Argumentos:
+    - df (DataFrame de Pandas): DataFrame que se desea guardar como archivo CSV.
+    - nombre_archivo (str): Nombre del archivo CSV.
+
+    Esta función guarda el DataFrame proporcionado como un archivo CSV en una ubicación específica.
+    La ruta de la carpeta donde se guarda el archivo CSV está predefinida en la variable 'ruta'.
+    Utiliza os.path.join() para unir la ruta de la carpeta con el nombre del archivo proporcionado,
+    generando así la ruta completa donde se guardará el archivo CSV.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente guarda el archivo CSV en la ubicación especificada.
+
+    Ejemplo de uso:
+    guardar_como_csv(df, "datos_guardados.csv")
+    """
+
+    import os
+
+    #creamos una cadena que representa la ruta de la carpeta donde queremos guardar el archivo CSV.
+    ruta = r'..\data\output'
+
+    #utilizamos os.path.join() para unir esta ruta con el nombre del archivo proporcionado
+    #generando así la ruta completa donde guardaremos el archivo csv.
+    ruta_completa = os.path.join(ruta, nombre_archivo)
+    df.to_csv(ruta_completa, sep=',', encoding='utf-8', index=False)
+
+def grafico_edad_clientes_principales(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución de edades de los principales clientes.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico de distribución de edades de los principales clientes.
+    """   
+
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    #agrupamos las edades por grupos de edad: jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54.
+    bins = [18, 36, 54, df_clientes_principales['age'].max()]
+    labels = ['jóvenes', 'adultos jóvenes', 'adultos mayores']
+
+    #añadimos la columna 'age_grouped' con las edades agrupadas al dataframe de clientes principales
+    df_clientes_principales['age_grouped'] = pd.cut(df_clientes_principales['age'], bins=bins, labels=labels, include_lowest=True)
+
+    #Histograma de edades de los principales clientes
+    plt.figure(figsize=(10, 6))
+    sns.histplot(df_clientes_principales['age_grouped'], bins=20, kde=True, color='skyblue')
+    plt.title('Distribución de Edades de los Principales Clientes')
+    plt.xlabel('Grupo de edad')
+    plt.ylabel('Número de clientes')
+    plt.show()
+
+    print('jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54')
+
+def grafico_genero_clientes_principales(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución de géneros de los clientes principales.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """       
+    
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #calculamos la frecuencia de género entre los clientes principales
+    frecuencia_genero = df_clientes_principales['gender'].value_counts()
+    frecuencia_genero = frecuencia_genero[frecuencia_genero > 0]
+
+    #creamos gráfico circular para mostrar la proporción de géneros entre los principales clientes
+    plt.figure(figsize=(10, 6))
+    plt.subplot(1, 2, 1)  # 1 fila, 2 columnas, primer subgráfico
+    plt.pie(frecuencia_genero, labels=frecuencia_genero.index, autopct='%1.1f%%', colors=sns.color_palette('Set3'))
+    plt.title('Distribución de Género entre los Principales Clientes')
+    plt.show()
+
+    print('M = Masculino, F = Femenino, U = NS/NC')
+
+    
+def grafico_fidelidad_clientes_principales(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución de los años que llevan los clientes principales siéndolo.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """    
+
+    import pandas as pd
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
+    #agrupamos los años que llevan los clientes siéndolo hasta 5 clientes nuevos, hasta 15 clientes consolidados y a partir de ahí clientes antiguos
+    bins = [0, 5, 15, df_clientes_principales['age'].max()]
+    labels = ['Clientes nuevos', 'Clientes consolidados', 'Clientes antiguos']
+
+    #añadimos una columna al dataframe df_clientes_principales llamada permanence_year_grouped para guardar esta nueva agrupación
+    df_clientes_principales['permanence_year_grouped'] = pd.cut(df_clientes_principales['permanence_year'], bins=bins, labels=labels, include_lowest=True)
+
+    #creamos un gráfico de barras para visualizar la distribución
+    plt.figure(figsize=(10, 6))
+    sns.countplot(x='permanence_year_grouped', data=df_clientes_principales, palette='pastel')
+    plt.title('Distribución de la fidelidad de los clientes principales')
+    plt.xlabel('Tiempo de permanencia')
+    plt.ylabel('Número de años')
+    plt.show()
+
+    print('0-5 = clientes nuevos, 5-15 = clientes consolidados, >15 = clientes antiguos')
+
+def graficos_contacto_clientes_ultimos_meses(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución del contacto con la empresa de los clientes principales en los últimos 6 meses.
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """  
+    
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #crear una figura con dos subplots
+    fig, axes = plt.subplots(nrows=1, ncols=2, figsize=(16, 5))
+
+    #gráfico de barras de interacciones en la web en los últimos 6 meses de los principales clientes
+    sns.countplot(x='login_month', data=df_clientes_principales, palette='coolwarm', ax=axes[0])
+    axes[0].set_title('Interacciones en la plataforma de los clientes principales en los últimos 6 meses')
+    axes[0].set_xlabel('Num de accesos a la plataforma')
+    axes[0].set_ylabel('Num de usuarios')
+
+    #gráfico de barras de clientes que hablaron en los últimos 6 meses de los principales clientes
+    sns.countplot(x='calls_months', data=df_clientes_principales, palette='pastel', ax=axes[1])
+    axes[1].set_title('Llamadas de los Principales Clientes en los últimos 6 meses')
+    axes[1].set_xlabel('Num de llamadas')
+    axes[1].set_ylabel('Num de usuarios')
+
+    #ajustamos el espaciado entre los subplots
+    plt.tight_layout()
+
+    #mostramos el gráfico combinado
+    plt.show()
+
+def grafico_num_cuentas_clientes_principales(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución con el número de cuentas que tienen los clientes principales.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """  
+    
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #ajustamos el tamaño
+    plt.figure(figsize=(10, 8))
+
+    #creamos el gráfico de violín
+    sns.violinplot(x=df_clientes_principales['num_accounts'], inner='quartile', palette='pastel')
+    
+    #definimos título y etiquetas
+    plt.title('Distribución del Número de Cuentas de los Principales Clientes')
+    plt.xlabel('Número de Cuentas')
+    plt.ylabel('Densidad')
+
+    #mostramos el gráfico
+    plt.show()
+
+def mapa_calor_valores_numericos(df_clientes_principales):
+
+    """
+    Genera un mapa de calor entre todos los valores numéricos.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """  
+
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #calculamos la matriz de correlación para crear un mapa de calor que muestre la relación entre variables numéricas
+    matriz_de_correlacion = df_clientes_principales[['total_balance', 'age', 'num_accounts']].corr()
+
+    #ajustamos el tamaño
+    plt.figure(figsize=(8, 6))
+
+    #creamos el mapa de calor
+    sns.heatmap(matriz_de_correlacion, annot=True, cmap='coolwarm', fmt=".2f")
+
+    #otorgamos un título
+    plt.title('Matriz de Correlación')
+
+    #mostramos el gráfico
+    plt.show()
+
+def grafico_dinero_y_num_cuentas(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución del número de cuentas y dinero en cuenta de los clientes principales.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """  
+
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #ajustamos el tamaño del gráfico
+    plt.figure(figsize=(10, 8))
+
+    #creamos el gráfico de cajas
+    sns.boxplot(x=df_clientes_principales['num_accounts'], y=df_clientes_principales['total_balance'], palette='coolwarm')
+    
+    #otorgamos título y etiquetas
+    plt.title('Dinero en Cuenta de los Principales Clientes por Número de Cuentas')
+    plt.xlabel('Número de Cuentas')
+    plt.ylabel('Dinero en Cuenta')
+
+    #mostramos el gráfico
+    plt.show()
+
+def grafico_dinero_segun_edad(df_clientes_principales):
+
+    """
+    Genera un gráfico de distribución del dinero en cuenta según la edad de los clientes principales.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """ 
+    
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #agrupamos las edades por grupos de edad: jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54.
+    bins = [18, 36, 54, df_clientes_principales['age'].max()]
+    labels = ['jóvenes', 'adultos jóvenes', 'adultos mayores']
+
+    #añadimos la columna 'age_grouped' con las edades agrupadas al dataframe de clientes principales
+    df_clientes_principales['age_grouped'] = pd.cut(df_clientes_principales['age'], bins=bins, labels=labels, include_lowest=True)
+
+    #ajustamos el tamaño del gráfico
+    plt.figure(figsize=(10, 6))
+
+    #creamos el gráfico de barras
+    sns.barplot(x='age_grouped', y='num_accounts', data=df_clientes_principales, palette='pastel', errorbar=None)
+    
+    #otorgamos título y etiquetas
+    plt.title('Distribución del dinero en cuenta por edad')
+    plt.xlabel('Grupo de edad')
+    plt.ylabel('Dinero en cuenta (media)')
+    
+    #mostramos el gráfico
+    plt.show()
+
+    print('jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54')
+
+def grafico_edad_genero_y_num_cuentas(df_clientes_principales):
+
+    """
+    Genera un gráfico que muestra la relación entre la edad, el género y el número de cuentas de los clientes principales.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """ 
+    
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    #ajustamos el tamaño del gráfico
+    plt.figure(figsize=(10, 6))
+    
+    #creamos el gráfico
+    sns.scatterplot(x='age', y='num_accounts', data=df_clientes_principales, hue='gender', palette='Set2')
+    
+    #asignamos título, etiquetas y leyenda
+    plt.title('Relación entre Edad y Número de Cuentas Abiertas')
+    plt.xlabel('Edad')
+    plt.ylabel('Número de Cuentas Abiertas')
+    plt.legend(title='Género', loc='upper left')
+
+    #mostramos el gráfico
+    plt.show()
+
+def grafico_edad_genero_y_dinero(df_clientes_principales):
+
+    """
+    Genera un gráfico que muestra la relación entre la edad, el género y el dinero en cuenta de los clientes principales.
+
+    Argumentos:
+    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """ 
+    
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #ajustamos el tamaño
+    plt.figure(figsize=(10, 6))
+
+    #creamos el gráfico
+    sns.scatterplot(x='age', y='total_balance', data=df_clientes_principales, hue='gender', palette='Set2')
+    
+    #asignamos título, etiquetas y legenda
+    plt.title('Relación entre Edad, Género y Dinero en cuenta')
+    plt.xlabel('Edad')
+    plt.ylabel('Dinero en cuenta')
+    plt.legend(title='Género', loc='upper left')
+
+    #mostramos el gráfico
+    plt.show()
+
+def grafico_proporcion_test_control(df_exp):
+
+    """
+    Genera un gráfico de distribución entre los clientes principales que han visto la plataforma original y los que han visto el test.
 
     Argumentos:
     - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """  
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """ 
+
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    #contamos el número de usuarios que han visto la página de control y la de test
+    control_users = df_exp[df_exp['variation'] == 'Control']['client_id'].nunique()
+    test_users = df_exp[df_exp['variation'] == 'Test']['client_id'].nunique()
+
+    #creamos una lista con los nombres de las variantes y otra lista con los tamaños correspondientes
+    variantes = ['Control', 'Test']
+    tamaños = [control_users, test_users]
+
+    #creamos el gráfico circular
+    #ajustamos el tamaño
+    plt.figure(figsize=(8, 6))
+
+    #creamos el gráfico
+    patches, texts, _ = plt.pie(tamaños, labels=variantes, autopct='%1.1f%%', startangle=140, colors=['lightblue', 'lightgreen'])
+     
+    plt.title('Distribución de usuarios entre la página de control y la de test')
+    plt.axis('equal')
+
+    #añadimos el número exacto de usuarios
+    for i, texto in enumerate(texts):
+        texto.set_text(f"{variantes[i]}: {tamaños[i]} usuarios")
+
+    plt.show()
+
+def _compactar(parciales, claves):
+
+    """
+    Junta una lista de resultados parciales de min/max por clave en uno solo.
+
+    Argumentos:
+    - parciales (list): Lista de DataFrames con columnas 'max' y 'min' indexados por las claves.
+    - claves (list): Niveles del índice por los que se agrupa.
+
+    Devuelve:
+    - list: Lista con un único DataFrame combinado.
+    """
+
+    import pandas as pd
+
+    return [pd.concat(parciales).groupby(level=claves, observed=True).agg({'max': 'max', 'min': 'min'})]
+
+def _unir_tramos(df_tramos, inactividad):
+
+    """
+    Junta en sesiones por inactividad los tramos de eventos de cada cliente.
+
+    Argumentos:
+    - df_tramos (DataFrame de Pandas): Tramos con las columnas 'variation', 'client_id', 'min' y 'max' (fechas del primer y
+      del último evento). Un evento suelto es un tramo con 'min' igual a 'max'.
+    - inactividad (float): Límite de inactividad en segundos (ver obtener_transacciones).
+
+    Devuelve:
+    - df_tramos (DataFrame de Pandas): Un tramo por sesión, ordenados por cliente y fecha de inicio (las fechas nulas al final).
+
+    Dos tramos de un cliente son de la misma sesión si uno empieza como mucho 'inactividad' segundos después del final
+    de los anteriores. Como añadir eventos solo acorta las pausas, los tramos de trozos distintos se pueden juntar así en
+    cualquier orden y el resultado son las mismas sesiones que con todos los eventos a la vez. Las fechas nulas forman su
+    propia sesión, como en _sesionizar.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    df_tramos = df_tramos.take(_orden_sesiones(df_tramos, ('client_id', 'min')))
+    cliente = df_tramos['client_id'].to_numpy()
+    desde = df_tramos['min'].to_numpy().view(np.int64)
+    hasta = df_tramos['max'].to_numpy().view(np.int64)
+    nulo = np.isnat(df_tramos['min'].to_numpy())
+
+    #empieza sesión si cambia el cliente o si el tramo empieza después del final más tardío de los anteriores más el límite
+    inicio = np.ones(len(df_tramos), dtype=bool)
+    if len(df_tramos) > 1:
+        fin = pd.Series(hasta).groupby(cliente).cummax().to_numpy()
+        inicio[1:] = (cliente[1:] != cliente[:-1]) | (desde[1:] - fin[:-1] > int(round(inactividad * 1e9))) | nulo[1:] | nulo[:-1]
+
+    #cada sesión toma la variación, el cliente y el inicio de su primer tramo y el final más tardío
+    primeros = np.flatnonzero(inicio)
+    df_sesiones = df_tramos[['variation', 'client_id', 'min']].take(primeros).reset_index(drop=True)
+    df_sesiones['max'] = np.maximum.reduceat(hasta, primeros).view('datetime64[ns]') if len(primeros) else hasta.view('datetime64[ns]')
+
+    return df_sesiones
+
+def calcular_drop_off(df_exp, df_final_web_data):
+
+    """
+    Calcula el número de eventos en cada paso del proceso para cada variación.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas o iterable de DataFrames): Datos web completos o por trozos (leer_datos_stream).
+
+    Devuelve:
+    - df_drop_off (DataFrame de Pandas): DataFrame con una fila por variación y una columna por paso con el número de eventos.
+    """
+
+    import pandas as pd
+
+    orden = ['start', 'step_1', 'step_2', 'step_3', 'confirm']
+
+    #sumamos los eventos por variación y paso de cada trozo
+    df_drop_off = None
+    for df_merged in _transacciones_por_trozos(df_exp, df_final_web_data, ['client_id', 'process_step']):
+        conteo = df_merged.groupby(['variation', 'process_step'], observed=True).size()
+        df_drop_off = conteo if df_drop_off is None else df_drop_off.add(conteo, fill_value=0)
+
+    #ordenamos los pasos según el orden natural
+    df_drop_off = df_drop_off.unstack(fill_value=0).reindex(columns=orden, fill_value=0).astype('int64')
+
+    return df_drop_off
+
+def calcular_tiempo_permanencia(df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Calcula el tiempo de permanencia de cada visita, desde su primer hasta su último evento.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas o iterable de DataFrames): Datos web completos o por trozos (leer_datos_stream).
+    - inactividad (float): Si se indica, se mide cada sesión por inactividad en lugar de cada visita (ver obtener_transacciones).
+
+    Devuelve:
+    - df_tiempo_de_permanencia (DataFrame de Pandas): DataFrame con la variación, el id de visita (o 'session_id'), las fechas máxima y mínima y el tiempo de permanencia en segundos.
+      Tiene una fila por visita (par cliente, visita) ordenadas por variación, cliente y visita, con los mismos datos en el mismo orden con un DataFrame completo o por trozos.
+
+    Con un DataFrame completo se toma del resumen por visita de obtener_visitas. Por trozos, cada trozo se reduce a su
+    mínimo y máximo por visita, por lo que las visitas repartidas entre varios trozos se combinan correctamente. Con
+    'inactividad', cada trozo se reduce a sus tramos de eventos seguidos por cliente, que se juntan entre trozos con
+    _unir_tramos; 'session_id' numera las sesiones por cliente y fecha como en obtener_transacciones.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    sesion = _columna_sesion(inactividad)
+
+    #con todos los datos cargados usamos el resumen por visita, que ya tiene la primera y la última fecha
+    if isinstance(df_final_web_data, pd.DataFrame):
+        df_visitas = obtener_visitas(df_exp, df_final_web_data, inactividad)
+        df_tiempo_de_permanencia = df_visitas[['variation', sesion, 'last_time', 'first_time']].rename(columns={'last_time': 'max', 'first_time': 'min'})
+        df_tiempo_de_permanencia['difference_time'] = df_tiempo_de_permanencia['max'] - df_tiempo_de_permanencia['min']
+        df_tiempo_de_permanencia['difference_time_in_seconds'] = df_visitas['difference_time_in_seconds']
+        #las visitas ya están por cliente y visita; las agrupamos por variación sin cambiar ese orden
+        variacion = pd.Categorical(df_tiempo_de_permanencia['variation']).codes
+        if (np.diff(variacion) < 0).any():
+            df_tiempo_de_permanencia = df_tiempo_de_permanencia.take(np.argsort(variacion, kind='stable'))
+        return df_tiempo_de_permanencia.reset_index(drop=True)
+
+    if inactividad is not None:
+        #las sesiones por inactividad cruzan los trozos: reducimos cada trozo a sus tramos de eventos seguidos por cliente
+        parciales = []
+        for df_transacciones in _transacciones_por_trozos(df_exp, df_final_web_data, ['client_id', 'date_time']):
+            df_eventos = df_transacciones.rename(columns={'date_time': 'min'})
+            df_eventos['max'] = df_eventos['min']
+            parciales.append(_unir_tramos(df_eventos, inactividad))
+            #juntamos los tramos cada pocos trozos para que la memoria dependa del número de sesiones y no de eventos
+            if len(parciales) >= 8:
+                parciales = [_unir_tramos(pd.concat(parciales, ignore_index=True), inactividad)]
+        df_sesiones = _unir_tramos(pd.concat(parciales, ignore_index=True), inactividad)
+
+        #numeramos las sesiones por cliente y fecha y las agrupamos por variación sin cambiar ese orden, como con un DataFrame completo
+        df_sesiones[sesion] = np.arange(len(df_sesiones), dtype=np.int64)
+        variacion = pd.Categorical(df_sesiones['variation']).codes
+        df_sesiones = df_sesiones.take(np.argsort(variacion, kind='stable')).reset_index(drop=True)
+        df_tiempo_de_permanencia = df_sesiones[['variation', sesion, 'max', 'min']]
+    else:
+        #reducimos cada trozo a la fecha mínima y máxima de cada visita
+        parciales = []
+        for df_transacciones in _transacciones_por_trozos(df_exp, df_final_web_data, ['client_id', 'visit_id', 'date_time']):
+            parciales.append(df_transacciones.groupby(by=['variation', 'client_id', sesion], observed=True)['date_time'].agg(['max', 'min']))
+            #combinamos los parciales cada pocos trozos para que la memoria dependa del número de visitas y no de eventos
+            if len(parciales) >= 8:
+                parciales = _compactar(parciales, ['variation', 'client_id', sesion])
+
+        #una fila por visita (cliente, visita) como en obtener_visitas; el cliente solo se usa para agrupar
+        df_tiempo_de_permanencia = _compactar(parciales, ['variation', 'client_id', sesion])[0].reset_index().drop(columns='client_id')
+
+    #agregamos una columna con el tiempo total por sesión de cada id de visita
+    df_tiempo_de_permanencia['difference_time'] = df_tiempo_de_permanencia['max'] - df_tiempo_de_permanencia['min']
+
+    #transformamos el tiempo a segundos
+    df_tiempo_de_permanencia['difference_time_in_seconds'] = df_tiempo_de_permanencia['difference_time'].dt.total_seconds()
+
+    return df_tiempo_de_permanencia
+
+def calcular_tasa_conversion(df_exp, df_final_web_data):
+
+    """
+    Calcula la tasa de conversión total por variación: clientes que llegan a 'confirm' entre clientes que pasan por 'start'.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas o iterable de DataFrames): Datos web completos o por trozos (leer_datos_stream).
+
+    Devuelve:
+    - conversion_rate_total (Series de Pandas): Tasa de conversión por variación.
+    """
+
+    import pandas as pd
+
+    #guardamos los pares únicos de variación y cliente que pasan por 'start' y por 'confirm'
+    inicios, confirmaciones = [], []
+    for df_merged in _transacciones_por_trozos(df_exp, df_final_web_data, ['client_id', 'process_step']):
+        inicios.append(df_merged.loc[df_merged['process_step'] == 'start', ['variation', 'client_id']].drop_duplicates())
+        confirmaciones.append(df_merged.loc[df_merged['process_step'] == 'confirm', ['variation', 'client_id']].drop_duplicates())
+        #combinamos los parciales cada pocos trozos para que la memoria dependa del número de clientes
+        if len(inicios) >= 8:
+            inicios = [pd.concat(inicios).drop_duplicates()]
+            confirmaciones = [pd.concat(confirmaciones).drop_duplicates()]
+
+    #calculamos el número total de usuarios que completaron el proceso (llegaron al paso 'confirm')
+    confirm_total_por_variacion = pd.concat(confirmaciones).groupby('variation', observed=True)['client_id'].nunique()
+
+    #calculamos el número total de usuarios que comenzaron el proceso (iniciaron el paso 'start')
+    start_total_por_variacion = pd.concat(inicios).groupby('variation', observed=True)['client_id'].nunique()
+
+    #calculamos la tasa de conversión total por variación
+    conversion_rate_total = confirm_total_por_variacion / start_total_por_variacion
+
+    return conversion_rate_total
+
+def matriz_transiciones(df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Cuenta las transiciones entre los pasos del proceso de cada variación en una matriz de 5x5.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - inactividad (float): Si se indica, las transiciones se cuentan dentro de sesiones por inactividad (ver obtener_transacciones).
+
+    Devuelve:
+    - df_matriz (DataFrame de Pandas): Número de eventos con índice (variation, last_step) y una columna por paso actual,
+      ambos en el orden de PASOS_PROCESO. Por ejemplo, df_matriz.loc[('Test', 'start'), 'step_1'] son los pasos de
+      'start' a 'step_1' de los clientes de test.
+
+    Todas las variaciones se cuentan a la vez con un único np.bincount sobre variación * 25 + transition.
+    """
 
+    import numpy as np
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
 
-    #calculamos la matriz de correlación para crear un mapa de calor que muestre la relación entre variables numéricas
-    matriz_de_correlacion = df_clientes_principales[['total_balance', 'age', 'num_accounts']].corr()
+    df_transacciones = obtener_transacciones(df_exp, df_final_web_data, inactividad)
 
-    #ajustamos el tamaño
-    plt.figure(figsize=(8, 6))
+    n_pasos = len(PASOS_PROCESO)
+    codigos_variacion, variaciones = pd.factorize(df_transacciones['variation'], sort=True)
+    transicion = df_transacciones['transition'].to_numpy()
 
-    #creamos el mapa de calor
-    sns.heatmap(matriz_de_correlacion, annot=True, cmap='coolwarm', fmt=".2f")
+    #solo cuentan las filas con paso anterior
+    validas = transicion >= 0
+    clave = codigos_variacion[validas].astype(np.int64) * n_pasos * n_pasos + transicion[validas]
+    conteo = np.bincount(clave, minlength=len(variaciones) * n_pasos * n_pasos)
 
-    #otorgamos un título
-    plt.title('Matriz de Correlación')
+    indice = pd.MultiIndex.from_product([list(variaciones), PASOS_PROCESO], names=['variation', 'last_step'])
+    df_matriz = pd.DataFrame(conteo.reshape(-1, n_pasos), index=indice, columns=pd.Index(PASOS_PROCESO, name='process_step'))
 
-    #mostramos el gráfico
-    plt.show()
+    return df_matriz
 
-def grafico_dinero_y_num_cuentas(df_clientes_principales):
+def _alcance_clientes(grupo, client_ids, paso, n_grupos):
 
     """
-    Genera un gráfico de distribución del número de cuentas y dinero en cuenta de los clientes principales.
+    Cuenta los clientes únicos de cada grupo y cuántos de ellos llegan a cada paso del proceso.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - grupo (array de NumPy): Código del grupo de cada evento (por ejemplo, su variación), entre 0 y n_grupos - 1.
+    - client_ids (Series de Pandas): Cliente de cada evento.
+    - paso (array de NumPy): Posición del paso de cada evento en PASOS_PROCESO, o -1 si se desconoce.
+    - n_grupos (int): Número de grupos.
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """  
+    Devuelve:
+    - n_clientes (array de NumPy): Clientes con algún evento en cada grupo.
+    - alcance (array de NumPy de n_grupos x 5): Clientes de cada grupo que tienen algún evento en cada paso.
+
+    Se numeran los pares (grupo, cliente) y se marca en una tabla (par, paso) qué pasos ve cada uno, sin groupby ni nunique.
+    """
 
+    import numpy as np
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
 
-    #ajustamos el tamaño del gráfico
-    plt.figure(figsize=(10, 8))
+    cliente, clientes = pd.factorize(client_ids)
+    con_cliente = cliente >= 0
+    par, pares = pd.factorize(grupo[con_cliente].astype(np.int64) * (len(clientes) + 1) + cliente[con_cliente])
+    grupo_par = pares // (len(clientes) + 1)
 
-    #creamos el gráfico de cajas
-    sns.boxplot(x=df_clientes_principales['num_accounts'], y=df_clientes_principales['total_balance'], palette='coolwarm')
-    
-    #otorgamos título y etiquetas
-    plt.title('Dinero en Cuenta de los Principales Clientes por Número de Cuentas')
-    plt.xlabel('Número de Cuentas')
-    plt.ylabel('Dinero en Cuenta')
+    paso = paso[con_cliente]
+    con_paso = paso >= 0
+    llega = np.zeros((len(pares), len(PASOS_PROCESO)), dtype=bool)
+    llega[par[con_paso], paso[con_paso]] = True
 
-    #mostramos el gráfico
-    plt.show()
+    n_clientes = np.bincount(grupo_par, minlength=n_grupos)
+    alcance = np.column_stack([np.bincount(grupo_par, weights=llega[:, i], minlength=n_grupos) for i in range(len(PASOS_PROCESO))]).astype(np.int64)
 
-def grafico_dinero_segun_edad(df_clientes_principales):
+    return n_clientes, alcance
+
+def calcular_embudo(df_exp, df_final_web_data, inactividad=None):
 
     """
-    Genera un gráfico de distribución del dinero en cuenta según la edad de los clientes principales.
+    Calcula de una vez todas las métricas del embudo del proceso de cada variación: alcance de cada paso, conversión
+    entre pasos, conversión total y abandono.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - inactividad (float): Si se indica, las transiciones y las visitas son sesiones por inactividad (ver obtener_transacciones).
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """ 
-    
+    Devuelve:
+    - embudo (dict): Resultados por variación, con los pasos en el orden de PASOS_PROCESO:
+      - 'clientes' (Series de Pandas): Clientes con algún evento.
+      - 'eventos' (DataFrame de Pandas): Eventos de cada paso, igual que calcular_drop_off.
+      - 'alcance' (DataFrame de Pandas): Clientes que llegan a cada paso.
+      - 'conversion_pasos' (DataFrame de Pandas): Clientes que llegan a cada paso entre los que llegan al anterior
+        (una columna por paso desde 'step_1').
+      - 'tasa_conversion' (Series de Pandas): Clientes en 'confirm' entre clientes en 'start', igual que calcular_tasa_conversion.
+      - 'tasa_abandono' (Series de Pandas): Proporción de clientes que no llegan a 'confirm'.
+      - 'transiciones' (DataFrame de Pandas): Matriz de transiciones, igual que matriz_transiciones.
+      - 'conversion_visitas' (DataFrame de Pandas): Eventos 'start', cuántos son de visitas que llegan a 'confirm' y su
+        proporción (las observaciones de test_hipotesis_tasa_conversion).
+
+    Los conteos salen de np.bincount sobre los códigos de variación, paso y transición de las transacciones compartidas
+    y el alcance de _alcance_clientes. El resultado se guarda con la
+    misma huella que obtener_transacciones, así que todos los gráficos del embudo lo calculan una sola vez.
+    """
+
+    import numpy as np
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
 
-    #agrupamos las edades por grupos de edad: jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54.
-    bins = [18, 36, 54, df_clientes_principales['age'].max()]
-    labels = ['jóvenes', 'adultos jóvenes', 'adultos mayores']
+    clave = (_huella_dataframes(df_exp, df_final_web_data), inactividad)
+    if clave in _CACHE_EMBUDO:
+        return _CACHE_EMBUDO[clave]
+
+    df_transacciones = _transacciones_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    n_pasos = len(PASOS_PROCESO)
+    codigo, variaciones = pd.factorize(df_transacciones['variation'], sort=True)
+    codigo = codigo.astype(np.int64)
+    n_var = len(variaciones)
+    paso = _posiciones_paso(df_transacciones['process_step']).astype(np.int64)
+
+    #eventos por variación y paso, y transiciones entre pasos
+    con_paso = paso >= 0
+    eventos = np.bincount(codigo[con_paso] * n_pasos + paso[con_paso], minlength=n_var * n_pasos).reshape(n_var, n_pasos)
+    transicion = df_transacciones['transition'].to_numpy()
+    validas = transicion >= 0
+    transiciones = np.bincount(codigo[validas] * n_pasos * n_pasos + transicion[validas], minlength=n_var * n_pasos * n_pasos)
+
+    #clientes de cada variación y cuántos llegan a cada paso
+    n_clientes, alcance = _alcance_clientes(codigo, df_transacciones['client_id'], paso, n_var)
+
+    #eventos 'start' de cada variación y cuántos pertenecen a una visita que llega a 'confirm'
+    df_visitas = _visitas_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    variacion_visita = pd.Categorical(df_visitas['variation'], categories=variaciones).codes
+    inicios = df_visitas['n_starts'].to_numpy()
+    starts = np.bincount(variacion_visita, weights=inicios, minlength=n_var).astype(np.int64)
+    confirmados = np.bincount(variacion_visita, weights=inicios * df_visitas['reached_confirm'].to_numpy(), minlength=n_var).astype(np.int64)
+
+    indice = pd.Index(variaciones, name='variation')
+    columnas = pd.Index(PASOS_PROCESO, name='process_step')
+    df_alcance = pd.DataFrame(alcance, index=indice, columns=columnas)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        embudo = {'clientes': pd.Series(n_clientes, index=indice, name='clients'),
+                  'eventos': pd.DataFrame(eventos, index=indice, columns=columnas),
+                  'alcance': df_alcance,
+                  'conversion_pasos': pd.DataFrame(alcance[:, 1:] / alcance[:, :-1], index=indice, columns=columnas[1:]),
+                  'tasa_conversion': pd.Series(alcance[:, -1] / alcance[:, 0], index=indice, name='conversion_rate'),
+                  'tasa_abandono': pd.Series(1 - alcance[:, -1] / n_clientes, index=indice, name='abandonment_rate'),
+                  'transiciones': pd.DataFrame(transiciones.reshape(-1, n_pasos), columns=columnas,
+                                               index=pd.MultiIndex.from_product([list(variaciones), PASOS_PROCESO], names=['variation', 'last_step'])),
+                  'conversion_visitas': pd.DataFrame({'starts': starts, 'confirmed_starts': confirmados, 'rate': confirmados / starts}, index=indice)}
+
+    #guardamos el embudo con la misma política que las transacciones
+    if len(_CACHE_EMBUDO) >= 2:
+        del _CACHE_EMBUDO[next(iter(_CACHE_EMBUDO))]
+    _CACHE_EMBUDO[clave] = embudo
+
+    return embudo
+
+def construir_cubo_segmentos(df_exp, df_final_web_data, df_final_demo, inactividad=None, bandas=None):
+
+    """
+    Precalcula un cubo con los conteos del embudo y las sumas del tiempo de permanencia por variación y segmento
+    demográfico (género y bandas de edad, antigüedad y saldo), para consultarlo después con consultar_cubo.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de datos demográficos.
+    - inactividad (float): Si se indica, las visitas son sesiones por inactividad (ver obtener_transacciones).
+    - bandas (dict): Columna de df_final_demo -> (límites, nombres) de sus bandas, como en pd.cut. Por defecto BANDAS_DEMO.
+
+    Devuelve:
+    - cubo (dict): Cubo con las claves:
+      - 'dimensiones' (dict): Nombre de cada dimensión ('variation', 'gender' y las columnas de 'bandas') -> lista de sus
+        valores. Los clientes sin dato demográfico (o que no están en df_final_demo) van al valor 'desconocido'.
+      - 'medidas' (list): Nombres de las medidas: 'clients', 'reach_<paso>' (clientes que llegan al paso),
+        'events_<paso>', 'visits', 'seconds_sum', 'seconds_sumsq' y 'visits_10s_or_less' (tiempo de permanencia de las
+        visitas), 'starts' y 'confirmed_starts' (observaciones del test de conversión).
+      - 'valores' (array de NumPy): Una dimensión por cada una de 'dimensiones' y la última para las medidas.
+
+    Todas las medidas son sumas y cada cliente está en una sola celda, así que cualquier agregación del cubo se obtiene
+    sumando celdas. Se calcula con una pasada de np.bincount sobre las transacciones y las visitas compartidas, con el
+    código de celda de cada cliente buscado en un índice (_indice_clientes) en lugar de unir las tablas.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    bandas = BANDAS_DEMO if bandas is None else bandas
+    desconocido = 'desconocido'
+
+    #código de cada dimensión demográfica por cliente; el último valor de cada una es 'desconocido'
+    generos = df_final_demo['gender']
+    if isinstance(generos.dtype, pd.CategoricalDtype):
+        codigo, valores = generos.cat.codes.to_numpy(), list(generos.cat.categories)
+    else:
+        codigo, valores = pd.factorize(generos, sort=True)
+        valores = list(valores)
+    dimensiones = {'gender': valores + [desconocido]}
+    codigos = [np.where(codigo < 0, len(valores), codigo)]
+    for columna, (limites, nombres) in bandas.items():
+        banda = pd.cut(df_final_demo[columna], bins=limites, labels=False, include_lowest=True).to_numpy()
+        dimensiones[columna] = list(nombres) + [desconocido]
+        codigos.append(np.where(np.isnan(banda), len(nombres), banda).astype(np.int64))
+
+    #celda de cada cliente, numerando las combinaciones de las dimensiones
+    forma = [len(valores) for valores in dimensiones.values()]
+    celda = np.ravel_multi_index(codigos, forma).astype(np.int64)
+    sin_datos = np.ravel_multi_index([n - 1 for n in forma], forma)
+    n_celdas = int(np.prod(forma))
+    indice = _indice_clientes(df_final_demo['client_id'].to_numpy(), celda)
+
+    def celdas(client_ids):
+        codigo = _buscar_codigos(indice, client_ids)
+        return np.where(codigo < 0, sin_datos, codigo)
+
+    #grupo (variación, celda) de cada evento; la huella de los datos se calcula una vez para las transacciones y las visitas
+    clave = (_huella_dataframes(df_exp, df_final_web_data), inactividad)
+    df_transacciones = _transacciones_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    variacion, variaciones = pd.factorize(df_transacciones['variation'], sort=True)
+    n_grupos = len(variaciones) * n_celdas
+    grupo = variacion.astype(np.int64) * n_celdas + celdas(df_transacciones['client_id'])
+    paso = _posiciones_paso(df_transacciones['process_step']).astype(np.int64)
+
+    #conteos del embudo: clientes, clientes que llegan a cada paso y eventos de cada paso
+    n_pasos = len(PASOS_PROCESO)
+    n_clientes, alcance = _alcance_clientes(grupo, df_transacciones['client_id'], paso, n_grupos)
+    con_paso = paso >= 0
+    eventos = np.bincount(grupo[con_paso] * n_pasos + paso[con_paso], minlength=n_grupos * n_pasos).reshape(n_grupos, n_pasos)
+
+    #sumas del tiempo de permanencia y observaciones del test de conversión por visita
+    df_visitas = _visitas_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    grupo_visita = pd.Categorical(df_visitas['variation'], categories=variaciones).codes.astype(np.int64) * n_celdas + celdas(df_visitas['client_id'])
+    segundos = df_visitas['difference_time_in_seconds'].to_numpy()
+    con_tiempo = ~np.isnan(segundos)
+    g, s = grupo_visita[con_tiempo], segundos[con_tiempo]
+    inicios = df_visitas['n_starts'].to_numpy()
+    por_visita = [np.bincount(g, minlength=n_grupos), np.bincount(g, weights=s, minlength=n_grupos),
+                  np.bincount(g, weights=s * s, minlength=n_grupos), np.bincount(g, weights=s <= 10, minlength=n_grupos),
+                  np.bincount(grupo_visita, weights=inicios, minlength=n_grupos),
+                  np.bincount(grupo_visita, weights=inicios * df_visitas['reached_confirm'].to_numpy(), minlength=n_grupos)]
+
+    medidas = (['clients'] + [f'reach_{p}' for p in PASOS_PROCESO] + [f'events_{p}' for p in PASOS_PROCESO]
+               + ['visits', 'seconds_sum', 'seconds_sumsq', 'visits_10s_or_less', 'starts', 'confirmed_starts'])
+    valores = np.column_stack([n_clientes, alcance, eventos] + por_visita).astype(np.float64)
+
+    return {'dimensiones': {'variation': list(variaciones), **dimensiones}, 'medidas': medidas,
+            'valores': valores.reshape([len(variaciones)] + forma + [len(medidas)])}
+
+def consultar_cubo(cubo, por=('variation',), **filtros):
+
+    """
+    Consulta el cubo de construir_cubo_segmentos: filtra sus dimensiones y suma las que no se piden.
+
+    Argumentos:
+    - cubo (dict): Cubo creado con construir_cubo_segmentos.
+    - por (tuple): Dimensiones que se mantienen en el resultado, en el orden de los niveles del índice; el resto se suman.
+    - filtros: Valor o lista de valores de cada dimensión que se quiere filtrar, por ejemplo gender='F' o
+      age=['jóvenes', 'adultos jóvenes']. Un valor que no es de su dimensión produce un ValueError.
+
+    Devuelve:
+    - df_consulta (DataFrame de Pandas): Una fila por combinación de las dimensiones de 'por', con las medidas del cubo y
+      las métricas derivadas 'conversion_rate' (clientes en 'confirm' entre clientes en 'start'), 'abandonment_rate',
+      'mean_seconds' y 'var_seconds' (media y varianza con ddof=1 del tiempo de permanencia).
+
+    Solo opera sobre el array del cubo (unos pocos miles de celdas), sin volver a recorrer los eventos.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    nombres = list(cubo['dimensiones'])
+    por = list(dict.fromkeys(por))
+    desconocidas = [dimension for dimension in por + list(filtros) if dimension not in nombres]
+    if desconocidas:
+        raise ValueError(f'Dimensiones desconocidas: {desconocidas}. Las dimensiones del cubo son {nombres}')
+
+    #posiciones de los valores elegidos en cada dimensión
+    posiciones = []
+    for nombre in nombres:
+        valores = cubo['dimensiones'][nombre]
+        if nombre in filtros:
+            elegidos = filtros[nombre] if isinstance(filtros[nombre], (list, tuple, set)) else [filtros[nombre]]
+            fuera = [valor for valor in elegidos if valor not in valores]
+            if fuera:
+                raise ValueError(f'Valores desconocidos de {nombre}: {fuera}. Sus valores son {valores}')
+            posiciones.append([valores.index(valor) for valor in valores if valor in elegidos])
+        else:
+            posiciones.append(list(range(len(valores))))
+
+    #filtramos y sumamos las dimensiones que no se mantienen
+    seleccion = cubo['valores'][np.ix_(*posiciones, np.arange(len(cubo['medidas'])))]
+    sumadas = tuple(i for i, nombre in enumerate(nombres) if nombre not in por)
+    seleccion = seleccion.sum(axis=sumadas)
+
+    #ponemos las dimensiones mantenidas en el orden de 'por'
+    mantenidas = [nombres.index(nombre) for nombre in por]
+    en_cubo = sorted(mantenidas)
+    seleccion = seleccion.transpose([en_cubo.index(i) for i in mantenidas] + [len(mantenidas)])
+    etiquetas = [[cubo['dimensiones'][nombres[i]][j] for j in posiciones[i]] for i in mantenidas]
+
+    if len(etiquetas) > 1:
+        indice = pd.MultiIndex.from_product(etiquetas, names=[nombres[i] for i in mantenidas])
+    elif etiquetas:
+        indice = pd.Index(etiquetas[0], name=nombres[mantenidas[0]])
+    else:
+        indice = pd.Index(['total'])
+
+    #métricas derivadas de las sumas, calculadas sobre el array antes de crear el DataFrame
+    m = dict(zip(cubo['medidas'], seleccion.reshape(-1, len(cubo['medidas'])).T))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = m['seconds_sum'] / m['visits']
+        derivadas = {'conversion_rate': m[f'reach_{PASOS_PROCESO[-1]}'] / m[f'reach_{PASOS_PROCESO[0]}'],
+                     'abandonment_rate': 1 - m[f'reach_{PASOS_PROCESO[-1]}'] / m['clients'],
+                     'mean_seconds': media,
+                     'var_seconds': (m['seconds_sumsq'] - m['seconds_sum'] * media) / (m['visits'] - 1)}
+
+    return pd.DataFrame(np.column_stack(list(m.values()) + list(derivadas.values())), index=indice,
+                        columns=list(m) + list(derivadas))
+
+def _histogramas_trozo(df_merged, origen=INICIO_EXPERIMENTO):
+
+    """
+    Cuenta los eventos de unas transacciones por variación y día, y por variación, día de la semana y hora.
+
+    Argumentos:
+    - df_merged (DataFrame de Pandas): Eventos con 'variation' y 'date_time' (datetime) o 'segundos' (tiempo compacto).
+    - origen (str): Origen de la columna 'segundos' (ver decodificar_fecha_hora).
+
+    Devuelve:
+    - histogramas (dict): 'dia' y 'hora_dia_semana', como en calcular_histogramas_tiempo.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    #segundos desde 1970-01-01 de cada evento, sin las fechas nulas
+    if 'segundos' in df_merged.columns:
+        segundos = df_merged['segundos'].to_numpy().astype(np.int64) + pd.Timestamp(origen).value // 10**9
+        validas = np.ones(len(segundos), dtype=bool)
+    else:
+        fechas = df_merged['date_time'].to_numpy()
+        validas = ~np.isnat(fechas)
+        segundos = fechas.view(np.int64) // 10**9
+    codigo, variaciones = pd.factorize(df_merged['variation'], sort=True)
+    validas &= codigo >= 0
+    segundos, codigo = segundos[validas], codigo[validas].astype(np.int64)
+    n_var = len(variaciones)
+
+    #día, día de la semana (el 1970-01-01 fue jueves) y hora con aritmética entera
+    dia = segundos // 86400
+    dia_semana = (dia + 3) % 7
+    hora = segundos % 86400 // 3600
+    primero = int(dia.min()) if len(dia) else 0
+    n_dias = int(dia.max()) - primero + 1 if len(dia) else 0
+
+    por_dia = np.bincount(codigo * n_dias + dia - primero, minlength=n_var * n_dias).reshape(n_var, n_dias)
+    por_hora = np.bincount((codigo * 7 + dia_semana) * 24 + hora, minlength=n_var * 7 * 24).reshape(n_var * 7, 24)
+
+    indice = pd.Index(list(variaciones), name='variation')
+    dias = pd.DatetimeIndex((np.arange(n_dias) + primero) * 86400 * 10**9, name='date')
+    return {'dia': pd.DataFrame(por_dia, index=indice, columns=dias),
+            'hora_dia_semana': pd.DataFrame(por_hora, columns=pd.RangeIndex(24, name='hour'),
+                                            index=pd.MultiIndex.from_product([list(variaciones), DIAS_SEMANA], names=['variation', 'weekday']))}
+
+def combinar_histogramas(histogramas):
+
+    """
+    Combina histogramas de tiempo calculados por separado (por trozos o particiones de los datos) sumándolos.
+
+    Argumentos:
+    - histogramas (iterable de dict): Resultados de calcular_histogramas_tiempo (o de cada trozo).
+
+    Devuelve:
+    - histogramas (dict): Histogramas con las claves 'dia', 'mes', 'dia_semana', 'hora' y 'hora_dia_semana'
+      (ver calcular_histogramas_tiempo). Los de mes, día de la semana y hora se obtienen de los de día y de hora y día
+      de la semana, que son los únicos que se suman.
+    """
+
+    import pandas as pd
+
+    por_dia, por_hora = None, None
+    for parcial in histogramas:
+        por_dia = parcial['dia'] if por_dia is None else por_dia.add(parcial['dia'], fill_value=0)
+        por_hora = parcial['hora_dia_semana'] if por_hora is None else por_hora.add(parcial['hora_dia_semana'], fill_value=0)
+
+    #los días que faltan en algún trozo quedan con 0 y en orden de fecha; los días de la semana vuelven a su orden natural
+    por_dia = por_dia.fillna(0).sort_index(axis=1).astype('int64')
+    por_dia.columns.name = 'date'
+    variaciones = list(por_hora.index.get_level_values('variation').unique())
+    por_hora = por_hora.reindex(pd.MultiIndex.from_product([sorted(variaciones), DIAS_SEMANA], names=['variation', 'weekday']), fill_value=0).astype('int64')
+
+    por_mes = por_dia.T.groupby(por_dia.columns.to_period('M')).sum().T
+    por_mes.columns.name = 'month'
+
+    return {'dia': por_dia, 'mes': por_mes,
+            'dia_semana': por_hora.sum(axis=1).unstack('weekday')[DIAS_SEMANA],
+            'hora': por_hora.groupby(level='variation').sum(),
+            'hora_dia_semana': por_hora}
+
+def calcular_histogramas_tiempo(df_exp, df_final_web_data, origen=INICIO_EXPERIMENTO):
+
+    """
+    Calcula los histogramas del tráfico (número de eventos) de cada variación por día, mes, día de la semana, hora y
+    hora y día de la semana.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas o iterable de DataFrames): Datos web completos o por trozos (leer_datos_stream),
+      con 'date_time' o con el tiempo compacto de limpiar_web(tiempo_compacto=True).
+    - origen (str): Origen de la columna 'segundos' si los datos tienen el tiempo compacto.
+
+    Devuelve:
+    - histogramas (dict): DataFrames de Pandas con una fila por variación:
+      - 'dia': Una columna por día (fecha).
+      - 'mes': Una columna por mes (Period).
+      - 'dia_semana': Una columna por día de la semana, de lunes a domingo (DIAS_SEMANA).
+      - 'hora': Una columna por hora, de 0 a 23.
+      - 'hora_dia_semana': Una fila por variación y día de la semana y una columna por hora.
+
+    Cada trozo se recorre una vez con dos np.bincount sobre los segundos enteros de cada evento (por día y por hora y
+    día de la semana); el resto de histogramas se suman a partir de esos. Los resultados de distintos trozos o
+    particiones se combinan con combinar_histogramas.
+    """
+
+    import pandas as pd
+
+    #con el tiempo compacto no hay 'date_time' para sesionizar, así que solo añadimos la variación
+    if isinstance(df_final_web_data, pd.DataFrame) and 'segundos' in df_final_web_data.columns:
+        trozos = [_unir_variacion(df_exp, df_final_web_data[['client_id', 'segundos']])]
+    else:
+        trozos = _transacciones_por_trozos(df_exp, df_final_web_data, ['client_id', 'date_time'])
+
+    return combinar_histogramas(_histogramas_trozo(df_merged, origen) for df_merged in trozos)
+
+def _codigos_segmento(df_final_demo, segmento, client_ids):
+
+    """
+    Busca el segmento demográfico de cada evento a partir de su cliente.
+
+    Argumentos:
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de datos demográficos.
+    - segmento (str): Columna de df_final_demo que define los segmentos, por ejemplo 'gender'.
+    - client_ids (Series de Pandas o array de NumPy): Cliente de cada evento.
+
+    Devuelve:
+    - codigos (array de NumPy): Posición del segmento de cada evento en 'segmentos', o -1 si se desconoce.
+    - segmentos (Index de Pandas): Valores del segmento, ordenados.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    valores = df_final_demo[segmento]
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        codigos, segmentos = valores.cat.codes.to_numpy(), valores.cat.categories
+    else:
+        codigos, segmentos = pd.factorize(valores, sort=True)
+    codigos = codigos.astype(np.int32)
+
+    indice = _indice_clientes(df_final_demo['client_id'].to_numpy(), codigos)
+    return _buscar_codigos(indice, client_ids), segmentos
+
+def calcular_errores(df_exp, df_final_web_data, df_final_demo=None, segmento=None, inactividad=None):
+
+    """
+    Cuenta los errores de los usuarios en cada paso por variación (y opcionalmente por segmento demográfico).
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - df_final_demo (DataFrame de Pandas): DataFrame limpio de datos demográficos; solo hace falta con 'segmento'.
+    - segmento (str): Columna de df_final_demo por la que se desglosan los errores, por ejemplo 'gender'.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
+
+    Devuelve:
+    - df_errores (DataFrame de Pandas): Una fila por variación, segmento (si se indica) y paso, con las columnas
+      'backtracks' (vueltas desde ese paso a uno anterior, por ejemplo step_2 -> step_1), 'repeats' (repeticiones
+      del paso) y 'errors' (la suma de los dos).
+
+    Los errores se atribuyen al paso en el que estaba el usuario antes de equivocarse. Todas las combinaciones se cuentan
+    con un único np.bincount sobre los códigos de transición de obtener_transacciones. Los eventos de clientes sin
+    segmento conocido no se cuentan en el desglose por segmento.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    df_transacciones = obtener_transacciones(df_exp, df_final_web_data, inactividad)
+    n_pasos = len(PASOS_PROCESO)
+
+    #tipo de error de cada transición: 0 retroceso, 1 repetición, -1 ninguno
+    transicion = df_transacciones['transition'].to_numpy().astype(np.int64)
+    anterior, actual = transicion // n_pasos, transicion % n_pasos
+    tipo = np.where(transicion < 0, -1, np.where(actual < anterior, 0, np.where(actual == anterior, 1, -1)))
+
+    codigos_variacion, variaciones = pd.factorize(df_transacciones['variation'], sort=True)
+    clave = codigos_variacion.astype(np.int64)
+    niveles, nombres = [list(variaciones)], ['variation']
+    validas = (tipo >= 0) & (clave >= 0)
+
+    #el segmento de cada evento se busca por cliente en df_final_demo
+    if segmento is not None:
+        codigos_seg, segmentos = _codigos_segmento(df_final_demo, segmento, df_transacciones['client_id'])
+        clave = clave * len(segmentos) + codigos_seg
+        validas &= codigos_seg >= 0
+        niveles.append(list(segmentos))
+        nombres.append(segmento)
+
+    #contamos todas las combinaciones (variación, segmento, paso, tipo) de una vez
+    clave = (clave[validas] * n_pasos + anterior[validas]) * 2 + tipo[validas]
+    n_grupos = int(np.prod([len(nivel) for nivel in niveles]))
+    conteo = np.bincount(clave, minlength=n_grupos * n_pasos * 2).reshape(-1, 2)
+
+    indice = pd.MultiIndex.from_product(niveles + [PASOS_PROCESO], names=nombres + ['step'])
+    df_errores = pd.DataFrame(conteo, index=indice, columns=['backtracks', 'repeats'])
+    df_errores['errors'] = df_errores['backtracks'] + df_errores['repeats']
+
+    return df_errores.reset_index()
+
+def _hash_caminos(paso, desde, hasta):
+
+    """
+    Calcula un hash de 64 bits de la secuencia de pasos de cada visita.
+
+    Argumentos:
+    - paso (array de NumPy): Posición en PASOS_PROCESO del paso de cada evento (-1 si es desconocido).
+    - desde, hasta (arrays de NumPy): Posiciones del primer evento y siguiente al último de cada visita en 'paso'.
+
+    Devuelve:
+    - hashes (array de NumPy de uint64): Hash de cada visita; dos visitas con los mismos pasos en el mismo orden tienen el mismo.
+
+    Cada secuencia se trata como un polinomio (sum((paso + 2) * B^(n-1-k)) módulo 2^64, con B impar) que se evalúa para
+    todas las visitas a la vez con np.add.reduceat; después se mezcla con la longitud y con _mezclar_hash.
+    """
+
+    import numpy as np
+
+    longitudes = (hasta - desde).astype(np.int64)
+    if len(longitudes) == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    #potencias de la base hasta la visita más larga (las multiplicaciones de uint64 son módulo 2^64)
+    potencias = np.full(int(longitudes.max()), np.uint64(0x100000001b3), dtype=np.uint64)
+    potencias[0] = 1
+    potencias = np.cumprod(potencias, dtype=np.uint64)
+
+    #posición de los eventos de las visitas, una detrás de otra (las visitas no tienen por qué ser contiguas en 'paso')
+    inicios = np.zeros(len(longitudes), dtype=np.int64)
+    np.cumsum(longitudes[:-1], out=inicios[1:])
+    eventos = np.arange(int(longitudes.sum())) + np.repeat(desde - inicios, longitudes)
+
+    #exponente de cada evento: eventos que le quedan por detrás dentro de su visita
+    exponente = np.repeat(hasta, longitudes) - 1 - eventos
+    termino = (paso[eventos].astype(np.int64) + 2).astype(np.uint64) * potencias[exponente]
+
+    hashes = np.add.reduceat(termino, inicios)
+    hashes ^= longitudes.astype(np.uint64) * np.uint64(0x9e3779b97f4a7c15)
+    return _mezclar_hash(hashes)
+
+def _fusionar_misra_gries(claves, conteos, representantes, capacidad):
+
+    """
+    Junta contadores de Misra-Gries (o conteos exactos) y los reduce a como mucho 'capacidad' claves.
+
+    Argumentos:
+    - claves (array de NumPy de uint64): Claves de los contadores; puede haber repetidas.
+    - conteos (array de NumPy de int64): Conteo de cada clave.
+    - representantes (array de NumPy): Un elemento de ejemplo de cada clave (se conserva el primero).
+    - capacidad (int): Número máximo de contadores.
+
+    Devuelve:
+    - claves, conteos, representantes (arrays de NumPy): Resumen combinado.
+
+    Si quedan más de 'capacidad' claves se resta a todas el conteo de la clave número capacidad + 1 y se descartan las que
+    quedan a cero (fusión de resúmenes de Misra-Gries). Cada conteo final infravalora el real como mucho en N / (capacidad + 1),
+    siendo N el total contado, así que toda clave con frecuencia mayor que N / (capacidad + 1) sigue en el resumen.
+    """
+
+    import numpy as np
+
+    claves, primera, inversa = np.unique(claves, return_index=True, return_inverse=True)
+    conteos = np.bincount(inversa, weights=conteos, minlength=len(claves)).astype(np.int64)
+    representantes = representantes[primera]
+
+    if len(claves) > capacidad:
+        umbral = np.partition(conteos, len(conteos) - capacidad - 1)[len(conteos) - capacidad - 1]
+        conteos = conteos - umbral
+        quedan = conteos > 0
+        claves, conteos, representantes = claves[quedan], conteos[quedan], representantes[quedan]
+
+    return claves, conteos, representantes
+
+def caminos_frecuentes(df_exp, df_final_web_data, n=10, capacidad=None, inactividad=None, bloque=1_000_000):
+
+    """
+    Busca los N caminos completos (secuencias de pasos de una visita, como 'start>step_1>step_2>confirm') más frecuentes
+    de cada variación.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - n (int): Número de caminos por variación.
+    - capacidad (int): Contadores del resumen de cada variación; por defecto max(1000, 100 * n).
+    - inactividad (float): Si se indica, los caminos son de sesiones por inactividad (ver obtener_transacciones).
+    - bloque (int): Visitas que se procesan a la vez; limita la memoria de los arrays intermedios.
+
+    Devuelve:
+    - df_caminos (DataFrame de Pandas): Columnas 'variation', 'rank', 'path', 'n_steps', 'visits' (visitas con ese camino)
+      y 'share' (proporción de las visitas de la variación).
+
+    Cada visita se reduce a un hash de su secuencia de pasos (_hash_caminos) y los hashes se cuentan por bloques en un
+    resumen de Misra-Gries de tamaño fijo (_fusionar_misra_gries), sin crear listas de pasos por visita. Los textos
+    solo se construyen para los N caminos finales, a partir de una visita de ejemplo. Si hay más caminos distintos que
+    contadores, 'visits' es una cota inferior con un error máximo de (visitas de la variación) / (capacidad + 1).
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    if capacidad is None:
+        capacidad = max(1000, 100 * n)
+
+    #la huella de los datos se calcula una vez para las transacciones y las visitas
+    clave = (_huella_dataframes(df_exp, df_final_web_data), inactividad)
+    df_transacciones = _transacciones_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    df_visitas = _visitas_en_cache(clave, df_exp, df_final_web_data, inactividad)
+    paso = _posiciones_paso(df_transacciones['process_step'])
+    desde, hasta = df_visitas['start_offset'].to_numpy(), df_visitas['end_offset'].to_numpy()
+    codigos_variacion, variaciones = pd.factorize(df_visitas['variation'], sort=True)
+    nombres = np.array(PASOS_PROCESO + ['nan'], dtype=object)
+
+    filas = []
+    for codigo, variacion in enumerate(variaciones):
+        visitas = np.flatnonzero(codigos_variacion == codigo)
+        claves = np.zeros(0, dtype=np.uint64)
+        conteos = np.zeros(0, dtype=np.int64)
+        representantes = np.zeros(0, dtype=np.int64)
+
+        #contamos cada bloque de visitas y lo juntamos con el resumen
+        for inicio in range(0, len(visitas), bloque):
+            trozo = visitas[inicio:inicio + bloque]
+            hashes = _hash_caminos(paso, desde[trozo], hasta[trozo])
+            claves, conteos, representantes = _fusionar_misra_gries(np.concatenate([claves, hashes]),
+                                                                    np.concatenate([conteos, np.ones(len(trozo), dtype=np.int64)]),
+                                                                    np.concatenate([representantes, trozo]), capacidad)
+
+        #los N mayores, con el texto del camino de su visita de ejemplo
+        mejores = np.argsort(-conteos, kind='stable')[:n]
+        for posicion, i in enumerate(mejores):
+            visita = representantes[i]
+            camino = nombres[paso[desde[visita]:hasta[visita]]]
+            filas.append({'variation': variacion, 'rank': posicion + 1, 'path': '>'.join(camino), 'n_steps': len(camino),
+                          'visits': int(conteos[i]), 'share': conteos[i] / len(visitas)})
+
+    df_caminos = pd.DataFrame(filas, columns=['variation', 'rank', 'path', 'n_steps', 'visits', 'share'])
+
+    return df_caminos
+
+def _repartir_por_cliente(df, n_particiones):
+
+    """
+    Reparte las filas de un DataFrame en particiones según un hash de su 'client_id'.
+
+    Argumentos:
+    - df (DataFrame de Pandas): DataFrame con la columna 'client_id'.
+    - n_particiones (int): Número de particiones.
+
+    Devuelve:
+    - list: Lista de n_particiones DataFrames. Todas las filas de un cliente van a la misma partición y, dentro de cada
+      partición, las filas mantienen su orden (así los datos web ordenados siguen ordenados).
+
+    'client_id' puede ser un entero con nulos ('Int32'): las filas sin cliente van todas a la primera partición, igual
+    en todas las tablas que se reparten, así que se unen entre sí como si no se hubieran repartido.
+    """
+
+    import numpy as np
+
+    #los nulos no se pueden pasar a entero sin signo: les damos un valor cualquiera y los llevamos a la partición 0
+    clientes = df['client_id']
+    nulos = clientes.isna().to_numpy()
+    codigos = clientes.to_numpy(dtype='int64', na_value=-1).astype(np.uint64)
+    particion = (_mezclar_hash(codigos) % np.uint64(n_particiones)).astype(np.int64)
+    particion[nulos] = 0
+    orden = np.argsort(particion, kind='stable')
+    limites = np.searchsorted(particion[orden], np.arange(n_particiones + 1))
+    df = df.take(orden)
+
+    return [df.iloc[limites[i]:limites[i + 1]] for i in range(n_particiones)]
+
+def _agregar_particion(df_exp, df_final_web_data, variaciones, inactividad=None):
+
+    """
+    Calcula los resultados parciales del análisis A/B de una partición de clientes.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): Experimentos de los clientes de la partición.
+    - df_final_web_data (DataFrame de Pandas): Eventos web de los clientes de la partición.
+    - variaciones (list): Nombres de las variaciones; fija la posición de cada una en los arrays.
+    - inactividad (float): Límite de inactividad de las sesiones (ver obtener_transacciones).
+
+    Devuelve:
+    - parcial (dict): Arrays de NumPy con conteos y sumas que se combinan sumándolos:
+      - 'transiciones' (variaciones x 5 x 5): Transiciones entre pasos, como en matriz_transiciones.
+      - 'eventos' (variaciones x 5): Eventos de cada paso.
+      - 'permanencia' (variaciones x 4): Visitas con tiempo de permanencia, suma de segundos, suma de sus cuadrados y
+        visitas de 10 segundos o menos.
+      - 'conversion' (variaciones x 4): Clientes con 'start', clientes con 'confirm', eventos 'start' y eventos 'start'
+        de visitas que llegan a 'confirm'.
+
+    Los clientes de una partición no están en ninguna otra, así que también los conteos de clientes únicos se pueden sumar.
+    """
+
+    import numpy as np
+    import pandas as pd
+
+    n_var, n_pasos = len(variaciones), len(PASOS_PROCESO)
+    df_transacciones = _sesionizar(_unir_variacion(df_exp, df_final_web_data), inactividad)
+    df_visitas = _resumir_visitas(df_transacciones, inactividad)
+    var_evento = pd.Categorical(df_transacciones['variation'], categories=variaciones).codes.astype(np.int64)
+    var_visita = pd.Categorical(df_visitas['variation'], categories=variaciones).codes.astype(np.int64)
+
+    #transiciones y eventos por paso
+    transicion = df_transacciones['transition'].to_numpy().astype(np.int64)
+    validas = (transicion >= 0) & (var_evento >= 0)
+    transiciones = np.bincount(var_evento[validas] * n_pasos * n_pasos + transicion[validas], minlength=n_var * n_pasos * n_pasos)
+    paso = _posiciones_paso(df_transacciones['process_step']).astype(np.int64)
+    validos = (paso >= 0) & (var_evento >= 0)
+    eventos = np.bincount(var_evento[validos] * n_pasos + paso[validos], minlength=n_var * n_pasos)
+
+    #sumas del tiempo de permanencia por variación
+    segundos = df_visitas['difference_time_in_seconds'].to_numpy()
+    con_tiempo = ~np.isnan(segundos) & (var_visita >= 0)
+    v, s = var_visita[con_tiempo], segundos[con_tiempo]
+    permanencia = np.column_stack([np.bincount(v, minlength=n_var), np.bincount(v, weights=s, minlength=n_var),
+                                   np.bincount(v, weights=s * s, minlength=n_var), np.bincount(v, weights=s <= 10, minlength=n_var)])
+
+    #clientes únicos que empiezan y que confirman, y observaciones del test de conversión por visita
+    conversion = np.zeros((n_var, 4))
+    for columna, mascara in [(0, df_visitas['n_starts'].to_numpy() > 0), (1, df_visitas['reached_confirm'].to_numpy())]:
+        clientes = pd.DataFrame({'v': var_visita[mascara], 'c': df_visitas['client_id'].to_numpy()[mascara]}).drop_duplicates()
+        conversion[:, columna] = np.bincount(clientes['v'][clientes['v'] >= 0], minlength=n_var)
+    inicios = df_visitas['n_starts'].to_numpy()
+    validas = var_visita >= 0
+    conversion[:, 2] = np.bincount(var_visita[validas], weights=inicios[validas], minlength=n_var)
+    conversion[:, 3] = np.bincount(var_visita[validas], weights=(inicios * df_visitas['reached_confirm'].to_numpy())[validas], minlength=n_var)
+
+    return {'transiciones': transiciones.reshape(n_var, n_pasos, n_pasos), 'eventos': eventos.reshape(n_var, n_pasos),
+            'permanencia': permanencia, 'conversion': conversion}
+
+def agregar_ab_paralelo(df_exp, df_final_web_data, n_procesos=None, n_particiones=None, inactividad=None):
+
+    """
+    Calcula las métricas principales del análisis A/B repartiendo los clientes entre varios procesos.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - n_procesos (int): Número de procesos. Por defecto, uno por núcleo. Con 1 se calcula todo en este proceso.
+    - n_particiones (int): Número de particiones de clientes. Por defecto, 4 por proceso para repartir mejor la carga.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
+
+    Devuelve:
+    - resultados (dict): Resultados combinados:
+      - 'transiciones' (DataFrame de Pandas): Matriz de transiciones, igual que matriz_transiciones.
+      - 'drop_off' (DataFrame de Pandas): Eventos por variación y paso, igual que calcular_drop_off.
+      - 'permanencia' (DataFrame de Pandas): Por variación, visitas, media y varianza (ddof=1) del tiempo de
+        permanencia en segundos y visitas de 10 segundos o menos.
+      - 'tasa_conversion' (Series de Pandas): Tasa de conversión por cliente, igual que calcular_tasa_conversion.
+      - 'conversion_visitas' (DataFrame de Pandas): Por variación, eventos 'start', cuántos son de visitas que llegan a
+        'confirm' y su proporción (las observaciones de test_hipotesis_tasa_conversion).
+
+    Los eventos se reparten por un hash de client_id (_repartir_por_cliente), de modo que cada visita y cada cliente
+    quedan enteros en una partición. Cada proceso sesioniza sus particiones y devuelve conteos y sumas
+    (_agregar_particion) que aquí solo se suman: los resultados son los mismos con cualquier número de procesos.
+    """
+
+    import os
+    import itertools
+    import numpy as np
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_procesos = n_procesos or os.cpu_count() or 1
+    n_particiones = n_particiones or (1 if n_procesos == 1 else 4 * n_procesos)
+
+    if isinstance(df_exp['variation'].dtype, pd.CategoricalDtype):
+        variaciones = list(df_exp['variation'].cat.categories)
+    else:
+        variaciones = sorted(df_exp['variation'].dropna().unique())
+
+    #repartimos los eventos y los experimentos con el mismo hash de cliente
+    if n_particiones == 1:
+        partes_web, partes_exp = [df_final_web_data], [df_exp]
+    else:
+        partes_web = _repartir_por_cliente(df_final_web_data, n_particiones)
+        partes_exp = _repartir_por_cliente(df_exp, n_particiones)
+
+    if n_procesos == 1:
+        parciales = [_agregar_particion(exp, web, variaciones, inactividad) for exp, web in zip(partes_exp, partes_web)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+            parciales = list(pool.map(_agregar_particion, partes_exp, partes_web, itertools.repeat(variaciones), itertools.repeat(inactividad)))
 
-    #añadimos la columna 'age_grouped' con las edades agrupadas al dataframe de clientes principales
-    df_clientes_principales['age_grouped'] = pd.cut(df_clientes_principales['age'], bins=bins, labels=labels, include_lowest=True)
+    #combinamos los resultados parciales sumándolos
+    total = {clave: sum(parcial[clave] for parcial in parciales) for clave in parciales[0]}
 
-    #ajustamos el tamaño del gráfico
-    plt.figure(figsize=(10, 6))
+    n_pasos = len(PASOS_PROCESO)
+    indice = pd.MultiIndex.from_product([variaciones, PASOS_PROCESO], names=['variation', 'last_step'])
+    df_transiciones = pd.DataFrame(total['transiciones'].reshape(-1, n_pasos), index=indice, columns=pd.Index(PASOS_PROCESO, name='process_step'))
+    df_drop_off = pd.DataFrame(total['eventos'], index=pd.Index(variaciones, name='variation'), columns=pd.Index(PASOS_PROCESO, name='process_step')).astype('int64')
 
-    #creamos el gráfico de barras
-    sns.barplot(x='age_grouped', y='num_accounts', data=df_clientes_principales, palette='pastel', errorbar=None)
-    
-    #otorgamos título y etiquetas
-    plt.title('Distribución del dinero en cuenta por edad')
-    plt.xlabel('Grupo de edad')
-    plt.ylabel('Dinero en cuenta (media)')
-    
-    #mostramos el gráfico
-    plt.show()
+    n, suma, cuadrados, menos_10 = total['permanencia'].T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = suma / n
+        varianza = (cuadrados - suma * media) / (n - 1)
+        df_permanencia = pd.DataFrame({'visits': n.astype('int64'), 'mean_seconds': media, 'var_seconds': varianza,
+                                       'visits_10s_or_less': menos_10.astype('int64')}, index=pd.Index(variaciones, name='variation'))
+        clientes_inicio, clientes_confirm, inicios, inicios_confirm = total['conversion'].T
+        tasa_conversion = pd.Series(clientes_confirm / clientes_inicio, index=pd.Index(variaciones, name='variation'))
+        df_conversion = pd.DataFrame({'starts': inicios.astype('int64'), 'confirmed_starts': inicios_confirm.astype('int64'),
+                                      'rate': inicios_confirm / inicios}, index=pd.Index(variaciones, name='variation'))
 
-    print('jóvenes hasta 36, adultos jóvenes hasta 54 y adultos mayores a partir de 54')
+    return {'transiciones': df_transiciones, 'drop_off': df_drop_off, 'permanencia': df_permanencia,
+            'tasa_conversion': tasa_conversion, 'conversion_visitas': df_conversion}
 
-def grafico_edad_genero_y_num_cuentas(df_clientes_principales):
+def comparar_agregacion_paralela(yalm_path, procesos=(1, 2, 4, 8), inactividad=None):
 
     """
-    Genera un gráfico que muestra la relación entre la edad, el género y el número de cuentas de los clientes principales.
+    Mide el tiempo de agregar_ab_paralelo con distintos números de procesos y comprueba que los resultados coinciden.
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - yalm_path (str): Ruta del archivo YAML.
+    - procesos (tuple): Números de procesos que se prueban; el primero es la referencia.
+    - inactividad (float): Límite de inactividad de las sesiones (ver obtener_transacciones).
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """ 
-    
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    
-    #ajustamos el tamaño del gráfico
-    plt.figure(figsize=(10, 6))
-    
-    #creamos el gráfico
-    sns.scatterplot(x='age', y='num_accounts', data=df_clientes_principales, hue='gender', palette='Set2')
-    
-    #asignamos título, etiquetas y leyenda
-    plt.title('Relación entre Edad y Número de Cuentas Abiertas')
-    plt.xlabel('Edad')
-    plt.ylabel('Número de Cuentas Abiertas')
-    plt.legend(title='Género', loc='upper left')
+    Devuelve:
+    - df_tiempos (DataFrame de Pandas): Segundos, aceleración respecto al primero y si los resultados son iguales.
+    """
 
-    #mostramos el gráfico
-    plt.show()
+    df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(*leer_datos(yalm_path))
 
-def grafico_edad_genero_y_dinero(df_clientes_principales):
+    return _medir_agregacion_paralela(df_exp, df_final_web_data, procesos, inactividad)
+
+def _medir_agregacion_paralela(df_exp, df_final_web_data, procesos=(1, 2, 4, 8), inactividad=None):
 
     """
-    Genera un gráfico que muestra la relación entre la edad, el género y el dinero en cuenta de los clientes principales.
+    Mide agregar_ab_paralelo con cada número de procesos sobre unos datos ya limpios (ver comparar_agregacion_paralela).
 
     Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - df_exp (DataFrame de Pandas): DataFrame limpio de los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame limpio de los datos web.
+    - procesos (tuple): Números de procesos que se prueban; el primero es la referencia.
+    - inactividad (float): Límite de inactividad de las sesiones (ver obtener_transacciones).
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """ 
-    
+    Devuelve:
+    - df_tiempos (DataFrame de Pandas): Segundos, aceleración y eficiencia (aceleración por proceso) respecto al primero
+      y si los resultados son iguales.
+    """
+
+    import os
+    import time
+    import numpy as np
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import seaborn as sns
 
-    #ajustamos el tamaño
-    plt.figure(figsize=(10, 6))
+    filas = []
+    referencia = None
+    for n_procesos in procesos:
+        inicio = time.perf_counter()
+        resultados = agregar_ab_paralelo(df_exp, df_final_web_data, n_procesos=n_procesos, inactividad=inactividad)
+        segundos = time.perf_counter() - inicio
+        if referencia is None:
+            referencia, segundos_referencia = resultados, segundos
+        #los conteos deben ser idénticos; las medias y varianzas pueden variar en el último decimal por el orden de las sumas
+        iguales = all(np.allclose(resultados[clave].to_numpy(dtype=float), referencia[clave].to_numpy(dtype=float), rtol=1e-12, atol=0, equal_nan=True)
+                      for clave in referencia)
+        aceleracion = segundos_referencia / segundos
+        filas.append({'procesos': n_procesos, 'segundos': round(segundos, 3), 'aceleracion': round(aceleracion, 2),
+                      'eficiencia': round(aceleracion * procesos[0] / n_procesos, 2), 'iguales': iguales})
+
+    df_tiempos = pd.DataFrame(filas)
+    print(f'Núcleos disponibles: {os.cpu_count()}')
+    if max(procesos) > (os.cpu_count() or 1):
+        print('Aviso: hay más procesos que núcleos; la aceleración de esas filas no mide la escalabilidad')
+    print(df_tiempos.to_string(index=False))
+
+    return df_tiempos
+
+def generar_datos_web_sinteticos(clientes, n_visitas, semilla=0, proporcion_duplicados=0.03):
 
-    #creamos el gráfico
-    sns.scatterplot(x='age', y='total_balance', data=df_clientes_principales, hue='gender', palette='Set2')
-    
-    #asignamos título, etiquetas y legenda
-    plt.title('Relación entre Edad, Género y Dinero en cuenta')
-    plt.xlabel('Edad')
-    plt.ylabel('Dinero en cuenta')
-    plt.legend(title='Género', loc='upper left')
+    """
+    Genera eventos web sintéticos con el formato de los archivos df_final_web_data_pt_*.txt, para pruebas y mediciones.
 
-    #mostramos el gráfico
-    plt.show()
+    Argumentos:
+    - clientes (array): client_id entre los que se reparten las visitas (por ejemplo, los de df_exp).
+    - n_visitas (int): Número de visitas. Cada una tiene de 1 a 7 eventos, unos 4 de media.
+    - semilla (int): Semilla del generador aleatorio; la misma semilla da los mismos eventos.
+    - proporcion_duplicados (float): Proporción de filas que se repiten, como los duplicados de los datos originales.
 
-def grafico_proporcion_test_control(df_exp):
+    Devuelve:
+    - df_final_web_data (DataFrame de Pandas): Eventos desordenados con las columnas 'client_id', 'visitor_id', 'visit_id',
+      'process_step' y 'date_time' como texto, igual que al leer el CSV sin esquema.
 
+    Cada visita empieza en 'start' en un momento aleatorio del experimento y en cada evento avanza un paso (60%),
+    retrocede uno (20%) o repite el paso (20%), con pausas de 1 a 600 segundos. Se genera posición a posición para
+    todas las visitas a la vez, así que millones de eventos tardan unos segundos.
     """
-    Genera un gráfico de distribución entre los clientes principales que han visto la plataforma original y los que han visto el test.
 
-    Argumentos:
-    - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    import numpy as np
+    import pandas as pd
 
-    Retorna:
-    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
-    """ 
+    rng = np.random.default_rng(semilla)
+    cliente = rng.choice(np.asarray(clientes), n_visitas)
+    n_eventos = rng.integers(1, 8, n_visitas)
+
+    #paso y segundo de cada posición de las visitas; las posiciones que pasan del final de la visita se descartan después
+    pasos = np.zeros((n_visitas, 7), dtype=np.int64)
+    tiempos = np.zeros((n_visitas, 7), dtype=np.int64)
+    tiempos[:, 0] = pd.Timestamp(INICIO_EXPERIMENTO).value // 10**9 + rng.integers(0, 97 * 86400, n_visitas)
+    for posicion in range(1, 7):
+        r = rng.random(n_visitas)
+        movimiento = np.where(r < 0.6, 1, np.where(r < 0.8, -1, 0))
+        pasos[:, posicion] = np.clip(pasos[:, posicion - 1] + movimiento, 0, len(PASOS_PROCESO) - 1)
+        tiempos[:, posicion] = tiempos[:, posicion - 1] + rng.integers(1, 600, n_visitas)
+    validas = np.arange(7) < n_eventos[:, None]
+
+    #identificadores con la forma de los originales, uno por visita; cada número tiene de 1 al máximo de cifras
+    #(uniforme), así que los textos tienen longitudes distintas como en los datos reales
+    def identificador(*cifras):
+        partes = []
+        for maximo in cifras:
+            n_cifras = rng.integers(1, maximo + 1, n_visitas)
+            partes.append(pd.Series(rng.integers(10 ** (n_cifras - 1), 10 ** n_cifras)).astype(str))
+        return (partes[0].str.cat(partes[1:], sep='_')).to_numpy()
+
+    visitante = identificador(9, 10)
+    visita = identificador(9, 11, 6)
+
+    fila = np.repeat(np.arange(n_visitas), n_eventos)
+    fechas = np.datetime_as_string(tiempos[validas].astype('datetime64[s]'))
+    df_final_web_data = pd.DataFrame({'client_id': cliente[fila], 'visitor_id': visitante[fila], 'visit_id': visita[fila],
+                                      'process_step': np.asarray(PASOS_PROCESO, dtype=object)[pasos[validas]],
+                                      'date_time': np.char.replace(fechas, 'T', ' ').astype(object)})
+
+    #añadimos filas repetidas y desordenamos todo, como en los datos originales
+    repetidas = df_final_web_data.sample(frac=proporcion_duplicados, random_state=semilla)
+    return pd.concat([df_final_web_data, repetidas]).sample(frac=1, random_state=semilla + 1).reset_index(drop=True)
+
+def medir_escalabilidad_sintetica(yalm_path, n_visitas=500_000, procesos=(1, 2, 4, 8), semilla=0, inactividad=None):
 
-    import pandas as pd
-    import matplotlib.pyplot as plt
+    """
+    Mide la aceleración de agregar_ab_paralelo con datos web sintéticos del tamaño que se quiera.
 
-    #contamos el número de usuarios que han visto la página de control y la de test
-    control_users = df_exp[df_exp['variation'] == 'Control']['client_id'].nunique()
-    test_users = df_exp[df_exp['variation'] == 'Test']['client_id'].nunique()
+    Argumentos:
+    - yalm_path (str): Ruta del archivo YAML; se usan sus clientes de experimentos y sus variaciones.
+    - n_visitas (int): Número de visitas sintéticas (unos 4 eventos por visita).
+    - procesos (tuple): Números de procesos que se prueban; el primero es la referencia.
+    - semilla (int): Semilla de generar_datos_web_sinteticos.
+    - inactividad (float): Límite de inactividad de las sesiones (ver obtener_transacciones).
 
-    #creamos una lista con los nombres de las variantes y otra lista con los tamaños correspondientes
-    variantes = ['Control', 'Test']
-    tamaños = [control_users, test_users]
+    Devuelve:
+    - df_tiempos (DataFrame de Pandas): Lo mismo que comparar_agregacion_paralela, con el número de eventos.
 
-    #creamos el gráfico circular
-    #ajustamos el tamaño
-    plt.figure(figsize=(8, 6))
+    Los eventos se generan con generar_datos_web_sinteticos, se tipan con ESQUEMA_WEB y se limpian como en
+    limpiar_dataframes, así que la medición no depende de tener los datos web originales. Para ver la escalabilidad,
+    la máquina necesita al menos tantos núcleos como el mayor número de procesos.
+    """
 
-    #creamos el gráfico
-    patches, texts, _ = plt.pie(tamaños, labels=variantes, autopct='%1.1f%%', startangle=140, colors=['lightblue', 'lightgreen'])
-     
-    plt.title('Distribución de usuarios entre la página de control y la de test')
-    plt.axis('equal')
+    import yaml
 
-    #añadimos el número exacto de usuarios
-    for i, texto in enumerate(texts):
-        texto.set_text(f"{variantes[i]}: {tamaños[i]} usuarios")
+    with open(yalm_path, 'r') as file:
+        config = yaml.safe_load(file)
+    df_exp = limpiar_exp(_leer_parte(config['data']['exp_client'], ESQUEMA_EXP)[0])
 
-    plt.show()
+    df_final_web_data = generar_datos_web_sinteticos(df_exp['client_id'].to_numpy(), n_visitas, semilla)
+    df_final_web_data = limpiar_web(df_final_web_data.astype(_tipos_esquema(ESQUEMA_WEB)), ordenar=True)
+    print(f'{len(df_final_web_data)} eventos sintéticos de {n_visitas} visitas')
+
+    df_tiempos = _medir_agregacion_paralela(df_exp, df_final_web_data, procesos, inactividad)
+    df_tiempos.insert(1, 'eventos', len(df_final_web_data))
+
+    return df_tiempos
 
 def grafico_drop_off_test_control(df_exp, df_final_web_data):
 
@@ -559,21 +4376,19 @@ def grafico_drop_off_test_control(df_exp, df_final_web_data):
     import matplotlib.pyplot as plt
     import seaborn as sns
     import pandas as pd
+    import numpy as np
 
-    # creamos el dataframe solo con los usuarios que han realizado el test
-    df_test = df_final_web_data.merge(df_exp[df_exp['variation'] == 'Test'], how='inner', on='client_id')
-
-    #creamos el dataframe solo con los usuarios que han realizado la versión original
-    df_control = df_final_web_data.merge(df_exp[df_exp['variation'] == 'Control'], how='inner', on='client_id')
+    #tomamos los eventos de cada paso por variación del embudo (calculado una sola vez)
+    df_eventos = calcular_embudo(df_exp, df_final_web_data)['eventos']
 
     #ordenamos los pasos para que se muestren en el orden natural
     orden = ['start', 'step_1', 'step_2', 'step_3', 'confirm']
 
-    #convertimos la columna process_step del test a tipo categórico con el orden deseado
-    df_test['process_step'] = pd.Categorical(df_test['process_step'], categories=orden, ordered=True)
+    #creamos el dataframe con los pasos de los usuarios que han realizado el test, repitiendo cada paso tantas veces como eventos tiene
+    df_test = pd.DataFrame({'process_step': pd.Categorical(np.repeat(orden, df_eventos.loc['Test', orden].to_numpy()), categories=orden, ordered=True)})
 
-    #convertimos la columna process_step del control a tipo categórico con el orden deseado
-    df_control['process_step'] = pd.Categorical(df_control['process_step'], categories=orden, ordered=True)
+    #creamos el dataframe con los pasos de los usuarios que han realizado la versión original
+    df_control = pd.DataFrame({'process_step': pd.Categorical(np.repeat(orden, df_eventos.loc['Control', orden].to_numpy()), categories=orden, ordered=True)})
 
     #creamos los histogramas ordenados
     fig, axes = plt.subplots(1, 2, figsize=(12, 5)) 
@@ -597,13 +4412,14 @@ def grafico_drop_off_test_control(df_exp, df_final_web_data):
     #mostramos los gráficos
     plt.show()
 
-def grafico_tiempo_promedio_entre_pasos_test_control(df_exp, df_final_web_data):
+def grafico_tiempo_promedio_entre_pasos_test_control(df_exp, df_final_web_data, inactividad=None):
 
     """
     Genera un gráfico que muestra el tiempo promedio entre pasos para las distintas variaciones de test y control.
 
     Argumentos:
     - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
 
     Retorna:
     - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
@@ -612,35 +4428,14 @@ def grafico_tiempo_promedio_entre_pasos_test_control(df_exp, df_final_web_data):
     import pandas as pd
     import plotly.express as px
 
-    #eliminamos los datos nulos y con ellos se eliminan 20109 filas
-    df_exp = df_exp.dropna(subset =["variation"])
-
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #ordenamos los valores del df por cliente id, visita id y
-    df_transacciones = df_transacciones.sort_values(by=['client_id', 'visit_id', 'date_time'])
-
-    #creamos una nueva columna en la que añadimos la fecha en la que el usuario realizó el paso anterior
-    df_transacciones['time_last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['date_time'].shift(1)
-
-    #creamos una nueva columna para añadir el paso anterior al actual
-    df_transacciones['last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['process_step'].shift(1)
-
-    #restamos la fecha del paso anterior a la del actual para ver cuánto ha tardado en pasar de un paso a otro
-    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
-
-    #agregamos una nueva columna en la que incluimos el nombre del paso anterior y el paso actual
-    df_transacciones['steps'] = df_transacciones['process_step'].astype(str) + '_' + df_transacciones['last_step'].astype(str)
+    #obtenemos los eventos con su variación, paso anterior y tiempo desde el paso anterior (calculados una sola vez)
+    df_transacciones = obtener_transacciones(df_exp, df_final_web_data, inactividad)
 
     #eliminamos las filas que tienen valores nulos en time_difference, ya que son el primer paso realizado por el usuario en cada visita
     df_transacciones_para_grafico = df_transacciones.dropna(subset='time_difference')
 
     #creamos un nuevo df para el gráfico en el que agrupamos los pasos, la variación (si ha realizado el test o no) y el tiempo que han tardado los usuarios en ir de un paso a otro
-    df_transacciones_por_tiempo = df_transacciones_para_grafico.groupby(by=['steps', 'variation'])['time_difference'].mean().reset_index()
+    df_transacciones_por_tiempo = df_transacciones_para_grafico.groupby(by=['steps', 'variation'], observed=True)['time_difference'].mean().reset_index()
 
     #realizamos un gráfico de barras agrupadas para comprobar de manera visual cuánto tiempo tardan los usuarios en ir de un paso a otro
 
@@ -663,13 +4458,14 @@ def grafico_tiempo_promedio_entre_pasos_test_control(df_exp, df_final_web_data):
     #fig.show()
     return fig
 
-def grafico_tasa_de_conversion_por_paso_test_control(df_exp, df_final_web_data):
+def grafico_tasa_de_conversion_por_paso_test_control(df_exp, df_final_web_data, inactividad=None):
 
     """
     Genera un gráfico que muestra la tasa de conversión por paso para las distintas variaciones de test y control.
 
     Argumentos:
     - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
 
     Retorna:
     - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
@@ -679,29 +4475,8 @@ def grafico_tasa_de_conversion_por_paso_test_control(df_exp, df_final_web_data):
     import matplotlib.pyplot as plt
     import seaborn as sns
 
-    #eliminamos los datos nulos y con ellos se eliminan 20109 filas
-    df_exp = df_exp.dropna(subset =["variation"])
-
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #ordenamos los valores del df por cliente id, visita id y
-    df_transacciones = df_transacciones.sort_values(by=['client_id', 'visit_id', 'date_time'])
-
-    #creamos una nueva columna en la que añadimos la fecha en la que el usuario realizó el paso anterior
-    df_transacciones['time_last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['date_time'].shift(1)
-
-    #creamos una nueva columna para añadir el paso anterior al actual
-    df_transacciones['last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['process_step'].shift(1)
-
-    #restamos la fecha del paso anterior a la del actual para ver cuánto ha tardado en pasar de un paso a otro
-    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
-
-    #agregamos una nueva columna en la que incluimos el nombre del paso anterior y el paso actual
-    df_transacciones['steps'] = df_transacciones['process_step'].astype(str) + '_' + df_transacciones['last_step'].astype(str)
+    #obtenemos el embudo de cada variación (calculado una sola vez)
+    embudo = calcular_embudo(df_exp, df_final_web_data, inactividad)
 
     #indicamos el orden en el que queremos que se realice el loop
     orden = ["start", "step_1", "step_2", "step_3", "confirm"]
@@ -709,22 +4484,20 @@ def grafico_tasa_de_conversion_por_paso_test_control(df_exp, df_final_web_data):
     #creamos una nueva variable para cada tipo de variación
     variation = ['Test', 'Control']
 
+    #tomamos las transiciones entre pasos y los eventos de cada paso por variación
+    df_matriz = embudo['transiciones']
+    eventos_por_paso = embudo['eventos'].stack()
+
     #creamos un nuevo dataframe
     df_stats = pd.DataFrame(columns=orden, index=variation)
 
     #recorremos cada variación
     for variation_i in variation:
-        #inicializamos el orden en 0
-        i=0
-        #recorremos cada paso
-        for step_i in orden[-4:]:
-            #para cada variación
-            df_temp = df_transacciones[df_transacciones['variation'] == variation_i]
-            #calculamos la tasa de conversión de cada paso, es decir, de usuarios que pasan al siguiente paso desde el inmediatamente previo
-            df_stats.loc[variation_i, orden[i]] = (df_temp[df_temp['steps'] == orden[i] + '_' + step_i]['visit_id'].count() / df_temp.groupby(by = 'process_step')['visit_id'].count()[orden[i]]) * 100
-            #terminamos el loop
-            i = i + 1
-    
+        #recorremos cada paso junto con el siguiente
+        for i, step_i in enumerate(orden[-4:]):
+            #calculamos la tasa de conversión de cada paso: eventos cuyo paso es orden[i] y el anterior step_i ('steps' == orden[i] + '_' + step_i)
+            df_stats.loc[variation_i, orden[i]] = (df_matriz.loc[(variation_i, step_i), orden[i]] / eventos_por_paso[(variation_i, orden[i])]) * 100
+
     #eliminamos la columna de confirm que tiene valores nulos
     df_stats.dropna(axis=1, inplace=True)
 
@@ -767,17 +4540,8 @@ def grafico_tasa_conversion_test_control(df_exp, df_final_web_data):
     import pandas as pd
     import matplotlib.pyplot as plt
 
-    #unimos los dataframes en uno solo utilizando la columna 'client_id' como clave
-    df_merged_para_tasa_de_conversion_total = pd.merge(df_final_web_data, df_exp, on='client_id')
-
-    #calculamos el número total de usuarios que completaron el proceso (llegaron al paso 'confirm')
-    confirm_total_por_variacion = df_merged_para_tasa_de_conversion_total[df_merged_para_tasa_de_conversion_total['process_step'] == 'confirm'].groupby('variation')['client_id'].nunique()
-
-    #calculamos el número total de usuarios que comenzaron el proceso (iniciaron el paso 'start')
-    start_total_por_variacion = df_merged_para_tasa_de_conversion_total[df_merged_para_tasa_de_conversion_total['process_step'] == 'start'].groupby('variation')['client_id'].nunique()
-
-    #calculamos la tasa de conversión total por variación
-    conversion_rate_total = confirm_total_por_variacion / start_total_por_variacion
+    #tomamos la tasa de conversión total por variación del embudo
+    conversion_rate_total = calcular_embudo(df_exp, df_final_web_data)['tasa_conversion']
 
     #creamos el gráfico de barras
     plt.figure(figsize=(10, 6))
@@ -793,7 +4557,7 @@ def grafico_tasa_conversion_test_control(df_exp, df_final_web_data):
     plt.tight_layout()
     plt.show()
 
-def test_hipotesis_tasa_conversion(df_final_web_data, df_exp, alpha=0.05, alternative='greater'):
+def test_hipotesis_tasa_conversion(df_final_web_data, df_exp, alpha=0.05, alternative='greater', inactividad=None):
 
     """
     Función para realizar un test de hipótesis sobre la tasa de conversión entre cada una de las variaciones.
@@ -802,41 +4566,29 @@ def test_hipotesis_tasa_conversion(df_final_web_data, df_exp, alpha=0.05, altern
         dataframes: df_final_web_data, df_exp.
         alpha (float, optional): Nivel de significancia. Por defecto es 0.05.
         alternative (str, optional): Dirección de la hipótesis alternativa. Puede ser 'greater' (mayor), 'less' (menor) o 'two-sided' (dos colas). Por defecto es 'greater'.
+        inactividad (float, optional): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
         
     Returns:
         str: Resultado del test de hipótesis.
     """
 
+    import numpy as np
     import pandas as pd
     import scipy.stats as st
     
-    #Unimos los dataframes en uno solo utilizando la columna 'client_id' como clave
-    df_merged_para_tasa_de_conversion_total = pd.merge(df_final_web_data, df_exp, on='client_id')
-
-    #calculamos el número total de usuarios que completaron el proceso (llegaron al paso 'confirm')
-    confirm_total_por_variacion = df_merged_para_tasa_de_conversion_total[df_merged_para_tasa_de_conversion_total['process_step'] == 'confirm'].groupby('variation')['client_id'].nunique()
-
-    #calculamos el número total de usuarios que comenzaron el proceso (iniciaron el paso 'start')
-    start_total_por_variacion = df_merged_para_tasa_de_conversion_total[df_merged_para_tasa_de_conversion_total['process_step'] == 'start'].groupby('variation')['client_id'].nunique()
+    #obtenemos el embudo de cada variación (calculado una sola vez)
+    embudo = calcular_embudo(df_exp, df_final_web_data, inactividad)
 
     #calculamos el ratio de conversion total por variación
-    conversion_rate_total = confirm_total_por_variacion / start_total_por_variacion
-
-    #filtramos entre los usuarios que han llegado al paso de confirm y creamos una columna que guarde el resultado
-    df_confirm_visit_id = df_merged_para_tasa_de_conversion_total[df_merged_para_tasa_de_conversion_total['process_step'] == 'confirm'].groupby('visit_id')['client_id'].nunique().reset_index().rename(columns={'client_id' : 'confirm_binary'})
-
-    #creamos otro dataframe con el visit_id y la variación realizada
-    df_visit_id = df_merged_para_tasa_de_conversion_total[df_merged_para_tasa_de_conversion_total['process_step'] == 'start'][['visit_id', 'variation']]
+    conversion_rate_total = embudo['tasa_conversion']
 
-    #unimos ambos dataframes
-    df_conversion = df_visit_id.merge(df_confirm_visit_id, how='left', on='visit_id')
-
-    #creamos los dos dataframes finales para el test de la hipótesis
-    df_conversion_test = df_conversion[df_conversion['variation'] == 'Test'].fillna(0)
-    df_conversion_control = df_conversion[df_conversion['variation'] == 'Control'].fillna(0)
+    #cada evento 'start' cuenta como una observación: 1 si su visita llega a 'confirm' y 0 si no
+    df_conversion = embudo['conversion_visitas']
+    confirm_binary = {variacion: np.repeat([1.0, 0.0], [fila['confirmed_starts'], fila['starts'] - fila['confirmed_starts']])
+                      for variacion, fila in df_conversion.iterrows()}
 
     #calculamos el p_value
-    t_stat, p_value = st.ttest_ind(df_conversion_test['confirm_binary'], df_conversion_control['confirm_binary'], equal_var=False, alternative="greater")    
+    t_stat, p_value = st.ttest_ind(confirm_binary['Test'], confirm_binary['Control'], equal_var=False, alternative="greater")    
     
     #imprimimos el resultado según la dirección de la hipótesis alternativa
     if alternative == "greater":
@@ -873,16 +4625,8 @@ def grafico_tasa_abandono_test_control(df_exp, df_final_web_data):
     import matplotlib.pyplot as plt
     import seaborn as sns
 
-    df_merged_para_tasa_de_abandono = pd.merge(df_final_web_data, df_exp, on='client_id')
-
-    #calculamos el número de usuarios que comenzaron el proceso para cada variación
-    variacion_total = df_merged_para_tasa_de_abandono.groupby('variation')['client_id'].nunique()
-
-    #calculamos el número de usuarios que completaron el proceso para cada variación
-    proceso_completado = df_merged_para_tasa_de_abandono[df_merged_para_tasa_de_abandono['process_step'] == 'confirm'].groupby('variation')['client_id'].nunique()
-
-    #calculamos la tasa de abandono total para cada variación
-    ratio_de_abandono = 1 - (proceso_completado / variacion_total)
+    #tomamos la tasa de abandono total de cada variación del embudo: clientes que no llegan a 'confirm' entre todos sus clientes
+    ratio_de_abandono = calcular_embudo(df_exp, df_final_web_data)['tasa_abandono']
 
     #graficamos la tasa de abandono total por variación
     #ajustamos el tamaño
@@ -901,13 +4645,93 @@ def grafico_tasa_abandono_test_control(df_exp, df_final_web_data):
     plt.tight_layout()
     plt.show()
 
-def grafico_tiempo_permanencia_test_control(df_exp, df_final_web_data):
+def grafico_trafico_test_control(df_exp, df_final_web_data):
+
+    """
+    Genera un gráfico que muestra el tráfico (número de eventos) por mes y por hora para las distintas variaciones de test y control.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """
+
+    import matplotlib.pyplot as plt
+
+    #calculamos los histogramas de tráfico de cada variación
+    histogramas = calcular_histogramas_tiempo(df_exp, df_final_web_data)
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    #graficamos el tráfico por mes
+    histogramas['mes'].T.plot(kind='bar', color=['pink', 'skyblue'], ax=axes[0])
+    axes[0].set_title('Tráfico por mes')
+    axes[0].set_xlabel('Mes')
+    axes[0].set_ylabel('Número de eventos')
+    axes[0].tick_params(axis='x', rotation=0)
+
+    #graficamos el tráfico por hora del día
+    histogramas['hora'].T.plot(kind='line', marker='o', color=['pink', 'skyblue'], ax=axes[1])
+    axes[1].set_title('Tráfico por hora del día')
+    axes[1].set_xlabel('Hora')
+    axes[1].set_ylabel('Número de eventos')
+
+    #mostramos los gráficos
+    plt.tight_layout()
+    plt.show()
+
+def grafico_errores_test_control(df_exp, df_final_web_data, inactividad=None):
+
+    """
+    Genera un gráfico con el total de errores cometidos en cada paso por variación y otro con el total por variación.
+
+    Argumentos:
+    - df_exp (DataFrame de Pandas): DataFrame que contiene los datos de experimentos de clientes.
+    - df_final_web_data (DataFrame de Pandas): DataFrame que contiene los datos web finales.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
+
+    Retorna:
+    - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
+    """
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    #contamos los retrocesos y repeticiones de cada paso por variación
+    df_errores = calcular_errores(df_exp, df_final_web_data, inactividad=inactividad)
+
+    #sumamos los errores de todos los pasos de cada variación
+    errores_por_variacion = df_errores.groupby('variation')['errors'].sum()
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    #graficamos el total de errores en cada paso según la variación
+    sns.barplot(data=df_errores, x='step', y='errors', hue='variation', palette='pastel', ax=axes[0])
+    axes[0].set_title('Total de errores cometidos en cada paso por variación')
+    axes[0].set_xlabel('Paso')
+    axes[0].set_ylabel('Número de errores')
+
+    #graficamos el total de errores por variación
+    sns.barplot(x=errores_por_variacion.index, y=errores_por_variacion.values, palette='PiYG', ax=axes[1])
+    axes[1].set_title('Total de errores cometidos por los usuarios por variación')
+    axes[1].set_xlabel('Variation')
+    axes[1].set_ylabel('Número de errores')
+
+    plt.tight_layout()
+
+    #mostramos los gráficos
+    plt.show()
+
+def grafico_tiempo_permanencia_test_control(df_exp, df_final_web_data, inactividad=None):
 
     """
     Genera un gráfico que muestra el tiempo de permanencia de los usuarios para las distintas variaciones de test y control.
 
     Argumentos:
     - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
 
     Retorna:
     - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
@@ -917,20 +4741,11 @@ def grafico_tiempo_permanencia_test_control(df_exp, df_final_web_data):
     import matplotlib.pyplot as plt
     import seaborn as sns
     
-     #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #agrupamos el dataframe por variación y tiempo entrada y de salida de cada usuario por id de visita
-    df_tiempo_de_permanencia = df_transacciones.groupby(by=['variation', 'visit_id'])['date_time'].agg(['max', 'min']).reset_index()
-
-    #agregamos una columna con el tiempo total por sesión de cada id de visita
-    df_tiempo_de_permanencia['difference_time'] = df_tiempo_de_permanencia['max'] - df_tiempo_de_permanencia['min']
-
-    #transformamos el tiempo a segundos
-    df_tiempo_de_permanencia['difference_time_in_seconds'] = df_tiempo_de_permanencia['difference_time'].dt.total_seconds()
+    #calculamos el tiempo de permanencia de cada visita
+    df_tiempo_de_permanencia = calcular_tiempo_permanencia(df_exp, df_final_web_data, inactividad)
 
     #calculamos la media de tiempo de permanencia total por cada variación
-    df_tiempo_de_permanencia_total = df_tiempo_de_permanencia.groupby('variation')['difference_time_in_seconds'].agg('mean')
+    df_tiempo_de_permanencia_total = df_tiempo_de_permanencia.groupby('variation', observed=True)['difference_time_in_seconds'].agg('mean')
 
     #graficamos el tiempo medio de permanencia en el sitio web por variación
     #ajustamos el tamaño
@@ -949,7 +4764,7 @@ def grafico_tiempo_permanencia_test_control(df_exp, df_final_web_data):
     plt.tight_layout()
     plt.show()
 
-def test_hipotesis_tiempo_permanencia(df_final_web_data, df_exp, alpha=0.05, alternative='greater'):
+def test_hipotesis_tiempo_permanencia(df_final_web_data, df_exp, alpha=0.05, alternative='greater', inactividad=None):
 
     """
     Función para realizar un test de hipótesis sobre la diferencia de tiempo promedio entre cada una de las variaciones.
@@ -958,6 +4773,7 @@ def test_hipotesis_tiempo_permanencia(df_final_web_data, df_exp, alpha=0.05, alt
         dataframes: df_final_web_data, df_exp.
         alpha (float, optional): Nivel de significancia. Por defecto es 0.05.
         alternative (str, optional): Dirección de la hipótesis alternativa. Puede ser 'greater' (mayor), 'less' (menor) o 'two-sided' (dos colas). Por defecto es 'greater'.
+        inactividad (float, optional): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
         
     Returns:
         str: Resultado del test de hipótesis.
@@ -966,35 +4782,8 @@ def test_hipotesis_tiempo_permanencia(df_final_web_data, df_exp, alpha=0.05, alt
     import pandas as pd
     import scipy.stats as st
     
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #ordenamos los valores del df por cliente id, visita id y
-    df_transacciones = df_transacciones.sort_values(by=['client_id', 'visit_id', 'date_time'])
-
-    #creamos una nueva columna en la que añadimos la fecha en la que el usuario realizó el paso anterior
-    df_transacciones['time_last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['date_time'].shift(1)
-
-    #creamos una nueva columna para añadir el paso anterior al actual
-    df_transacciones['last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['process_step'].shift(1)
-
-    #restamos la fecha del paso anterior a la del actual para ver cuánto ha tardado en pasar de un paso a otro
-    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
-
-    #agregamos una nueva columna en la que incluimos el nombre del paso anterior y el paso actual
-    df_transacciones['steps'] = df_transacciones['process_step'].astype(str) + '_' + df_transacciones['last_step'].astype(str)
-
-    #agrupamos el dataframe por variación y tiempo entrada y de salida de cada usuario por id de visita
-    df_tiempo_de_permanencia = df_transacciones.groupby(by=['variation', 'visit_id'])['date_time'].agg(['max', 'min']).reset_index()
-
-    #agregamos una columna con el tiempo total por sesión de cada id de visita
-    df_tiempo_de_permanencia['difference_time'] = df_tiempo_de_permanencia['max'] - df_tiempo_de_permanencia['min']
-
-    #transformamos el tiempo a segundos
-    df_tiempo_de_permanencia['difference_time_in_seconds'] = df_tiempo_de_permanencia['difference_time'].dt.total_seconds()
+    #obtenemos el resumen por visita, que ya incluye el tiempo de permanencia en segundos (calculado una sola vez)
+    df_tiempo_de_permanencia = obtener_visitas(df_exp, df_final_web_data, inactividad)
 
     #creamos los dos dataframes finales para el análisis
     df_tiempo_de_permanencia_control = df_tiempo_de_permanencia[(df_tiempo_de_permanencia['variation'] == 'Control')]['difference_time_in_seconds']
@@ -1024,13 +4813,14 @@ def test_hipotesis_tiempo_permanencia(df_final_web_data, df_exp, alpha=0.05, alt
         return "Dirección de hipótesis no válida. Por favor, elige 'greater', 'less' o 'two-sided'."
 
 
-def grafico_tiempo_permanencia_menor_10_secs(df_exp, df_final_web_data):
+def grafico_tiempo_permanencia_menor_10_secs(df_exp, df_final_web_data, inactividad=None):
 
     """
     Genera un gráfico que muestra la cantidad de usuarios que permanecieron menos de 10 segundos en la plataforma para las distintas variaciones de test y control.
 
     Argumentos:
     - df_clientes_principales (DataFrame de Pandas): DataFrame que contiene los datos de los principales clientes.
+    - inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
 
     Retorna:
     - None: Esta función no devuelve ningún valor, simplemente muestra el gráfico.
@@ -1040,20 +4830,11 @@ def grafico_tiempo_permanencia_menor_10_secs(df_exp, df_final_web_data):
     import matplotlib.pyplot as plt
     import seaborn as sns
     
-    #agrupamos el df_final_web_data con df_exp para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    #agrupamos el dataframe por variación y tiempo entrada y de salida de cada usuario por id de visita
-    df_tiempo_de_permanencia = df_transacciones.groupby(by=['variation', 'visit_id'])['date_time'].agg(['max', 'min']).reset_index()
-
-    #agregamos una columna con el tiempo total por sesión de cada id de visita
-    df_tiempo_de_permanencia['difference_time'] = df_tiempo_de_permanencia['max'] - df_tiempo_de_permanencia['min']
-
-    #transformamos el tiempo a segundos
-    df_tiempo_de_permanencia['difference_time_in_seconds'] = df_tiempo_de_permanencia['difference_time'].dt.total_seconds()
+    #calculamos el tiempo de permanencia de cada visita
+    df_tiempo_de_permanencia = calcular_tiempo_permanencia(df_exp, df_final_web_data, inactividad)
 
     #calculamos cuántos usuarios han estado menos de 10 segundos en la página
-    tiempo_permanencia_menor_10_secs = (df_tiempo_de_permanencia['difference_time_in_seconds'] <= 10).groupby(df_tiempo_de_permanencia['variation']).sum()
+    tiempo_permanencia_menor_10_secs = (df_tiempo_de_permanencia['difference_time_in_seconds'] <= 10).groupby(df_tiempo_de_permanencia['variation'], observed=True).sum()
 
     #creamos el gráfico
     #ajustamos el tamaño
@@ -1073,7 +4854,7 @@ def grafico_tiempo_permanencia_menor_10_secs(df_exp, df_final_web_data):
     #mostramos el gráfico
     plt.show()
 
-def normalizar_distribucion_tiempo_permanencia(df_final_web_data, df_exp, version='Control'):
+def normalizar_distribucion_tiempo_permanencia(df_final_web_data, df_exp, version='Control', inactividad=None):
     
     """
     Función para normalizar la distribución del tiempo de permanencia.
@@ -1082,6 +4863,7 @@ def normalizar_distribucion_tiempo_permanencia(df_final_web_data, df_exp, versio
     df_final_web_data (DataFrame): dataframe principal para generar los dataframes finales.
     df_exp: dataframe principal para generar los dataframes finales.
     version = 'Control' o 'Test'.
+    inactividad (float): Si se indica, las sesiones se definen por inactividad en lugar de por visita (ver obtener_transacciones).
 
     Return:
     DataFrame: El DataFrame con la columna normalizada y algunas estadísticas.
@@ -1095,32 +4877,8 @@ def normalizar_distribucion_tiempo_permanencia(df_final_web_data, df_exp, versio
     from sklearn.preprocessing import PowerTransformer, StandardScaler
     from scipy.stats import johnsonsu, kstest
 
-    # Agrupar el dataframe final con el experimento para añadir si el cliente ha visto la plataforma original o el test
-    df_transacciones = df_final_web_data.merge(df_exp, how='left', left_on='client_id', right_on='client_id').dropna(subset='variation')
-
-    # Ordenar los valores del dataframe por cliente id, visita id y fecha
-    df_transacciones = df_transacciones.sort_values(by=['client_id', 'visit_id', 'date_time'])
-
-    # Crear una nueva columna en la que añadimos la fecha en la que el usuario realizó el paso anterior
-    df_transacciones['time_last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['date_time'].shift(1)
-
-    # Crear una nueva columna para añadir el paso anterior al actual
-    df_transacciones['last_step'] = df_transacciones.groupby(by=['client_id', 'visit_id'])['process_step'].shift(1)
-
-    # Restar la fecha del paso anterior a la del actual para ver cuánto ha tardado en pasar de un paso a otro
-    df_transacciones['time_difference'] = df_transacciones['date_time'] - df_transacciones['time_last_step']
-
-    # Agregar una nueva columna en la que incluimos el nombre del paso anterior y el paso actual
-    df_transacciones['steps'] = df_transacciones['process_step'].astype(str) + '_' + df_transacciones['last_step'].astype(str)
-
-    # Agrupar el dataframe por variación y tiempo de entrada y salida de cada usuario por id de visita
-    df_tiempo_de_permanencia = df_transacciones.groupby(by=['variation', 'visit_id'])['date_time'].agg(['max', 'min']).reset_index()
-
-    # Agregar una columna con el tiempo total por sesión de cada id de visita
-    df_tiempo_de_permanencia['difference_time'] = df_tiempo_de_permanencia['max'] - df_tiempo_de_permanencia['min']
-    
-    # Transformar el tiempo a segundos
-    df_tiempo_de_permanencia['difference_time_in_seconds'] = df_tiempo_de_permanencia['difference_time'].dt.total_seconds()
+    # Obtener el resumen por visita, que ya incluye el tiempo de permanencia en segundos (calculado una sola vez)
+    df_tiempo_de_permanencia = obtener_visitas(df_exp, df_final_web_data, inactividad)
 
     # Quedarse solo con la columna de variación y la diferencia de tiempo en segundos
     df_tiempo_de_permanencia = df_tiempo_de_permanencia[['variation', 'difference_time_in_seconds']]
@@ -1,6 +1,6 @@
 #importamos las librerías
 import pandas as pd
-from funciones import leer_datos, limpiar_dataframes, crear_dataframe_principales_clientes, crear_dataframe_promedio_tiempo_por_paso, guardar_como_csv,\
+from funciones import cargar_datos, crear_dataframe_principales_clientes, crear_dataframe_promedio_tiempo_por_paso, guardar_como_csv,\
     grafico_edad_clientes_principales, grafico_genero_clientes_principales, grafico_fidelidad_clientes_principales, graficos_contacto_clientes_ultimos_meses,\
     grafico_num_cuentas_clientes_principales, mapa_calor_valores_numericos, grafico_dinero_y_num_cuentas, grafico_dinero_segun_edad, grafico_edad_genero_y_num_cuentas,\
     grafico_edad_genero_y_dinero, grafico_proporcion_test_control, grafico_drop_off_test_control, grafico_tiempo_promedio_entre_pasos_test_control,\
@@ -11,11 +11,8 @@ yalm_path = "../config.yaml"
 
 def main():
 
-    df_final_demo, df_final_web_data, df_exp = leer_datos(yalm_path) 
-
-
-    #llamamos a la función limpiar_dataframes
-    df_final_demo, df_final_web_data, df_exp = limpiar_dataframes(df_final_demo, df_final_web_data, df_exp)
+    #leemos y limpiamos los datos; si config.yaml define memoria_compartida, se comparten con el resto de procesos
+    df_final_demo, df_final_web_data, df_exp = cargar_datos(yalm_path)
 
     #filtramos el dataframe df_final_demo para obtener a los 50 clientes con más dinero en la cuenta
     df_clientes_principales = crear_dataframe_principales_clientes(df_final_demo)
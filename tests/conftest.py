@@ -0,0 +1,59 @@
+#pruebas de funciones.py con datos web sintéticos; los datos demográficos y de experimentos son los de resources/
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+import funciones
+
+
+def generar_eventos(n_visitas, semilla=0, proporcion_duplicados=0.03):
+
+    """Genera eventos sintéticos de los clientes de df_final_experiment_clients.txt y de 200 clientes sin experimento."""
+
+    rng = np.random.default_rng(semilla)
+    clientes = pd.read_csv(os.path.join(RAIZ, 'resources', 'df_final_experiment_clients.txt'))['client_id'].to_numpy()
+    clientes = np.concatenate([clientes, rng.integers(10_000_000, 11_000_000, 200)])
+    return funciones.generar_datos_web_sinteticos(clientes, n_visitas, semilla, proporcion_duplicados)
+
+
+def escribir_config(carpeta, partes, **extra):
+
+    """Escribe los eventos de cada parte como CSV y un config.yaml que los usa junto a los archivos de resources/."""
+
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = []
+    for i, df in enumerate(partes):
+        rutas.append(os.path.join(carpeta, f'df_final_web_data_pt_{i + 1}.txt'))
+        df.to_csv(rutas[-1], index=False)
+
+    config = {'data': {'web_data': os.path.join(carpeta, 'df_final_web_data_pt_*.txt'),
+                       'demo_final': os.path.join(RAIZ, 'resources', 'df_final_demo.txt'),
+                       'exp_client': os.path.join(RAIZ, 'resources', 'df_final_experiment_clients.txt')},
+              **extra}
+    ruta = os.path.join(carpeta, 'config.yaml')
+    with open(ruta, 'w') as file:
+        yaml.safe_dump(config, file)
+    return ruta
+
+
+@pytest.fixture(scope='session')
+def eventos():
+    return generar_eventos(3000)
+
+
+@pytest.fixture(scope='session')
+def config_sintetica(eventos, tmp_path_factory):
+    mitad = len(eventos) // 2
+    return escribir_config(str(tmp_path_factory.mktemp('datos')), [eventos.iloc[:mitad], eventos.iloc[mitad:]])
+
+
+@pytest.fixture(scope='session')
+def datos_limpios(config_sintetica):
+    return funciones.limpiar_dataframes(*funciones.leer_datos(config_sintetica, usar_cache=False))
@@ -0,0 +1,16 @@
+import funciones
+from conftest import escribir_config
+
+
+def test_cache_guarda_los_datos_web_ordenados(eventos, tmp_path):
+    config = escribir_config(str(tmp_path), [eventos], cache={'dir': str(tmp_path / 'cache')})
+
+    #la primera lectura crea la caché y la segunda la usa; las dos devuelven la parte ya ordenada
+    for _ in range(2):
+        _, web, _ = funciones.leer_datos(config)
+        assert funciones.esta_ordenado(web)
+
+    #limpiados, los eventos y su orden son los mismos que sin caché (el índice es la posición en la lectura)
+    con_cache = funciones.limpiar_dataframes(*funciones.leer_datos(config))[1]
+    sin_cache = funciones.limpiar_dataframes(*funciones.leer_datos(config, usar_cache=False))[1]
+    assert con_cache.reset_index(drop=True).equals(sin_cache.reset_index(drop=True))
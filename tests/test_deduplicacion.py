@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import funciones
+from conftest import escribir_config
+
+
+def _web_tipada(config):
+    return funciones.leer_datos(config, usar_cache=False)[1]
+
+
+def test_mismos_duplicados_que_drop_duplicates(config_sintetica):
+    web = _web_tipada(config_sintetica)
+    esperado = web.drop_duplicates()
+
+    limpio = funciones.limpiar_web(web.copy())
+
+    assert len(limpio) == len(esperado) < len(web)
+    assert limpio.index.equals(esperado.index)
+
+
+def test_deduplicar_entre_particiones(config_sintetica):
+    web = funciones.limpiar_web(_web_tipada(config_sintetica), deduplicar=False)
+    esperado = web.drop_duplicates()
+
+    vistos, partes, total = {}, [], 0
+    for inicio in range(0, len(web), 1000):
+        parte, vistos, duplicados = funciones._deduplicar(web.iloc[inicio:inicio + 1000], vistos)
+        partes.append(parte)
+        total += duplicados
+
+    assert total == len(web) - len(esperado)
+    assert pd.concat(partes).index.equals(esperado.index)
+
+
+def test_stream_igual_que_en_memoria(config_sintetica, datos_limpios):
+    trozos = list(funciones.leer_datos_stream(config_sintetica, chunksize=2000))
+
+    assert sum(len(trozo) for trozo in trozos) == len(datos_limpios[1])
+
+
+def test_incremental_solo_compara_con_los_dias_de_la_parte(eventos, tmp_path):
+    ordenados = eventos.sort_values('date_time', kind='stable').reset_index(drop=True)
+    cortes = [0, len(ordenados) // 3, 2 * len(ordenados) // 3, len(ordenados)]
+    #cada parte repite las últimas filas de la anterior
+    partes = [ordenados.iloc[max(cortes[i] - 100, 0):cortes[i + 1]] for i in range(3)]
+    config = escribir_config(str(tmp_path / 'web'), partes[:1], incremental={'dir': str(tmp_path / 'incremental')})
+
+    funciones.actualizar_incremental(config)
+    for i, parte in enumerate(partes[1:], start=2):
+        parte.to_csv(str(tmp_path / 'web' / f'df_final_web_data_pt_{i}.txt'), index=False)
+        funciones.actualizar_incremental(config)
+
+    historico = funciones.leer_historico(config)
+    assert len(historico) == len(ordenados.drop_duplicates())
+
+    #sin partes nuevas no se añade nada, y hay un archivo de hashes por día del histórico
+    assert len(funciones.actualizar_incremental(config)) == 0
+    dias = historico['date_time'].dt.normalize().nunique()
+    assert len(os.listdir(tmp_path / 'incremental' / 'hashes')) == dias
+
+
+def test_hash_de_textos_de_longitudes_distintas():
+    #un texto mucho más corto que el más largo de la columna no debe leer fuera del buffer
+    textos = pd.Series(['a' * 30, 'b', '', None, '781255054_21935453173_531117', '1_2_3'], dtype='string[pyarrow]')
+
+    hashes = funciones._hash_textos(textos)
+
+    #el hash de cada texto no depende del resto de la columna
+    for texto, h in zip(textos, hashes):
+        assert funciones._hash_textos(pd.Series([texto], dtype='string[pyarrow]'))[0] == h
+    assert len(set(hashes.tolist())) == len(textos)
+
+
+def test_limpiar_web_con_identificadores_de_longitudes_distintas():
+    web = pd.DataFrame({'client_id': [1, 1, 1], 'visitor_id': ['1_2', '941986388_9774568452', '1_2'],
+                        'visit_id': ['781255054_21935453173_531117', '1_2_3', '781255054_21935453173_531117'],
+                        'process_step': ['start', 'step_1', 'start'],
+                        'date_time': ['2017-04-01 10:00:00', '2017-04-01 10:01:00', '2017-04-01 10:00:00']})
+
+    limpio = funciones.limpiar_web(web.astype(funciones._tipos_esquema(funciones.ESQUEMA_WEB)))
+
+    assert len(limpio) == 2
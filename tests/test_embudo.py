@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import funciones
+
+
+def test_huella_de_los_datos_una_vez_por_llamada(datos_limpios, monkeypatch):
+    demo, web, exp = datos_limpios
+    llamadas = []
+    huella = funciones._huella_dataframes
+    monkeypatch.setattr(funciones, '_huella_dataframes', lambda *dfs: llamadas.append(1) or huella(*dfs))
+
+    #con las cachés vacías, cada función tiene que calcular las transacciones y las visitas
+    for nombre, funcion in [('calcular_embudo', lambda: funciones.calcular_embudo(exp, web)),
+                            ('construir_cubo_segmentos', lambda: funciones.construir_cubo_segmentos(exp, web, demo)),
+                            ('caminos_frecuentes', lambda: funciones.caminos_frecuentes(exp, web))]:
+        for cache in ['_CACHE_TRANSACCIONES', '_CACHE_VISITAS', '_CACHE_EMBUDO']:
+            monkeypatch.setattr(funciones, cache, {})
+        llamadas.clear()
+        funcion()
+        assert len(llamadas) == 1, nombre
+
+
+def test_cubo_sumado_por_variacion_igual_que_el_embudo(datos_limpios):
+    demo, web, exp = datos_limpios
+
+    embudo = funciones.calcular_embudo(exp, web)
+    consulta = funciones.consultar_cubo(funciones.construir_cubo_segmentos(exp, web, demo))
+
+    assert list(consulta.index) == list(embudo['clientes'].index)
+    np.testing.assert_array_equal(consulta['clients'].to_numpy(), embudo['clientes'].to_numpy())
+    np.testing.assert_array_equal(consulta[[f'reach_{paso}' for paso in funciones.PASOS_PROCESO]].to_numpy(), embudo['alcance'].to_numpy())
+    np.testing.assert_array_equal(consulta[[f'events_{paso}' for paso in funciones.PASOS_PROCESO]].to_numpy(), embudo['eventos'].to_numpy())
+    np.testing.assert_allclose(consulta['conversion_rate'].to_numpy(), embudo['tasa_conversion'].to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(consulta['abandonment_rate'].to_numpy(), embudo['tasa_abandono'].to_numpy(), rtol=1e-12)
+    np.testing.assert_array_equal(consulta[['starts', 'confirmed_starts']].to_numpy(), embudo['conversion_visitas'][['starts', 'confirmed_starts']].to_numpy())
+
+    #tiempo de permanencia de las visitas
+    segundos = funciones.obtener_visitas(exp, web).groupby('variation', observed=True)['difference_time_in_seconds']
+    np.testing.assert_array_equal(consulta['visits'].to_numpy(), segundos.count().to_numpy())
+    np.testing.assert_allclose(consulta['mean_seconds'].to_numpy(), segundos.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(consulta['var_seconds'].to_numpy(), segundos.var().to_numpy(), rtol=1e-9)
+
+    #sin dimensiones se suman todas las celdas
+    total = funciones.consultar_cubo(funciones.construir_cubo_segmentos(exp, web, demo), por=())
+    assert total['clients'].iloc[0] == embudo['clientes'].sum()
+
+
+def test_cubo_por_segmento_igual_que_unir_con_demo(datos_limpios):
+    demo, web, exp = datos_limpios
+    cubo = funciones.construir_cubo_segmentos(exp, web, demo)
+
+    #referencia: unimos las transacciones con los datos demográficos y contamos clientes únicos
+    limites, nombres = funciones.BANDAS_DEMO['age']
+    df_demo = demo[['client_id', 'gender']].assign(age=pd.cut(demo['age'], bins=limites, labels=nombres, include_lowest=True))
+    df_unido = funciones.obtener_transacciones(exp, web).merge(df_demo, on='client_id')
+    df_segmento = df_unido[(df_unido['gender'] == 'F') & df_unido['age'].isin(['jóvenes', 'adultos jóvenes'])]
+
+    consulta = funciones.consultar_cubo(cubo, gender='F', age=['jóvenes', 'adultos jóvenes'])
+    referencia = df_segmento.groupby('variation', observed=True)['client_id'].nunique()
+    np.testing.assert_array_equal(consulta['clients'].to_numpy(), referencia.to_numpy())
+    confirman = df_segmento[df_segmento['process_step'] == 'confirm'].groupby('variation', observed=True)['client_id'].nunique()
+    np.testing.assert_array_equal(consulta['reach_confirm'].to_numpy(), confirman.to_numpy())
+    eventos = df_segmento.groupby('variation', observed=True).size()
+    np.testing.assert_array_equal(consulta[[f'events_{paso}' for paso in funciones.PASOS_PROCESO]].sum(axis=1).to_numpy(), eventos.to_numpy())
+
+
+def test_consulta_del_cubo_en_el_orden_de_por_y_con_valores_validos(datos_limpios):
+    demo, web, exp = datos_limpios
+    cubo = funciones.construir_cubo_segmentos(exp, web, demo)
+
+    #los niveles del índice siguen el orden de 'por', no el de las dimensiones del cubo
+    por_genero = funciones.consultar_cubo(cubo, por=('gender', 'variation'))
+    por_variacion = funciones.consultar_cubo(cubo, por=('variation', 'gender'))
+    assert list(por_genero.index.names) == ['gender', 'variation']
+    pd.testing.assert_frame_equal(por_genero.reorder_levels(['variation', 'gender']).sort_index(), por_variacion.sort_index())
+
+    #un valor que no es de su dimensión falla como una dimensión desconocida
+    with pytest.raises(ValueError, match='Valores desconocidos de gender'):
+        funciones.consultar_cubo(cubo, gender='f')
+    with pytest.raises(ValueError, match='Valores desconocidos de age'):
+        funciones.consultar_cubo(cubo, age=['jóvenes', 'niños'])
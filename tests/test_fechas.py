@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import funciones
+
+
+def test_decodificador_igual_que_to_datetime(eventos):
+    #añadimos fechas límite: 29 de febrero, cambios de año y de siglo y el propio origen
+    extremos = pd.Series(['2016-02-29 23:59:59', '2000-02-29 00:00:00', '1999-12-31 23:59:59', '2017-03-15 00:00:00',
+                          '2017-06-20 23:59:59', '2018-03-01 12:30:45'])
+    fechas = pd.concat([eventos['date_time'], extremos], ignore_index=True)
+
+    esperadas = pd.to_datetime(fechas, format='%Y-%m-%d %H:%M:%S').to_numpy()
+
+    for textos in [fechas, fechas.astype(pd.StringDtype('pyarrow'))]:
+        segundos = funciones.decodificar_fecha_hora(textos)
+        assert segundos.dtype == np.int32
+        np.testing.assert_array_equal(funciones.segundos_a_fecha_hora(segundos), esperadas)
+
+
+def test_decodificador_rechaza_otros_formatos():
+    with pytest.raises(ValueError):
+        funciones.decodificar_fecha_hora(pd.Series(['2017-03-15 00:00:00', '2017/03/15 00:00:00']))
+    with pytest.raises(ValueError):
+        funciones.decodificar_fecha_hora(pd.Series(['2017-03-15T00:00:00']))
+
+
+def test_limpiar_web_con_decodificador_igual_que_to_datetime(eventos):
+    web = funciones.limpiar_web(eventos.astype({'date_time': pd.StringDtype('pyarrow')}))
+    con_pandas = funciones.limpiar_web(eventos.copy())
+
+    assert web['date_time'].equals(con_pandas['date_time'])
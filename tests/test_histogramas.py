@@ -0,0 +1,45 @@
+import numpy as np
+
+import funciones
+
+
+def _referencia_dt(exp, web):
+    #histogramas con groupby sobre los accesores .dt de las fechas
+    df = funciones._unir_variacion(exp, web[['client_id', 'date_time']])
+    fechas = df['date_time'].dt
+
+    def contar(clave):
+        return df.groupby(['variation', clave], observed=True).size().unstack(fill_value=0)
+    return {'dia': contar(fechas.normalize().rename('date')),
+            'mes': contar(fechas.to_period('M').rename('month')),
+            'dia_semana': contar(fechas.dayofweek.map(dict(enumerate(funciones.DIAS_SEMANA))).rename('weekday'))[funciones.DIAS_SEMANA],
+            'hora': contar(fechas.hour.rename('hour')).reindex(columns=range(24), fill_value=0)}
+
+
+def _comprobar(histogramas, referencia):
+    for clave, df_referencia in referencia.items():
+        assert list(histogramas[clave].index) == list(df_referencia.index), clave
+        assert [str(columna) for columna in histogramas[clave].columns] == [str(columna) for columna in df_referencia.columns], clave
+        np.testing.assert_array_equal(histogramas[clave].to_numpy(), df_referencia.to_numpy(), err_msg=clave)
+
+
+def test_histogramas_igual_que_groupby_con_dt(config_sintetica, datos_limpios):
+    _, web, exp = datos_limpios
+    referencia = _referencia_dt(exp, web)
+
+    #en memoria, por trozos y con el tiempo compacto
+    _comprobar(funciones.calcular_histogramas_tiempo(exp, web), referencia)
+    _comprobar(funciones.calcular_histogramas_tiempo(exp, funciones.leer_datos_stream(config_sintetica, chunksize=1500)), referencia)
+    compacto = web[['client_id', 'date_time']].copy()
+    compacto['segundos'] = funciones.decodificar_fecha_hora(compacto.pop('date_time').dt.strftime('%Y-%m-%d %H:%M:%S'))
+    _comprobar(funciones.calcular_histogramas_tiempo(exp, compacto), referencia)
+
+
+def test_combinar_histogramas_de_particiones(datos_limpios):
+    _, web, exp = datos_limpios
+
+    #dos mitades con días distintos se combinan en los mismos histogramas que la tabla completa
+    orden = web.sort_values('date_time')
+    mitades = [orden.iloc[:len(orden) // 2], orden.iloc[len(orden) // 2:]]
+    combinados = funciones.combinar_histogramas(funciones.calcular_histogramas_tiempo(exp, mitad) for mitad in mitades)
+    _comprobar(combinados, _referencia_dt(exp, web))
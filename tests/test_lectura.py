@@ -0,0 +1,50 @@
+import gzip
+import os
+
+import pytest
+import yaml
+import zstandard
+
+import funciones
+from conftest import RAIZ, escribir_config
+
+
+def test_partes_comprimidas_igual_que_sin_comprimir(eventos, tmp_path):
+    mitad = len(eventos) // 2
+    config_texto = escribir_config(str(tmp_path / 'texto'), [eventos.iloc[:mitad], eventos.iloc[mitad:]])
+
+    #la primera parte en gzip y la segunda en zstd, en una carpeta
+    carpeta = tmp_path / 'comprimidos'
+    carpeta.mkdir()
+    with open(tmp_path / 'texto' / 'df_final_web_data_pt_1.txt', 'rb') as file:
+        with gzip.open(carpeta / 'df_final_web_data_pt_1.txt.gz', 'wb') as destino:
+            destino.write(file.read())
+    with open(tmp_path / 'texto' / 'df_final_web_data_pt_2.txt', 'rb') as file:
+        with open(carpeta / 'df_final_web_data_pt_2.txt.zst', 'wb') as destino:
+            destino.write(zstandard.ZstdCompressor().compress(file.read()))
+
+    config = {'data': {'web_data': str(carpeta),
+                       'demo_final': os.path.join(RAIZ, 'resources', 'df_final_demo.txt'),
+                       'exp_client': os.path.join(RAIZ, 'resources', 'df_final_experiment_clients.txt')}}
+    config_comprimidos = str(tmp_path / 'config.yaml')
+    with open(config_comprimidos, 'w') as file:
+        yaml.safe_dump(config, file)
+
+    web_texto = funciones.leer_datos(config_texto, usar_cache=False)[1]
+    web_comprimidos = funciones.leer_datos(config_comprimidos, usar_cache=False)[1]
+
+    assert web_comprimidos.equals(web_texto)
+
+
+def test_enteros_con_nulos_avisan_y_otros_errores_fallan(tmp_path):
+    ruta = tmp_path / 'exp.txt'
+    ruta.write_text('client_id,Variation\n1,Test\n,Control\n3,Control\n')
+    with pytest.warns(UserWarning, match='nulos en columnas enteras'):
+        df = funciones._leer_csv_tipado(str(ruta), funciones.ESQUEMA_EXP)
+    assert str(df['client_id'].dtype) == 'Int32'
+    assert df['client_id'].isna().sum() == 1
+
+    #un texto en una columna entera no se convierte en nulo en silencio
+    ruta.write_text('client_id,Variation\n1,Test\nx,Control\n')
+    with pytest.raises(ValueError):
+        funciones._leer_csv_tipado(str(ruta), funciones.ESQUEMA_EXP)
@@ -0,0 +1,62 @@
+import builtins
+import json
+import math
+import os
+
+import funciones
+from conftest import escribir_config
+
+
+def test_memoria_sin_resource_ni_psutil(monkeypatch):
+    importar = builtins.__import__
+
+    def importar_sin_medidores(nombre, *args, **kwargs):
+        if nombre in ('resource', 'psutil'):
+            raise ImportError(nombre)
+        return importar(nombre, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', importar_sin_medidores)
+
+    assert math.isnan(funciones._rss_sin_proc())
+
+
+def test_memoria_compartida_se_regenera_al_cambiar_la_version(eventos, tmp_path, monkeypatch):
+    carpeta = str(tmp_path / 'compartido')
+    config = escribir_config(str(tmp_path), [eventos], memoria_compartida={'dir': carpeta})
+
+    _, web, _ = funciones.cargar_datos(config)
+    with open(os.path.join(carpeta, 'manifiesto.json'), 'r') as file:
+        assert json.load(file)['version'] == funciones.VERSION_DATOS_COMPARTIDOS
+    assert not [nombre for nombre in os.listdir(carpeta) if nombre.endswith('.tmp')]
+
+    #con la misma versión se reutilizan las tablas; con otra se vuelven a limpiar los datos
+    llamadas = []
+    limpiar = funciones.limpiar_dataframes
+    monkeypatch.setattr(funciones, 'limpiar_dataframes', lambda *args, **kwargs: llamadas.append(1) or limpiar(*args, **kwargs))
+    funciones.cargar_datos(config)
+    assert not llamadas
+    monkeypatch.setattr(funciones, 'VERSION_DATOS_COMPARTIDOS', funciones.VERSION_DATOS_COMPARTIDOS + 1)
+    _, web_nueva, _ = funciones.cargar_datos(config)
+    assert llamadas == [1]
+    assert web_nueva.equals(web)
+
+
+def test_memoria_compartida_cambia_de_generacion_entera(eventos, tmp_path, monkeypatch):
+    carpeta = str(tmp_path / 'compartido')
+    config = escribir_config(str(tmp_path), [eventos], memoria_compartida={'dir': carpeta})
+
+    _, web, _ = funciones.cargar_datos(config)
+    with open(os.path.join(carpeta, 'manifiesto.json'), 'r') as file:
+        generacion = json.load(file)['generacion']
+    assert sorted(os.listdir(os.path.join(carpeta, generacion))) == ['df_exp.arrow', 'df_final_demo.arrow', 'df_final_web_data.arrow']
+
+    #al regenerar, el manifiesto apunta a una carpeta nueva y la anterior se borra
+    monkeypatch.setattr(funciones, 'VERSION_DATOS_COMPARTIDOS', funciones.VERSION_DATOS_COMPARTIDOS + 1)
+    funciones.cargar_datos(config)
+    with open(os.path.join(carpeta, 'manifiesto.json'), 'r') as file:
+        nueva = json.load(file)['generacion']
+    assert nueva != generacion
+    assert sorted(os.listdir(carpeta)) == sorted(['manifiesto.json', nueva])
+
+    #las tablas ya mapeadas de la generación borrada se siguen leyendo, y se abre la vigente
+    assert web['client_id'].sum() == funciones.abrir_datos_compartidos(carpeta)[1]['client_id'].sum()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import funciones
+
+
+@pytest.mark.parametrize('inactividad', [None, 1800])
+def test_agregacion_paralela_igual_que_en_un_proceso(datos_limpios, inactividad):
+    _, web, exp = datos_limpios
+
+    en_un_proceso = funciones.agregar_ab_paralelo(exp, web, n_procesos=1, inactividad=inactividad)
+    #varias particiones en este proceso y en dos procesos
+    for n_procesos, n_particiones in [(1, 7), (2, None)]:
+        repartido = funciones.agregar_ab_paralelo(exp, web, n_procesos=n_procesos, n_particiones=n_particiones, inactividad=inactividad)
+        for clave in ['transiciones', 'drop_off', 'tasa_conversion']:
+            assert repartido[clave].equals(en_un_proceso[clave]), clave
+        for clave in ['permanencia', 'conversion_visitas']:
+            pd.testing.assert_frame_equal(repartido[clave], en_un_proceso[clave], rtol=1e-12)
+
+
+@pytest.mark.parametrize('inactividad', [None, 1800])
+def test_agregacion_paralela_igual_que_las_metricas_en_memoria(datos_limpios, inactividad):
+    _, web, exp = datos_limpios
+
+    resultados = funciones.agregar_ab_paralelo(exp, web, n_procesos=2, inactividad=inactividad)
+
+    matriz = funciones.matriz_transiciones(exp, web, inactividad)
+    np.testing.assert_array_equal(resultados['transiciones'].to_numpy(), matriz.to_numpy())
+    np.testing.assert_array_equal(resultados['drop_off'].to_numpy(), funciones.calcular_drop_off(exp, web).to_numpy())
+    np.testing.assert_allclose(resultados['tasa_conversion'].to_numpy(), funciones.calcular_tasa_conversion(exp, web).to_numpy(), rtol=1e-12)
+
+    #media y varianza del tiempo de permanencia por variación
+    segundos = funciones.obtener_visitas(exp, web, inactividad).groupby('variation', observed=True)['difference_time_in_seconds']
+    np.testing.assert_array_equal(resultados['permanencia']['visits'].to_numpy(), segundos.count().to_numpy())
+    np.testing.assert_allclose(resultados['permanencia']['mean_seconds'].to_numpy(), segundos.mean().to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(resultados['permanencia']['var_seconds'].to_numpy(), segundos.var().to_numpy(), rtol=1e-9)
+
+
+def test_reparto_con_clientes_nulos(datos_limpios):
+    _, web, _ = datos_limpios
+    web = web.astype({'client_id': 'Int32'})
+    web.loc[web.index[:5], 'client_id'] = pd.NA
+
+    partes = funciones._repartir_por_cliente(web, 4)
+    assert sum(len(parte) for parte in partes) == len(web)
+    assert partes[0]['client_id'].isna().sum() == 5
+    #cada cliente está en una sola partición
+    clientes = [set(parte['client_id'].dropna()) for parte in partes]
+    assert sum(len(c) for c in clientes) == len(set().union(*clientes))
@@ -0,0 +1,44 @@
+import numpy as np
+
+import funciones
+
+
+def test_promedio_tiempo_por_paso_solo_con_columnas_publicas(datos_limpios):
+    _, web, exp = datos_limpios
+
+    df_grafico = funciones.crear_dataframe_promedio_tiempo_por_paso(exp, web)
+
+    #las columnas y los tipos son los de la versión con pandas, sin 'transition' ni 'steps' categórica
+    df_pandas = funciones._sesionizar_pandas(funciones._unir_variacion(exp, web)).dropna(subset='difference_time_in_seconds')
+    assert 'transition' not in df_grafico.columns
+    assert df_grafico.dtypes.equals(df_pandas.dtypes)
+    assert df_grafico.reset_index(drop=True).equals(df_pandas.reset_index(drop=True))
+
+    #las transacciones compartidas conservan sus columnas internas
+    assert 'transition' in funciones.obtener_transacciones(exp, web).columns
+
+
+def test_sesionizar_con_numpy_igual_que_con_pandas(datos_limpios):
+    _, web, exp = datos_limpios
+    df_unido = funciones._unir_variacion(exp, web)
+
+    #con los datos limpios (ya ordenados) y desordenados, con 'process_step' categórica y como texto
+    for df in [df_unido, df_unido.sample(frac=1, random_state=0), df_unido.astype({'process_step': object})]:
+        df_numpy = funciones._transacciones_publicas(funciones._sesionizar(df))
+        df_pandas = funciones._sesionizar_pandas(df)
+        assert df_numpy.equals(df_pandas)
+
+
+def test_sesionizar_con_fechas_y_pasos_nulos(datos_limpios):
+    _, web, exp = datos_limpios
+    df_unido = funciones._unir_variacion(exp, web).astype({'process_step': object})
+    #los nulos son NaN, como al leer el CSV (con None, astype(str) de la versión con pandas escribe 'None' en lugar de 'nan')
+    df_unido.loc[df_unido.index[::50], 'date_time'] = None
+    df_unido.loc[df_unido.index[7::40], 'process_step'] = np.nan
+
+    df_numpy = funciones._transacciones_publicas(funciones._sesionizar(df_unido))
+    df_pandas = funciones._sesionizar_pandas(df_unido)
+
+    assert df_numpy.index.equals(df_pandas.index)
+    for columna in ['time_last_step', 'last_step', 'time_difference', 'steps', 'difference_time_in_seconds']:
+        assert df_numpy[columna].equals(df_pandas[columna]), columna
@@ -0,0 +1,48 @@
+import pytest
+
+import funciones
+from conftest import escribir_config
+
+
+def test_ventana_de_deduplicacion_con_datos_en_orden(eventos, tmp_path, capsys):
+    ordenados = eventos.sort_values('date_time', kind='stable').reset_index(drop=True)
+    config = escribir_config(str(tmp_path), [ordenados])
+
+    trozos = list(funciones.leer_datos_stream(config, chunksize=1500, ventana_dias=2))
+
+    assert sum(len(trozo) for trozo in trozos) == len(ordenados.drop_duplicates())
+    assert 'Aviso' not in capsys.readouterr().out
+
+
+def test_ventana_de_deduplicacion_avisa_de_eventos_tardios(config_sintetica, capsys):
+    list(funciones.leer_datos_stream(config_sintetica, chunksize=1500, ventana_dias=2))
+
+    assert 'Aviso' in capsys.readouterr().out
+
+
+def test_agregaciones_por_trozos_igual_que_en_memoria(config_sintetica, datos_limpios):
+    _, web, exp = datos_limpios
+
+    def trozos():
+        return funciones.leer_datos_stream(config_sintetica, chunksize=1500)
+
+    assert funciones.calcular_drop_off(exp, trozos()).equals(funciones.calcular_drop_off(exp, web))
+    assert funciones.calcular_tasa_conversion(exp, trozos()).equals(funciones.calcular_tasa_conversion(exp, web))
+    assert funciones.calcular_tiempo_permanencia(exp, trozos()).equals(funciones.calcular_tiempo_permanencia(exp, web))
+
+
+def test_sesiones_por_inactividad_entre_trozos_igual_que_en_memoria(config_sintetica, datos_limpios):
+    _, web, exp = datos_limpios
+
+    #los trozos están desordenados, así que las sesiones de un cliente se reparten entre muchos de ellos
+    for inactividad in [60, 1800, 86400]:
+        en_memoria = funciones.calcular_tiempo_permanencia(exp, web, inactividad)
+        por_trozos = funciones.calcular_tiempo_permanencia(exp, funciones.leer_datos_stream(config_sintetica, chunksize=700), inactividad)
+        assert por_trozos.equals(en_memoria), inactividad
+
+
+def test_trozos_con_inactividad_sin_juntar_sesiones(config_sintetica, datos_limpios):
+    _, _, exp = datos_limpios
+
+    with pytest.raises(ValueError, match='inactividad'):
+        funciones._transacciones_por_trozos(exp, funciones.leer_datos_stream(config_sintetica), ['client_id'], inactividad=60)
@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+import yaml
+
+import funciones
+from conftest import RAIZ, escribir_config
+
+
+def _config_con_desconocidos(eventos, carpeta):
+
+    """Escribe los eventos con un paso desconocido y un archivo de experimentos con una variación desconocida."""
+
+    web = eventos.astype({'process_step': object})
+    web.loc[web.index[10], 'process_step'] = 'paso_raro'
+    ruta_config = escribir_config(str(carpeta), [web])
+
+    exp = pd.read_csv(os.path.join(RAIZ, 'resources', 'df_final_experiment_clients.txt'))
+    exp.loc[exp['Variation'].first_valid_index(), 'Variation'] = 'Beta'
+    exp.to_csv(carpeta / 'exp.txt', index=False)
+    with open(ruta_config) as file:
+        config = yaml.safe_load(file)
+    config['data']['exp_client'] = str(carpeta / 'exp.txt')
+    with open(ruta_config, 'w') as file:
+        yaml.safe_dump(config, file)
+    return ruta_config
+
+
+def test_pasos_y_variaciones_desconocidos_van_a_cuarentena(eventos, tmp_path):
+    ruta_config = _config_con_desconocidos(eventos, tmp_path)
+    demo, web, exp = funciones.leer_datos(ruta_config, usar_cache=False)
+    web = funciones.limpiar_web(web, errores_fecha='coerce', ordenar=True, conservar_desconocidos=True)
+    exp = funciones.limpiar_exp(exp, conservar_desconocidos=True)
+
+    cuarentena = {}
+    demo, web, exp, informe = funciones.validar_dataframes(funciones.limpiar_demo(demo), web, exp, cuarentena)
+    filas = informe.set_index(['tabla', 'regla'])['filas']
+    assert filas['web', 'process_step desconocido'] == 1
+    assert filas['web', 'process_step nulo'] == 0
+    assert filas['exp', 'variación desconocida'] == 1
+    assert cuarentena['web']['process_step'].astype(str).tolist() == ['paso_raro']
+    assert cuarentena['exp']['variation'].astype(str).tolist() == ['Beta']
+
+    #las tablas validadas vuelven a tener las categorías del esquema
+    assert web['process_step'].dtype == funciones._tipos_esquema(funciones.ESQUEMA_WEB)['process_step']
+    assert list(exp['variation'].cat.categories) == funciones.ESQUEMA_EXP['Variation']
+
+
+def test_sin_validar_los_desconocidos_son_nulos(eventos, tmp_path):
+    ruta_config = _config_con_desconocidos(eventos, tmp_path)
+    demo, web, exp = funciones.limpiar_dataframes(*funciones.leer_datos(ruta_config, usar_cache=True))
+
+    assert web['process_step'].dtype == funciones._tipos_esquema(funciones.ESQUEMA_WEB)['process_step']
+    assert not exp['variation'].isin(['Beta']).any()